@@ -0,0 +1,78 @@
+"""
+Benchmark for the enclosure engine.
+
+Compares applying every enclosure to every line with apply_regex_enclosure
+against the EnclosureEngine, for the shipped enclosure and for several
+enclosures at once. The corpus has no overlapping matches, so both must
+produce the same text; exits with status 1 otherwise.
+
+Usage: python benchmarks/bench_enclosures.py [--lines N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_fmt.core import EnclosureEngine, apply_regex_enclosure  # noqa: E402
+
+CONFIGS: Dict[str, List[Dict[str, Any]]] = {
+    "default": [{"pattern": r"\[.*?\]", "wrapper": "`"}],
+    "four": [
+        {"pattern": r"\[.*?\]", "wrapper": "`"},
+        {"pattern": r"\b\d+%", "wrapper": "**"},
+        {"pattern": r"\bTODO\b", "wrapper": "_"},
+        {"pattern": r"\{[a-z ]*\}", "wrapper": "`"},
+    ],
+}
+
+WORDS = ["the", "model", "returns", "[1, 2, 3]", "75%", "TODO", "{key value}",
+         "data", "layer", "loss", "f(x)", "and", "of", "weights", "[a, b]"]
+
+
+def synthetic_lines(count: int, seed: int = 3) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 16)))
+            for _ in range(count)]
+
+
+def legacy_apply(lines: List[str], configs: List[Dict[str, Any]]) -> str:
+    processed: List[str] = []
+    for line in lines:
+        for item in configs:
+            pattern, wrapper = item.get("pattern"), item.get("wrapper")
+            if pattern and wrapper:
+                line = apply_regex_enclosure(line, pattern, wrapper)
+        processed.append(line)
+    return "\n".join(processed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the enclosure engine.")
+    parser.add_argument("--lines", type=int, default=200000)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines)
+    print(f"{'config':>8} {'per-line':>10} {'engine':>8} {'speedup':>8}")
+    for name, configs in CONFIGS.items():
+        start = time.perf_counter()
+        legacy = legacy_apply(lines, configs)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fused = EnclosureEngine(configs).apply(lines)
+        fused_time = time.perf_counter() - start
+
+        if legacy != fused:
+            print(f"Error: Output differs for the '{name}' enclosures.")
+            return 1
+        print(f"{name:>8} {legacy_time:>9.3f}s {fused_time:>7.3f}s {legacy_time / fused_time:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark for the footer matcher.
+
+Compares trying every footer pattern in turn (is_ft_factory) with the
+FooterMatcher as the footer list grows. Exits with status 1 if the two
+disagree on any line.
+
+Usage: python benchmarks/bench_footer.py [--lines N] [--sizes 0,100,300]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml  # noqa: E402
+
+from pdf_fmt.core import compile_footer_patterns, is_ft_factory  # noqa: E402
+from pdf_fmt.filter import FooterMatcher  # noqa: E402
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pdf-fmt.yaml"
+)
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+
+
+def synthetic_lines(count: int, seed: int = 11) -> List[str]:
+    """Layout-padded lines of random words, a few of them footers."""
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for _ in range(count):
+        words = [_word(rng) for _ in range(rng.randint(1, 14))]
+        if rng.random() < 0.02:
+            words.insert(rng.randrange(len(words)), "Copyright")
+        lines.append("   ".join(words) + " " * rng.randint(0, 30))
+    return lines
+
+
+def extra_patterns(count: int, seed: int = 5) -> List[str]:
+    """Footer entries in the shape users usually add."""
+    rng = random.Random(seed)
+    return [f"^.*{_word(rng).capitalize()} {_word(rng)}.*$" for _ in range(count)]
+
+
+def _time(func, lines: List[str]):
+    start = time.perf_counter()
+    result = [func(line) for line in lines]
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the footer matcher.")
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--sizes", default="0,100,300",
+                        help="Comma separated counts of extra footer patterns.")
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        defaults = yaml.safe_load(f)["filters"]["footer_regexes"]
+    lines = synthetic_lines(args.lines)
+
+    print(f"{'patterns':>9} {'per-pattern':>12} {'matcher':>9} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        patterns = compile_footer_patterns(defaults + extra_patterns(size))
+        old_time, old = _time(is_ft_factory(patterns), lines)
+        new_time, new = _time(FooterMatcher(patterns).matches, lines)
+        if old != new:
+            print(f"Error: Results differ with {len(patterns)} patterns.")
+            return 1
+        print(f"{len(patterns):>9} {old_time:>11.3f}s {new_time:>8.3f}s {old_time / new_time:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
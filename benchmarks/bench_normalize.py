@@ -0,0 +1,118 @@
+"""
+Benchmark for the fused line normaliser.
+
+Runs the original per-line passes (unicode map rebuilt per call, allowed
+character filter, whitespace collapse, camel case spacing, indentation
+check) and the fused pipeline over the same corpus. Exits with status 1 if
+any line differs.
+
+Usage: python benchmarks/bench_normalize.py [--lines N] [text files...]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_fmt.core import (  # noqa: E402
+    DEFAULT_CHARS_REGEX, ln_cont_factory, replace_successive_spaces,
+    format_indented_line
+)
+from pdf_fmt.formatting import (  # noqa: E402
+    UNICODE_REPLACEMENTS, line_normalizer_factory, normalize_spacing
+)
+
+WORDS = [
+    "the", "lecture", "Notes", "covers", "theAnswer", "x²", "α-decay",
+    "“quoted”", "–", "ﬁle", "Page", "12", "ABC", "dataSet",
+    "≤", "value’s", "of", "and", "|", "été", "→", "in"
+]
+
+
+def synthetic_corpus(line_count: int, seed: int = 7) -> List[str]:
+    """Lines resembling layout extracted text: padded, mixed unicode."""
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for _ in range(line_count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(0, 16))]
+        gap = " " * rng.randint(1, 6)
+        lines.append(" " * rng.randint(0, 20) + gap.join(words) + " " * rng.randint(0, 4))
+    return lines
+
+
+def legacy_pipeline(lines: List[str], pattern: re.Pattern) -> List[str]:
+    filter_content = ln_cont_factory(pattern)
+    output: List[str] = []
+    for line in lines:
+        table = str.maketrans(dict(UNICODE_REPLACEMENTS))
+        filtered = filter_content(line.translate(table))
+        if not filtered:
+            continue
+        cleaned = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', replace_successive_spaces(filtered))
+        output.append(format_indented_line(cleaned))
+    return output
+
+
+def fused_pipeline(lines: List[str], pattern: re.Pattern) -> List[str]:
+    normalize = line_normalizer_factory(pattern)
+    output: List[str] = []
+    for line in lines:
+        filtered = normalize(line)
+        if not filtered:
+            continue
+        output.append(normalize_spacing(filtered))
+    return output
+
+
+def _time(func, lines: List[str], pattern: re.Pattern, repeat: int):
+    best, result = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(lines, pattern)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the fused line normaliser.")
+    parser.add_argument("files", nargs="*", help="Text files to use as the corpus.")
+    parser.add_argument("--lines", type=int, default=200000,
+                        help="Synthetic corpus size when no files are given.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.files:
+        lines: List[str] = []
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+    else:
+        lines = synthetic_corpus(args.lines)
+
+    pattern = re.compile(DEFAULT_CHARS_REGEX)
+    legacy_time, legacy = _time(legacy_pipeline, lines, pattern, args.repeat)
+    fused_time, fused = _time(fused_pipeline, lines, pattern, args.repeat)
+
+    if legacy != fused:
+        for index, (old, new) in enumerate(zip(legacy, fused)):
+            if old != new:
+                print(f"Error: Output differs at line {index}: {old!r} != {new!r}")
+                break
+        else:
+            print(f"Error: Line counts differ ({len(legacy)} != {len(fused)}).")
+        return 1
+
+    print(f"Lines:   {len(lines)}")
+    print(f"Legacy:  {legacy_time:.3f}s")
+    print(f"Fused:   {fused_time:.3f}s")
+    print(f"Speedup: {legacy_time / fused_time:.2f}x (outputs identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
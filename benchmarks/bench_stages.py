@@ -0,0 +1,222 @@
+"""
+Stage-level benchmark over the synthetic PDF corpora.
+
+Generates each corpus (text, tables, images, columns, long) and times the
+pipeline stages separately: page parsing, page processing, post-processing,
+image extraction, image encoding and similarity dedup. Stages run
+sequentially in this process so timings are not blurred by pool start-up.
+
+Results are written as JSON so runs can be compared across commits:
+
+    python benchmarks/bench_stages.py --output before.json
+    python benchmarks/bench_stages.py --compare before.json
+
+Usage: python benchmarks/bench_stages.py [--corpus NAME ...] [--pages-scale F]
+       [--repeat N] [--skip-images] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pdfplumber  # noqa: E402
+
+from pdf_fmt.config import _load_config  # noqa: E402
+from pdf_fmt.core import DEFAULT_CHARS_REGEX, post_process_content  # noqa: E402
+from pdf_fmt.image import (  # noqa: E402
+    ExtractedImage, extract_images_from_pdf, _process_single_image, _discard_similar_images
+)
+from pdf_fmt.processing import (  # noqa: E402
+    PageTask, build_processing_plan, _install_plan, _get_page_elements,
+    _join_page_elements, _process_page_text_block
+)
+from pdf_fmt.spell import locale_checks  # noqa: E402
+from synthetic_pdf import CORPORA, build_corpus  # noqa: E402
+
+SCHEMA_VERSION = 1
+STAGES = ("parse", "process", "post_process", "image_extract", "image_encode", "image_dedup")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timed(func: Callable[[], Any]) -> Tuple[float, Any]:
+    """Runs func with its console messages silenced and returns (seconds, result)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        return time.perf_counter() - start, result
+
+
+def _parse(pdf_path: str, table_config: Dict[str, Any]) -> List[str]:
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_join_page_elements(_get_page_elements(page, table_config))
+                for page in pdf.pages]
+
+
+def _process(blocks: List[str], plan) -> List[str]:
+    _install_plan(plan)
+    total = len(blocks)
+    return [line for i, block in enumerate(blocks)
+            for line in _process_page_text_block(PageTask(i, block, total))]
+
+
+def _encode(images: List[ExtractedImage], image_dir: str, formats: List[str], fallback_kb: int) -> int:
+    for image in images:
+        _process_single_image((image, image_dir, "bench", formats, fallback_kb, "bench"))
+    return len(images)
+
+
+def run_corpus(pdf_path: str, config: Dict[str, Any], skip_images: bool) -> Dict[str, Any]:
+    """Times every stage once over a corpus file."""
+    filters_cfg = config.get("filters", {})
+    actions = config.get("actions", {})
+    locale, ignores = locale_checks(config)
+    plan = build_processing_plan(
+        config, filters_cfg.get("allowed_chars_regex", DEFAULT_CHARS_REGEX),
+        filters_cfg.get("footer_regexes", []), locale, ignores
+    )
+
+    seconds: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+
+    seconds["parse"], blocks = _timed(lambda: _parse(pdf_path, plan.table_config))
+    seconds["process"], lines = _timed(lambda: _process(blocks, plan))
+    seconds["post_process"], content = _timed(lambda: post_process_content(lines, config))
+    counts.update(pages=len(blocks), lines=len(lines), chars=len(content))
+
+    if not skip_images:
+        fallback_kb = actions.get("fallback_image_kb", 2000)
+        formats = actions.get("image_format", ["png"])
+        formats = [formats] if isinstance(formats, str) else formats
+        threshold = actions.get("image_discard_threshold", 95)
+
+        with tempfile.TemporaryDirectory(prefix="pdf-fmt-bench-") as image_dir:
+            seconds["image_extract"], images = _timed(
+                lambda: extract_images_from_pdf(pdf_path, fallback_kb=fallback_kb) or []
+            )
+            seconds["image_encode"], counts["images"] = _timed(
+                lambda: _encode(images, image_dir, formats, fallback_kb)
+            )
+            seconds["image_dedup"], _ = _timed(
+                lambda: _discard_similar_images(image_dir, threshold)
+            )
+            counts["images_kept"] = len(os.listdir(image_dir))
+
+    return {"seconds": seconds, "counts": counts}
+
+
+def benchmark(names: List[str], config: Dict[str, Any], pages_scale: float,
+              repeat: int, skip_images: bool, corpus_dir: str) -> Dict[str, Any]:
+    corpora: Dict[str, Any] = {}
+    for name in names:
+        pdf_path = os.path.join(corpus_dir, f"{name}.pdf")
+        page_count = build_corpus(name, pdf_path, pages_scale)
+        print(f"INFO: Benchmarking '{name}' ({page_count} pages)...", file=sys.stderr)
+
+        best: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for _ in range(repeat):
+            run = run_corpus(pdf_path, config, skip_images)
+            counts = run["counts"]
+            for stage, value in run["seconds"].items():
+                best[stage] = min(best.get(stage, value), value)
+
+        corpora[name] = {
+            "pages": page_count,
+            "bytes": os.path.getsize(pdf_path),
+            "counts": counts,
+            "stages": {
+                stage: {"seconds": round(best[stage], 6),
+                        "per_page_ms": round(best[stage] * 1000 / page_count, 4)}
+                for stage in STAGES if stage in best
+            },
+        }
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pages_scale": pages_scale,
+        "repeat": repeat,
+        "corpora": corpora,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Prints per-stage timings against a previous result to stderr."""
+    print(f"{'corpus':>8} {'stage':>14} {'before':>9} {'after':>9} {'ratio':>7}", file=sys.stderr)
+    for name, result in current["corpora"].items():
+        old_stages = baseline.get("corpora", {}).get(name, {}).get("stages", {})
+        for stage, timing in result["stages"].items():
+            old = old_stages.get(stage, {}).get("seconds")
+            new = timing["seconds"]
+            ratio = f"{old / new:>6.2f}x" if old and new else f"{'-':>7}"
+            before = f"{old:>8.3f}s" if old is not None else f"{'-':>9}"
+            print(f"{name:>8} {stage:>14} {before} {new:>8.3f}s {ratio}", file=sys.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stage by stage.")
+    parser.add_argument("--corpus", action="append", choices=list(CORPORA),
+                        help="Corpus to run; repeat for several. Defaults to all.")
+    parser.add_argument("--pages-scale", type=float, default=1.0,
+                        help="Multiplies every corpus page count, e.g. 0.1 for a quick run.")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs per corpus; the fastest time of each stage is kept.")
+    parser.add_argument("--skip-images", action="store_true")
+    parser.add_argument("--config", default=os.path.join(ROOT, "pdf-fmt.yaml"))
+    parser.add_argument("--corpus-dir", help="Keep the generated PDFs in this directory.")
+    parser.add_argument("--output", help="Write the JSON result here instead of stdout.")
+    parser.add_argument("--compare", help="Previous JSON result to compare against.")
+    args = parser.parse_args()
+
+    config = _load_config(args.config)
+    names = args.corpus or list(CORPORA)
+    repeat = max(1, args.repeat)
+
+    if args.corpus_dir:
+        os.makedirs(args.corpus_dir, exist_ok=True)
+        result = benchmark(names, config, args.pages_scale, repeat,
+                           args.skip_images, args.corpus_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="pdf-fmt-corpus-") as corpus_dir:
+            result = benchmark(names, config, args.pages_scale, repeat,
+                               args.skip_images, corpus_dir)
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Deterministic synthetic PDF corpora for the benchmarks.
+
+A minimal PDF writer (standard Helvetica font, uncompressed content streams,
+Flate and DCT images) so corpora can be generated without extra packages.
+The same seed always produces byte-identical files.
+
+Usage: python benchmarks/synthetic_pdf.py OUTPUT_DIR [--pages-scale F]
+"""
+
+import argparse
+import io
+import os
+import random
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 50
+LINE_HEIGHT = 14
+
+WORDS = (
+    "the model learns a function from labelled data and each layer applies "
+    "weights to its inputs before a non linear activation gradient descent "
+    "updates parameters to minimise the loss colour organisation centre "
+    "behaviour analyse programme theatre recognise optimisation regularisation"
+).split()
+SYMBOLS = ["–", "“quoted”", "’s", "•", "x²", "±"]
+FOOTERS = ["Copyright 2024 Example University", "Official (Open)", "IT1234 Lecture Notes"]
+
+
+class PDFWriter:
+    """Collects objects and writes a PDF with a valid cross-reference table."""
+
+    def __init__(self):
+        self._objects: List[Optional[bytes]] = []
+        self._pages: List[int] = []
+        self._pages_id = self._reserve()
+        self._font_id = self.add(
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+            b"/Encoding /WinAnsiEncoding >>"
+        )
+
+    def _reserve(self) -> int:
+        self._objects.append(None)
+        return len(self._objects)
+
+    def add(self, body: bytes) -> int:
+        self._objects.append(body)
+        return len(self._objects)
+
+    def add_stream(self, data: bytes, entries: bytes = b"") -> int:
+        header = b"<< " + entries + b" /Length " + str(len(data)).encode() + b" >>"
+        return self.add(header + b"\nstream\n" + data + b"\nendstream")
+
+    def add_image(self, image: Image.Image, jpeg: bool) -> int:
+        rgb = image.convert("RGB")
+        if jpeg:
+            buf = io.BytesIO()
+            rgb.save(buf, "JPEG", quality=85)
+            data, image_filter = buf.getvalue(), b"/DCTDecode"
+        else:
+            data, image_filter = zlib.compress(rgb.tobytes(), 6), b"/FlateDecode"
+        width, height = rgb.size
+        return self.add_stream(data, (
+            b"/Type /XObject /Subtype /Image /Width %d /Height %d "
+            b"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter " % (width, height)
+        ) + image_filter)
+
+    def add_page(self, content: bytes, images: Dict[str, int]) -> None:
+        contents_id = self.add_stream(content)
+        xobjects = b" ".join(
+            b"/%s %d 0 R" % (name.encode(), obj_id) for name, obj_id in images.items()
+        )
+        self._pages.append(self.add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> /XObject << %s >> >> "
+            b"/Contents %d 0 R >>" % (
+                self._pages_id, PAGE_WIDTH, PAGE_HEIGHT, self._font_id,
+                xobjects, contents_id
+            )
+        ))
+
+    def write(self, path: str) -> None:
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._pages)
+        self._objects[self._pages_id - 1] = (
+            b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self._pages)
+        )
+        catalog_id = self.add(b"<< /Type /Catalog /Pages %d 0 R >>" % self._pages_id)
+
+        out = io.BytesIO()
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for obj_id, body in enumerate(self._objects, start=1):
+            offsets.append(out.tell())
+            out.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+        xref_offset = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._objects) + 1))
+        for offset in offsets:
+            out.write(b"%010d 00000 n \n" % offset)
+        out.write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(self._objects) + 1, catalog_id, xref_offset)
+        )
+        with open(path, "wb") as f:
+            f.write(out.getvalue())
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text(x: float, y: float, text: str, size: int = 10) -> bytes:
+    return b"BT /F1 %d Tf 1 0 0 1 %.1f %.1f Tm %s Tj ET\n" % (size, x, y, _pdf_string(text))
+
+
+def _sentence(rng: random.Random, max_words: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(4, max_words))]
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words)), rng.choice(SYMBOLS))
+    if rng.random() < 0.1:
+        words.append("[1, 2, 3]")
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + ("." if rng.random() < 0.5 else "")
+
+
+def _footer(page_num: int) -> bytes:
+    return (_text(MARGIN, 30, FOOTERS[page_num % len(FOOTERS)], 8)
+            + _text(PAGE_WIDTH - MARGIN, 30, str(page_num + 1), 8))
+
+
+def _text_block(rng: random.Random, x: float, y: float, width_words: int,
+                bottom: float) -> Tuple[bytes, float]:
+    content = b""
+    while y > bottom:
+        indent = 10 if rng.random() < 0.15 else 0
+        content += _text(x + indent, y, _sentence(rng, width_words))
+        y -= LINE_HEIGHT
+    return content, y
+
+
+def _table(rng: random.Random, x: float, y: float, rows: int, cols: int) -> bytes:
+    cell_w, cell_h = 110, 18
+    content = b"0.5 w\n"
+    for r in range(rows):
+        for c in range(cols):
+            cx, cy = x + c * cell_w, y - (r + 1) * cell_h
+            content += b"%.1f %.1f %d %d re S\n" % (cx, cy, cell_w, cell_h)
+            label = f"H{c}" if r == 0 else f"{rng.choice(WORDS)} {rng.randint(0, 999)}"
+            content += _text(cx + 4, cy + 5, label, 9)
+    return content
+
+
+def _picture(rng: random.Random, size: Tuple[int, int]) -> Image.Image:
+    image = Image.new("RGB", size, tuple(rng.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0 = rng.randint(0, size[0] - 1), rng.randint(0, size[1] - 1)
+        x1, y1 = rng.randint(x0, size[0]), rng.randint(y0, size[1])
+        draw.rectangle((x0, y0, x1, y1), fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    return image
+
+
+def text_page(writer: PDFWriter, rng: random.Random, page_num: int) -> None:
+    content = _text(MARGIN, PAGE_HEIGHT - MARGIN, f"Lecture {page_num + 1}: Introduction toMachineLearning", 14)
+    block, _ = _text_block(rng, MARGIN, PAGE_HEIGHT - MARGIN - 30, 14, 60)
+    writer.add_page(content + block + _footer(page_num), {})
+
+
+def table_page(writer: PDFWriter, rng: random.Random, page_num: int) -> None:
+    content, y = _text_block(rng, MARGIN, PAGE_HEIGHT - MARGIN, 12, 640)
+    content += _table(rng, MARGIN, y - 10, rng.randint(4, 8), 4)
+    block, y = _text_block(rng, MARGIN, 420, 12, 320)
+    content += block + _table(rng, MARGIN, y - 10, rng.randint(3, 6), 3)
+    writer.add_page(content + _footer(page_num), {})
+
+
+def image_page(writer: PDFWriter, rng: random.Random, page_num: int, logo: int) -> None:
+    images = {"Logo": logo}
+    content = b"q 60 0 0 30 %d %d cm /Logo Do Q\n" % (PAGE_WIDTH - MARGIN - 60, PAGE_HEIGHT - 45)
+    y = PAGE_HEIGHT - MARGIN - 40
+    for index in range(2):
+        name = f"Im{index}"
+        images[name] = writer.add_image(_picture(rng, (320, 200)), jpeg=index == 0)
+        content += b"q 240 0 0 150 %d %d cm /%s Do Q\n" % (MARGIN, y - 150, name.encode())
+        block, _ = _text_block(rng, MARGIN, y - 165, 12, y - 230)
+        content += block
+        y -= 240
+    writer.add_page(content + _footer(page_num), images)
+
+
+def column_page(writer: PDFWriter, rng: random.Random, page_num: int) -> None:
+    column_x = (MARGIN, PAGE_WIDTH / 2 + 10)
+    content = _text(MARGIN, PAGE_HEIGHT - MARGIN, f"Chapter {page_num + 1}", 14)
+    for x in column_x:
+        block, _ = _text_block(rng, x, PAGE_HEIGHT - MARGIN - 30, 6, 60)
+        content += block
+    writer.add_page(content + _footer(page_num), {})
+
+
+# name: (page count, page layout, seed)
+CORPORA: Dict[str, Tuple[int, str, int]] = {
+    "text": (40, "text", 1),
+    "tables": (40, "tables", 2),
+    "images": (20, "images", 3),
+    "columns": (40, "columns", 4),
+    "long": (1000, "text", 5),
+}
+
+
+def build_corpus(name: str, path: str, pages_scale: float = 1.0) -> int:
+    """Writes the named corpus to path and returns its page count."""
+    page_count, kind, seed = CORPORA[name]
+    page_count = max(1, int(page_count * pages_scale))
+    rng = random.Random(seed)
+    writer = PDFWriter()
+
+    logo = None
+    if kind == "images":
+        logo = writer.add_image(_picture(random.Random(0), (120, 60)), jpeg=False)
+
+    for page_num in range(page_count):
+        if kind == "tables":
+            table_page(writer, rng, page_num)
+        elif kind == "images":
+            image_page(writer, rng, page_num, logo)
+        elif kind == "columns":
+            column_page(writer, rng, page_num)
+        else:
+            text_page(writer, rng, page_num)
+
+    writer.write(path)
+    return page_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the synthetic PDF corpora.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--pages-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name in CORPORA:
+        path = os.path.join(args.output_dir, f"{name}.pdf")
+        pages = build_corpus(name, path, args.pages_scale)
+        print(f"{path}: {pages} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import os
 import sys
 from typing import Dict, Any
 
-from pdf_fmt.startup import check_venv, check_not_root, StartupCheckError
+from pdf_fmt.startup import check_venv, check_not_root, setup_cli, StartupCheckError
 
 
 def main():
@@ -25,12 +25,19 @@ def main():
         sys.exit(e.exit_code)
 
     try:
+        # Parse the command line first, so --help and --version return
+        # before the config and the pipeline's dependencies are loaded
+        args = setup_cli()
+
+        from pdf_fmt.server import handle_server_args
+        handle_server_args(args)
+
         from pdf_fmt import config
         from pdf_fmt.parser import execute_main_pipeline
 
         CONFIG: Dict[str, Any] = config.load_config()
 
-        execute_main_pipeline(CONFIG)
+        execute_main_pipeline(CONFIG, args)
     except StartupCheckError as e:
         print(e.message)
         sys.exit(1)
@@ -0,0 +1,204 @@
+"""
+On-disk, content-addressed cache with size-based LRU eviction
+"""
+
+import os
+import json
+import hashlib
+import platform
+import tempfile
+from typing import Dict, Any, List, Optional
+
+CACHE_DIR_NAME = "pdf-fmt"
+CACHE_FORMAT_VERSION = "1"
+DEFAULT_CACHE_SIZE_MB = 256
+HASH_CHUNK_SIZE = 1024 * 1024
+# Share of max_bytes that eviction trims a full namespace down to
+EVICT_TARGET = 0.9
+
+
+def get_cache_dir() -> str:
+    """Resolves the cache directory using ENV, then the platform standard."""
+    env_path = os.environ.get('PDF_FMT_CACHE_DIR')
+    if env_path:
+        return os.path.abspath(os.path.expanduser(env_path))
+
+    if platform.system() == 'Windows':
+        base_dir = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+
+    return os.path.join(base_dir, CACHE_DIR_NAME)
+
+
+def hash_file(file_path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_data(data: Any) -> str:
+    """Returns a stable SHA-256 hex digest of JSON-serializable data."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class DiskCache:
+    """
+    Stores binary entries under their key inside a namespace directory.
+    Hits refresh the entry's mtime, and once the namespace grows past
+    max_bytes the least recently used entries are removed until it is back
+    under EVICT_TARGET of it, so that a full cache is not rescanned on
+    every write.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _list_entries(self) -> List[os.DirEntry]:
+        entries: List[os.DirEntry] = []
+        if not os.path.isdir(self.directory):
+            return entries
+
+        for bucket in os.scandir(self.directory):
+            if bucket.is_dir():
+                entries.extend(e for e in os.scandir(bucket.path)
+                               if e.is_file() and not e.name.endswith('.tmp'))
+        return entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._entry_path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see partial data
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path), suffix='.tmp'
+            )
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write cache entry: {e}")
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(e.stat().st_size for e in self._list_entries())
+        else:
+            self._total_bytes += len(data) - replaced
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache is under its target."""
+        entries = []
+        for entry in self._list_entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * EVICT_TARGET)
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+        self._total_bytes = total
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get(key)
+        return data.decode('utf-8') if data is not None else None
+
+    def put_text(self, key: str, text: str) -> None:
+        self.put(key, text.encode('utf-8'))
+
+
+def open_cache(
+    config: Dict[str, Any],
+    namespace: str,
+    size_key: str = "max_size_mb"
+) -> Optional[DiskCache]:
+    """Returns the cache for a namespace, or None if caching is disabled."""
+    cache_cfg = config.get("cache", {})
+    if not isinstance(cache_cfg, dict) or not cache_cfg.get("enabled", True):
+        return None
+
+    size_mb = cache_cfg.get(size_key, DEFAULT_CACHE_SIZE_MB)
+    try:
+        max_bytes = int(float(size_mb) * 1024 * 1024)
+    except (ValueError, TypeError):
+        print(f"Warning: 'cache.{size_key}' in config is not a number. Defaulting to {DEFAULT_CACHE_SIZE_MB}.")
+        max_bytes = DEFAULT_CACHE_SIZE_MB * 1024 * 1024
+
+    if max_bytes <= 0:
+        return None
+
+    return DiskCache(os.path.join(get_cache_dir(), namespace), max_bytes)
+
+
+def hash_output_config(
+    config: Dict[str, Any],
+    spelling_locale: str,
+    ignore_list: List[str]
+) -> str:
+    """
+    Hashes only the config sections that change the extracted text, so that
+    unrelated edits (actions, cores) keep existing entries valid.
+    """
+    from pdf_fmt.startup import get_script_version
+
+    return hash_data({
+        "format": CACHE_FORMAT_VERSION,
+        "version": get_script_version(),
+        "filters": config.get("filters", {}),
+        "formatting": config.get("formatting", {}),
+        "locale": spelling_locale,
+        "ignores": ignore_list,
+    })
+
+
+def hash_parse_config(config: Dict[str, Any]) -> str:
+    """Hashes the settings that change how a single page is parsed."""
+    from pdf_fmt.startup import get_script_version
+
+    return hash_data({
+        "format": CACHE_FORMAT_VERSION,
+        "version": get_script_version(),
+        "extract_table": config.get("formatting", {}).get("extract_table", {}),
+    })
+
+
+def extraction_key(pdf_path: str, config_digest: str) -> str:
+    """Key of an extract_text_from_pdf result: PDF bytes plus config."""
+    return hash_data([hash_file(pdf_path), config_digest])
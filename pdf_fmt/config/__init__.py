@@ -1,5 +1,4 @@
 import os
-import yaml
 import platform
 from typing import Dict, Any, Optional
 
@@ -8,6 +7,7 @@ CONFIG_FILENAME = "pdf-fmt.yaml"
 _CONFIG_CACHE: Dict[str, Any] = {}
 _CONFIG_PATH_CACHE: Optional[str] = None
 _CONFIG_MTIME_CACHE: float = 0.0
+_CONFIG_FILE_CACHE: Optional[str] = None
 
 
 def find_config_file() -> Optional[str]:
@@ -43,6 +43,9 @@ def find_config_file() -> Optional[str]:
 
 def _load_config(file_path: str) -> Dict[str, Any]:
     """Internal function to load config data from a YAML file with basic validation."""
+    # Only imported once a config file has been found
+    import yaml
+
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             config = yaml.safe_load(f)
@@ -65,11 +68,16 @@ def _load_config(file_path: str) -> Dict[str, Any]:
     return config
 
 
-def load_config() -> Dict[str, Any]:
-    """Loads config data, utilizing modification time caching."""
-    global _CONFIG_CACHE, _CONFIG_MTIME_CACHE
+def load_config(file_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads config data, utilizing modification time caching. The file is
+    searched for unless a path is given. The same dict is returned for as
+    long as the file is unchanged.
+    """
+    global _CONFIG_CACHE, _CONFIG_MTIME_CACHE, _CONFIG_FILE_CACHE
 
-    file_path = find_config_file()
+    if file_path is None:
+        file_path = find_config_file()
 
     if not file_path:
         print(f"Warning: Configuration file '{CONFIG_FILENAME}' not found. Using defaults.")
@@ -81,7 +89,8 @@ def load_config() -> Dict[str, Any]:
         print(f"Warning: Configuration file '{file_path}' is inaccessible. Using defaults.")
         return {}
 
-    if _CONFIG_CACHE and current_mtime == _CONFIG_MTIME_CACHE:
+    if (_CONFIG_CACHE and current_mtime == _CONFIG_MTIME_CACHE
+            and file_path == _CONFIG_FILE_CACHE):
         print(f"INFO: Loaded configuration from cache (mtime check successful).")
         return _CONFIG_CACHE
 
@@ -89,6 +98,7 @@ def load_config() -> Dict[str, Any]:
 
     _CONFIG_CACHE = config
     _CONFIG_MTIME_CACHE = current_mtime
+    _CONFIG_FILE_CACHE = file_path
     print(f"INFO: Loaded configuration from: {file_path}")
 
     return config
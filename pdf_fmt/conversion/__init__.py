@@ -1,108 +1,528 @@
+import os
+import json
+import shutil
+import platform
+import tempfile
+import threading
 import subprocess
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Dict, Any, IO, NamedTuple, Optional, List, Tuple
 
-_TOOL_CACHE: Optional[str] = None
+DEFAULT_MAX_INSTANCES = 2
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_TIMEOUT = 120
 
+# Each LibreOffice instance gets its own profile under the cache directory.
+# Instances sharing a profile refuse to run side by side, and a persistent
+# profile skips the first-start setup on later runs. A profile is locked
+# while in use, so other pdf-fmt processes pick a different one.
+PROFILE_DIR_NAME = "libreoffice"
 
-def find_conversion_tool() -> Optional[str]:
+# Conversion tools found on PATH are recorded here, in the cache directory
+REGISTRY_FILENAME = "tools.json"
+REGISTRY_FORMAT_VERSION = 1
+
+# Candidate executables in order of preference, with the kind of tool each is
+TOOL_NAMES = (
+    ('soffice', 'libreoffice'), ('libreoffice', 'libreoffice'),
+    ('lowriter', 'libreoffice'), ('swriter', 'libreoffice'), ('pandoc', 'pandoc'),
+)
+
+# Input extensions each kind of tool can convert to PDF
+TOOL_FORMATS = {
+    'libreoffice': frozenset({
+        'doc', 'docx', 'docm', 'dot', 'dotx', 'odt', 'ott', 'rtf', 'txt', 'wpd',
+        'ppt', 'pptx', 'pps', 'ppsx', 'odp', 'otp', 'key',
+        'xls', 'xlsx', 'xlsm', 'ods', 'ots', 'csv', 'odg', 'vsd', 'vsdx',
+        'html', 'htm', 'epub',
+    }),
+    'pandoc': frozenset({
+        'md', 'markdown', 'rst', 'tex', 'latex', 'org', 'textile', 'ipynb',
+        'docx', 'odt', 'epub', 'rtf', 'html', 'htm', 'txt', 'typ',
+    }),
+}
+
+
+class ConversionTool(NamedTuple):
+    name: str
+    path: str
+    version: str
+    kind: str
+
+    def handles(self, extension: str) -> bool:
+        return extension in TOOL_FORMATS[self.kind]
+
+
+_TOOLS: Optional[List[ConversionTool]] = None
+
+
+def _registry_path() -> str:
+    from pdf_fmt.cache import get_cache_dir
+
+    return os.path.join(get_cache_dir(), REGISTRY_FILENAME)
+
+
+def _load_registry() -> Dict[str, Any]:
+    try:
+        with open(_registry_path(), 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(registry, dict) or registry.get("format") != REGISTRY_FORMAT_VERSION:
+        return {}
+    tools = registry.get("tools")
+    return tools if isinstance(tools, dict) else {}
+
+
+def _save_registry(tools: Dict[str, Any]) -> None:
+    path = _registry_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"format": REGISTRY_FORMAT_VERSION, "tools": tools}, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: Could not write the conversion tool registry: {e}")
+
+
+def _probe_version(path: str) -> Optional[str]:
+    """Runs '<tool> --version'. Returns its first line, or None if it fails."""
+    try:
+        result = subprocess.run(
+            [path, '--version'],
+            check=True,
+            capture_output=True,
+            timeout=5
+        )
+    except (
+        subprocess.CalledProcessError, OSError, subprocess.TimeoutExpired
+    ):
+        return None
+    lines = result.stdout.decode('utf-8', 'replace').strip().splitlines()
+    return lines[0] if lines else ""
+
+
+def discover_tools() -> List[ConversionTool]:
     """
-    Finds an available conversion tool (LibreOffice or Pandoc).
-    Checks environment flags and caches the result.
+    Finds the usable conversion tools, at most one of each kind. Results are
+    kept in a registry in the cache directory, keyed on the resolved path and
+    mtime of each executable, so '--version' only runs again after a tool
+    was installed, upgraded or moved. Delete the registry to force a check.
     """
-    global _TOOL_CACHE
-    if _TOOL_CACHE is not None:
-        return _TOOL_CACHE
+    global _TOOLS
+    if _TOOLS is not None:
+        return _TOOLS
 
-    tools_to_check = ['soffice', 'libreoffice', 'lowriter',
-                      'swriter', 'pandoc']
+    registry = _load_registry()
+    changed = False
+    tools: List[ConversionTool] = []
+    found_kinds = set()
 
-    for tool in tools_to_check:
+    for name, kind in TOOL_NAMES:
+        if kind in found_kinds:
+            continue
+        # Looking the executable up on PATH is cheap, unlike starting it
+        path = shutil.which(name)
+        if not path:
+            continue
+        real_path = os.path.realpath(path)
         try:
-            # We only need to check if the binary exists and is executable
-            subprocess.run(
-                [tool, '--version'],
-                check=True,
-                capture_output=True,
-                timeout=5
-            )
-            _TOOL_CACHE = tool
-            return tool
-        except (
-            subprocess.CalledProcessError,
-            FileNotFoundError, subprocess.TimeoutExpired
-        ):
+            mtime = os.stat(real_path).st_mtime_ns
+        except OSError:
             continue
 
-    return None
+        entry = registry.get(name)
+        if not (isinstance(entry, dict) and entry.get("path") == real_path
+                and entry.get("mtime") == mtime and entry.get("kind") == kind):
+            entry = {"path": real_path, "mtime": mtime, "kind": kind,
+                     "version": _probe_version(path)}
+            registry[name] = entry
+            changed = True
+
+        # A version of None records a tool that is present but broken
+        if entry.get("version") is not None:
+            tools.append(ConversionTool(name, path, str(entry["version"]), kind))
+            found_kinds.add(kind)
+
+    if changed:
+        _save_registry(registry)
+
+    _TOOLS = tools
+    return tools
 
 
-def convert_to_pdf(input_path: str, supported_formats: List[str]) -> Tuple[Optional[str], bool]:
+def find_conversion_tool(
+    extension: Optional[str] = None,
+    preferred: Optional[Dict[str, Any]] = None
+) -> Optional[ConversionTool]:
     """
-    Converts a supported file to PDF.
-    Returns (path_to_pdf, was_converted).
+    Returns the tool that converts files with the given extension, or the
+    first tool found if no extension is given. 'preferred' maps extensions
+    to a tool kind to use ahead of the default order.
     """
-    src = Path(input_path).resolve()
+    tools = discover_tools()
+    if extension is None:
+        return tools[0] if tools else None
+
+    candidates = [tool for tool in tools if tool.handles(extension)]
+    wanted = (preferred or {}).get(extension)
+    for tool in candidates:
+        if tool.kind == wanted or tool.name == wanted:
+            return tool
+    return candidates[0] if candidates else None
 
-    if src.suffix.lower() == '.pdf':
-        return str(src), False
 
+def _get_int_setting(conv_cfg: Dict[str, Any], key: str, default: int) -> int:
+    value = conv_cfg.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        print(f"Warning: 'conversion.{key}' in config must be a positive integer. Defaulting to {default}.")
+        return default
+    return value
+
+
+def _check_source(src: Path, supported_formats: List[str]) -> bool:
     if src.suffix.lstrip('.').lower() not in supported_formats:
         print(f"Error: Format {src.suffix} not in supported list: {supported_formats}")
-        return None, False
+        return False
+    return True
 
-    tool = find_conversion_tool()
-    if not tool:
-        print("Error: No conversion tool found (LibreOffice or Pandoc).")
-        return None, False
 
-    # Prepare output path
-    output_dir = src.parent
-    target_pdf = output_dir / f"{src.stem}.pdf"
+def _new_output_dir() -> str:
+    return tempfile.mkdtemp(prefix="pdf-fmt-convert-")
 
-    # Avoid overwriting existing PDFs by incrementing filename
-    counter = 0
-    while target_pdf.exists():
-        counter += 1
-        target_pdf = output_dir / f"{src.stem}_{counter}.pdf"
 
-    cmd: List[str] = []
+def _lock_file(path: str) -> Optional[IO[bytes]]:
+    """
+    Opens path and takes an exclusive lock on it without waiting. Returns
+    the open file, which holds the lock until it is closed, or None if
+    another process holds it.
+    """
+    lock = open(path, 'a+b')
+    try:
+        if platform.system() == 'Windows':
+            import msvcrt
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
 
-    is_libreoffice = any(name in tool for name in
-                         ['soffice', 'libreoffice', 'writer'])
 
-    if is_libreoffice:
-        cmd = [tool, '--headless', '--convert-to', 'pdf',
-               str(src), '--outdir', str(output_dir)]
-    elif tool == 'pandoc':
-        cmd = [tool, str(src), '-o', str(target_pdf)]
+def _is_complete_pdf(path: Path) -> bool:
+    """Whether a PDF was written to the end, judged by its trailer."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(max(0, path.stat().st_size - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
 
+def remove_converted(pdf_path: str) -> None:
+    """Removes a PDF created by conversion, and its directory once empty."""
+    os.remove(pdf_path)
     try:
-        print(f"INFO: Converting {src.name} via {tool}...")
+        os.rmdir(os.path.dirname(pdf_path))
+    except OSError:
+        pass
+
+
+class LibreOfficePool:
+    """
+    Converts documents with a bounded number of headless LibreOffice
+    instances. Each instance converts a whole batch of files per launch, so
+    the multi-second startup is paid once per batch rather than once per
+    file.
+    """
+
+    def __init__(
+        self,
+        tool: ConversionTool,
+        max_instances: int = DEFAULT_MAX_INSTANCES,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        timeout: int = DEFAULT_TIMEOUT
+    ):
+        from pdf_fmt.cache import get_cache_dir
+
+        self.tool = tool
+        self.max_instances = max_instances
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.profile_root = os.path.join(get_cache_dir(), PROFILE_DIR_NAME)
+        self._held: Dict[int, IO[bytes]] = {}
+        self._slot_lock = threading.Lock()
+
+    def _profile_uri(self, slot: int) -> str:
+        profile_dir = Path(self.profile_root, f"profile-{slot}")
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        return profile_dir.resolve().as_uri()
+
+    def _acquire_slot(self) -> int:
+        """
+        Locks the lowest numbered profile that neither this pool nor another
+        process is using. The lock files sit next to the profiles, which
+        LibreOffice owns.
+        """
+        os.makedirs(self.profile_root, exist_ok=True)
+        with self._slot_lock:
+            slot = 0
+            while True:
+                if slot not in self._held:
+                    lock = _lock_file(os.path.join(self.profile_root, f"profile-{slot}.lock"))
+                    if lock is not None:
+                        self._held[slot] = lock
+                        return slot
+                slot += 1
+
+    def _release_slot(self, slot: int) -> None:
+        with self._slot_lock:
+            self._held.pop(slot).close()
+
+    def _make_batches(self, sources: List[Path]) -> List[List[int]]:
+        """
+        Groups source indices into batches. LibreOffice names its output
+        after the input stem, so a batch never holds two equal stems.
+        """
+        batches: List[List[int]] = []
+        stems: List[set] = []
+        for index, src in enumerate(sources):
+            stem = src.stem.lower()
+            for batch, batch_stems in zip(batches, stems):
+                if len(batch) < self.batch_size and stem not in batch_stems:
+                    batch.append(index)
+                    batch_stems.add(stem)
+                    break
+            else:
+                batches.append([index])
+                stems.append({stem})
+        return batches
+
+    def _convert_batch(self, sources: List[Path]) -> List[Optional[str]]:
+        """
+        Converts one batch with a single LibreOffice launch, into a new
+        temporary directory.
+        """
+        slot = self._acquire_slot()
+        out_dir = _new_output_dir()
+        try:
+            cmd = [self.tool.path, f"-env:UserInstallation={self._profile_uri(slot)}",
+                   '--headless', '--convert-to', 'pdf', '--outdir', out_dir]
+            cmd.extend(str(src) for src in sources)
+
+            try:
+                result = subprocess.run(
+                    cmd, capture_output=True,
+                    timeout=self.timeout * len(sources), check=False
+                )
+                if result.returncode != 0:
+                    print(f"Error: {self.tool.name} failed with code {result.returncode}")
+                timed_out = False
+            except subprocess.TimeoutExpired:
+                print("Error: Conversion timed out.")
+                timed_out = True
+
+            # Collect whatever was written, a failed file does not fail the batch.
+            # After a timeout the file being written when it was stopped is cut short.
+            converted: List[Optional[str]] = []
+            for src in sources:
+                output = Path(out_dir, f"{src.stem}.pdf")
+                if timed_out and output.exists() and not _is_complete_pdf(output):
+                    print(f"Error: Conversion of {src.name} was stopped before it finished.")
+                    output.unlink()
+                    converted.append(None)
+                elif output.exists():
+                    converted.append(str(output))
+                else:
+                    print(f"Error: Conversion finished but {output.name} was not found.")
+                    converted.append(None)
+        finally:
+            self._release_slot(slot)
+
+        if not any(converted):
+            shutil.rmtree(out_dir, ignore_errors=True)
+        return converted
+
+    def convert(self, sources: List[Path]) -> List[Optional[str]]:
+        """
+        Converts every source. Returns the PDF path of each source, or None
+        where the conversion failed.
+        """
+        results: List[Optional[str]] = [None] * len(sources)
+        batches = self._make_batches(sources)
+
+        for index in range(len(sources)):
+            print(f"INFO: Converting {sources[index].name} via {self.tool.name}...")
+
+        def run(batch: List[int]) -> None:
+            try:
+                converted = self._convert_batch([sources[i] for i in batch])
+            except Exception as e:
+                print(f"Error: Unexpected conversion failure: {e}")
+                return
+            for index, pdf_path in zip(batch, converted):
+                results[index] = pdf_path
+
+        if len(batches) == 1 or self.max_instances == 1:
+            for batch in batches:
+                run(batch)
+            return results
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.max_instances, len(batches))) as executor:
+            list(executor.map(run, batches))
+        return results
+
+
+def _get_libreoffice_pool(tool: ConversionTool, conv_cfg: Dict[str, Any]) -> LibreOfficePool:
+    return LibreOfficePool(
+        tool,
+        max_instances=_get_int_setting(conv_cfg, "max_instances", DEFAULT_MAX_INSTANCES),
+        batch_size=_get_int_setting(conv_cfg, "batch_size", DEFAULT_BATCH_SIZE),
+        timeout=_get_int_setting(conv_cfg, "timeout", DEFAULT_TIMEOUT),
+    )
+
+
+def _convert_with_pandoc(tool: ConversionTool, src: Path, timeout: int) -> Optional[str]:
+    target_pdf = Path(_new_output_dir(), f"{src.stem}.pdf")
+    try:
+        print(f"INFO: Converting {src.name} via {tool.name}...")
         result = subprocess.run(
-            cmd, capture_output=True,
-            timeout=120, check=False
+            [tool.path, str(src), '-o', str(target_pdf)],
+            capture_output=True, timeout=timeout, check=False
         )
 
         if result.returncode != 0:
-            print(f"Error: {tool} failed with code {result.returncode}")
-            return None, False
-
-        # Handle LibreOffice's lack of custom output filename support
-        if is_libreoffice:
-            default_output = output_dir / f"{src.stem}.pdf"
-            if default_output.exists() and default_output != target_pdf:
-                default_output.replace(target_pdf)
+            print(f"Error: {tool.name} failed with code {result.returncode}")
+            return None
 
         if target_pdf.exists():
-            return str(target_pdf), True
+            return str(target_pdf)
 
         print(f"Error: Conversion finished but {target_pdf.name} was not found.")
-        return None, False
 
     except subprocess.TimeoutExpired:
         print("Error: Conversion timed out.")
     except Exception as e:
         print(f"Error: Unexpected conversion failure: {e}")
 
-    return None, False
+    shutil.rmtree(target_pdf.parent, ignore_errors=True)
+    return None
+
+
+def conversion_key(src: Path, tool: ConversionTool) -> str:
+    """Key of a converted PDF: source bytes plus converter and version."""
+    from pdf_fmt.cache import hash_data, hash_file
+
+    return hash_data([hash_file(str(src)), tool.kind, tool.version])
+
+
+def _restore_cached(src: Path, data: bytes) -> str:
+    pdf_path = os.path.join(_new_output_dir(), f"{src.stem}.pdf")
+    with open(pdf_path, 'wb') as f:
+        f.write(data)
+    return pdf_path
+
+
+def _store_converted(cache: Any, key: str, pdf_path: str) -> None:
+    try:
+        with open(pdf_path, 'rb') as f:
+            cache.put(key, f.read())
+    except OSError as e:
+        print(f"Warning: Could not cache converted PDF: {e}")
+
+
+def convert_many(
+    input_paths: List[str],
+    supported_formats: List[str],
+    conv_cfg: Optional[Dict[str, Any]] = None,
+    cache: Optional[Any] = None
+) -> List[Tuple[Optional[str], bool]]:
+    """
+    Converts supported files to PDF, batching LibreOffice conversions.
+    Each format goes to the tool that handles it, so LibreOffice and Pandoc
+    can both be used in one run. Converted PDFs are written to temporary directories, and to the cache
+    if one is given, so unchanged documents are not converted again.
+    Returns (path_to_pdf, is_temporary) for each input, in order.
+    """
+    conv_cfg = conv_cfg if isinstance(conv_cfg, dict) else {}
+    results: List[Tuple[Optional[str], bool]] = [(None, False)] * len(input_paths)
+    pending: List[Tuple[int, Path]] = []
+
+    for index, input_path in enumerate(input_paths):
+        src = Path(input_path).resolve()
+        if src.suffix.lower() == '.pdf':
+            results[index] = (str(src), False)
+        elif _check_source(src, supported_formats):
+            pending.append((index, src))
+
+    if not pending:
+        return results
+
+    if not discover_tools():
+        print("Error: No conversion tool found (LibreOffice or Pandoc).")
+        return results
+
+    preferred = conv_cfg.get("preferred_tools")
+    tools: Dict[int, ConversionTool] = {}
+    for index, src in pending:
+        extension = src.suffix.lstrip('.').lower()
+        tool = find_conversion_tool(extension, preferred if isinstance(preferred, dict) else None)
+        if tool is None:
+            print(f"Error: No installed conversion tool handles {src.suffix} files.")
+        else:
+            tools[index] = tool
+    pending = [(index, src) for index, src in pending if index in tools]
+
+    keys: Dict[int, str] = {}
+    if cache is not None:
+        misses: List[Tuple[int, Path]] = []
+        for index, src in pending:
+            try:
+                keys[index] = conversion_key(src, tools[index])
+            except OSError as e:
+                print(f"Error: Could not read {src.name}: {e}")
+                continue
+            data = cache.get(keys[index])
+            if data is None:
+                misses.append((index, src))
+                continue
+            print(f"INFO: Loaded converted {src.name} from cache.")
+            results[index] = (_restore_cached(src, data), True)
+        pending = misses
+
+    if not pending:
+        return results
+
+    for tool in dict.fromkeys(tools[index] for index, _ in pending):
+        group = [(index, src) for index, src in pending if tools[index] == tool]
+        if tool.kind == 'libreoffice':
+            pool = _get_libreoffice_pool(tool, conv_cfg)
+            converted = pool.convert([src for _, src in group])
+        else:
+            timeout = _get_int_setting(conv_cfg, "timeout", DEFAULT_TIMEOUT)
+            converted = [_convert_with_pandoc(tool, src, timeout) for _, src in group]
+
+        for (index, _), pdf_path in zip(group, converted):
+            if pdf_path:
+                results[index] = (pdf_path, True)
+                if index in keys:
+                    _store_converted(cache, keys[index], pdf_path)
+    return results
+
+
+def convert_to_pdf(
+    input_path: str,
+    supported_formats: List[str],
+    conv_cfg: Optional[Dict[str, Any]] = None,
+    cache: Optional[Any] = None
+) -> Tuple[Optional[str], bool]:
+    """
+    Converts a supported file to PDF.
+    Returns (path_to_pdf, is_temporary).
+    """
+    return convert_many([input_path], supported_formats, conv_cfg, cache)[0]
@@ -1,9 +1,10 @@
 import re
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Tuple
 
 NBSP = '\u00A0'
 DEFAULT_CHARS_REGEX = r"[a-zA-Z0-9\s!\"#$%&'()*+,-./:;<=>?@\[\\\]^_`{|}~]+"
 DEFAULT_CONVERT_FORMATS = ['pptx', 'ppt', 'doc', 'docx', 'odt']
+DEFAULT_IMAGE_TIMEOUT = 120
 NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z]')
 
 CompiledFilters = Dict[str, Callable[[str], Any]]
@@ -109,12 +110,8 @@ def split_fmt_line(line: str, max_len: int, enforce_cap: bool) -> List[str]:
     return pieces
 
 
-def post_process_content(lines: List[str], config: Dict[str, Any]) -> str:
-    """
-    Applies final formatting rules and multiple regex enclosures to the
-    combined content.
-    """
-    processed_lines: List[str] = []
+def get_enclosure_configs(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reads and validates the 'regex_enclosures' list from the config."""
     enclosure_skip_warn: str = """
     Warning: 'regex_enclosures' in config is not a list.
     Skipping enclosure processing.
@@ -127,21 +124,133 @@ def post_process_content(lines: List[str], config: Dict[str, Any]) -> str:
         print(enclosure_skip_warn)
         enclosure_configs = []
 
-    for line in lines:
-        temp_line = line
+    return enclosure_configs
+
 
+class EnclosureEngine:
+    """
+    Applies every configured regex enclosure in a single scan. Patterns are
+    compiled once into one alternation: the leftmost match wins, and of
+    matches starting at the same position, the entry listed first in the
+    config wins. Wrapped text is not matched again.
+
+    When no pattern can span or depend on line breaks, all lines are scanned
+    as one text. Patterns with backreferences, named groups or inline flags
+    cannot share the alternation; the enclosures are then applied one after
+    another as before.
+    """
+
+    def __init__(self, enclosure_configs: List[Dict[str, Any]], engine: str = "re"):
+        from pdf_fmt.filter import (
+            is_line_local, can_share_alternation, uses_line_anchors
+        )
+
+        entries: List[Tuple[re.Pattern, str]] = []
         for item in enclosure_configs:
-            enclosure_pattern = item.get("pattern")
-            enclosure_wrapper = item.get("wrapper")
+            if not isinstance(item, dict):
+                continue
+            pattern, wrapper = item.get("pattern"), item.get("wrapper")
+            if not pattern or not wrapper:
+                continue
+            try:
+                entries.append((re.compile(pattern, re.IGNORECASE), str(wrapper)))
+            except re.error as e:
+                print(f"""Warning: Invalid enclosure regex pattern '{pattern}' skipped
+Error: {e}
+""")
 
-            if enclosure_pattern and enclosure_wrapper:
-                temp_line = apply_regex_enclosure(temp_line,
-                                                  enclosure_pattern,
-                                                  enclosure_wrapper)
+        self.sequential = not all(can_share_alternation(p) for p, _ in entries)
+        self.whole_text = (not self.sequential and bool(entries)
+                           and all(is_line_local(p) for p, _ in entries))
+        self._steps = self._build_steps(entries, engine, self.whole_text)
+
+        # In one text, ^ and $ also match at the line breaks inside an
+        # element, such as the page separator, which a single line does not
+        # have. Such elements are scanned one at a time without them.
+        self._anchored = self.whole_text and any(uses_line_anchors(p) for p, _ in entries)
+        self._line_steps = (self._build_steps(entries, engine, False)
+                            if self._anchored else self._steps)
+
+    def _build_steps(self, entries: List[Tuple[re.Pattern, str]], engine: str,
+                     whole_text: bool) -> List[Tuple[Any, Any]]:
+        from pdf_fmt.filter import compile_user_pattern
+
+        if self.sequential:
+            return [(compile_user_pattern(pattern, engine), _wrap_template(wrapper))
+                    for pattern, wrapper in entries]
+        if len(entries) == 1:
+            pattern, wrapper = entries[0]
+            return [(compile_user_pattern(_for_scan(pattern, whole_text), engine),
+                     _wrap_template(wrapper))]
+        if entries:
+            return [self._combine(entries, engine, whole_text)]
+        return []
+
+    def _combine(self, entries: List[Tuple[re.Pattern, str]], engine: str,
+                 whole_text: bool) -> Tuple[Any, Any]:
+        from pdf_fmt.filter import compile_user_pattern, rewrite_pattern
+
+        # Each entry is wrapped in one outer group. That group closes last,
+        # so match.lastindex identifies which entry matched.
+        wrappers: Dict[int, str] = {}
+        sources: List[str] = []
+        group_index = 1
+        for pattern, wrapper in entries:
+            pattern = rewrite_pattern(pattern)
+            wrappers[group_index] = wrapper
+            sources.append(f"({pattern.pattern})")
+            group_index += pattern.groups + 1
+
+        flags = re.IGNORECASE | (re.MULTILINE if whole_text else 0)
+        combined = compile_user_pattern(re.compile("|".join(sources), flags), engine)
+
+        def wrap(match: re.Match) -> str:
+            wrapper = wrappers[match.lastindex]
+            return f"{wrapper}{match.group(0)}{wrapper}"
+
+        return combined, wrap
+
+    def apply_line(self, line: str) -> str:
+        for pattern, replacement in self._line_steps:
+            line = pattern.sub(replacement, line)
+        return line
 
-        processed_lines.append(temp_line)
+    def apply(self, lines: List[str]) -> str:
+        """Returns the lines joined by newlines with all enclosures applied."""
+        if not self._steps:
+            return "\n".join(lines)
+        if self.whole_text and not (self._anchored and any("\n" in line for line in lines)):
+            text = "\n".join(lines)
+            for pattern, replacement in self._steps:
+                text = pattern.sub(replacement, text)
+            return text
+        return "\n".join([self.apply_line(line) for line in lines])
 
-    return "\n".join(processed_lines)
+
+def _wrap_template(wrapper: str) -> str:
+    """Replacement template wrapping the whole match, with the wrapper escaped."""
+    escaped = wrapper.replace("\\", "\\\\")
+    return f"{escaped}\\g<0>{escaped}"
+
+
+def _for_scan(pattern: re.Pattern, whole_text: bool) -> re.Pattern:
+    if not whole_text:
+        return pattern
+    return re.compile(pattern.pattern, pattern.flags | re.MULTILINE)
+
+
+def build_enclosure_engine(config: Dict[str, Any]) -> EnclosureEngine:
+    """Compiles the configured enclosures once for a run."""
+    engine = config.get("filters", {}).get("regex_engine", "re")
+    return EnclosureEngine(get_enclosure_configs(config), engine)
+
+
+def post_process_content(lines: List[str], config: Dict[str, Any]) -> str:
+    """
+    Applies final formatting rules and multiple regex enclosures to the
+    combined content.
+    """
+    return build_enclosure_engine(config).apply(lines)
 
 
 def ln_cont_factory(allowed_chars_pattern: re.Pattern) -> Callable[[str], str]:
@@ -0,0 +1,595 @@
+"""
+User regex compilation and footer matching
+"""
+
+import re
+import string
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:  # Python 3.11+
+    import re._parser as sre_parse
+    import re._compiler as sre_compile
+except ImportError:
+    import sre_parse  # type: ignore[no-redef]
+    import sre_compile  # type: ignore[no-redef]
+
+REGEX_ENGINES = ("re", "re2")
+RE2_ERROR = "Warning: 'regex_engine: re2' requires the google-re2 package. Run: pip install google-re2."
+DEFAULT_MATCH_BUDGET_MS = 1000
+
+# Required literals shorter than this reject too few lines to be worth it
+MIN_PREFILTER_LITERAL = 3
+# Past this many literals, candidates are looked up by their first trigram
+LITERAL_INDEX_THRESHOLD = 128
+LITERAL_INDEX_WIDTH = 3
+
+_ANY_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+_LINE_STARTS = (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING)
+_LINE_ENDS = (sre_parse.AT_END, sre_parse.AT_END_STRING)
+_GROUP_REFS = (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS)
+_SINGLE_CHAR_OPS = (sre_parse.ANY, sre_parse.IN, sre_parse.LITERAL, sre_parse.NOT_LITERAL)
+_INLINE_FLAGS = re.compile(r'\(\?[aiLmsux]+\)')
+
+# `.*` next to another single character repeat, e.g. `.*\s*` or `\d+.*`.
+# The extra repeat adds nothing to what matches but multiplies backtracking.
+_SINGLE_CHAR = r'(?:\\[sSdDwW]|\[\^?\]?(?:\\.|[^\]\\])*\]|\.)'
+_REDUNDANT_AFTER_ANY = re.compile(
+    r'(?<!\\)((?:\\\\)*\.\*)(' + _SINGLE_CHAR + r')([*+])(?![?+*{])'
+)
+_REDUNDANT_BEFORE_ANY = re.compile(
+    r'(?<!\\)((?:\\\\)*)(' + _SINGLE_CHAR + r')([*+])(\.\*)(?![?+])'
+)
+# Characters used to decide whether two single character repeats overlap
+_PROBE_CHARS = [c for c in string.printable if c != "\n"] + [" ", "é", "É"]
+
+
+def _parse(pattern: re.Pattern) -> Optional[Any]:
+    try:
+        return sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+
+
+def _is_any_run(item: Tuple[Any, Any]) -> bool:
+    """True for `.*` or `.*?`."""
+    op, av = item
+    if op not in _ANY_REPEATS:
+        return False
+    low, high, body = av
+    return low == 0 and high == sre_parse.MAXREPEAT and \
+        len(body) == 1 and body[0][0] == sre_parse.ANY
+
+
+def _literal_run(items: List[Tuple[Any, Any]]) -> str:
+    if not items or any(op != sre_parse.LITERAL for op, _ in items):
+        return ""
+    return "".join(chr(av) for _, av in items)
+
+
+def _contained_literal(parsed: Any) -> Optional[str]:
+    """
+    Returns LIT for patterns shaped like `^.*LIT.*$`, which only ask whether
+    a line contains LIT. The `$` is only accepted after a trailing `.*`.
+    """
+    items = list(parsed)
+    if items and items[0][0] == sre_parse.AT and items[0][1] in _LINE_STARTS:
+        items = items[1:]
+    if not items or not _is_any_run(items[0]):
+        return None
+    items = items[1:]
+
+    if items and items[-1][0] == sre_parse.AT and items[-1][1] in _LINE_ENDS:
+        items = items[:-1]
+        if not items or not _is_any_run(items[-1]):
+            return None
+    if items and _is_any_run(items[-1]):
+        items = items[:-1]
+
+    literal = _literal_run(items)
+    return literal if literal and literal.isascii() else None
+
+
+def _required_literal(parsed: Any) -> Optional[str]:
+    """Returns the longest run of top level literals every match contains."""
+    best, run = "", ""
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            run += chr(av)
+            best = max(best, run, key=len)
+        else:
+            run = ""
+    if len(best) < MIN_PREFILTER_LITERAL or not best.isascii():
+        return None
+    return best.lower()
+
+
+def _has_group_refs(node: Any) -> bool:
+    if isinstance(node, sre_parse.SubPattern):
+        return any(op in _GROUP_REFS or _has_group_refs(av) for op, av in node)
+    if isinstance(node, (tuple, list)):
+        return any(_has_group_refs(value) for value in node)
+    return False
+
+
+def _is_mergeable(pattern: re.Pattern, parsed: Any) -> bool:
+    """
+    Patterns can share one alternation unless they depend on their own group
+    numbering or names, or carry inline flags of their own.
+    """
+    return (not _INLINE_FLAGS.match(pattern.pattern)
+            and not parsed.state.groupdict
+            and not _has_group_refs(parsed))
+
+
+# --- Backtracking analysis ---
+
+def _tree(node: Any) -> Any:
+    """Plain nested tuples for a parsed pattern, so two trees can be compared."""
+    if isinstance(node, sre_parse.SubPattern):
+        return ("seq", tuple((op, _tree(av)) for op, av in node))
+    if isinstance(node, (tuple, list)):
+        return tuple(_tree(value) for value in node)
+    return node
+
+
+def _is_single_char_run(op: Any, av: Any) -> bool:
+    if op != sre_parse.MAX_REPEAT:
+        return False
+    low, high, body = av
+    return low in (0, 1) and high == sre_parse.MAXREPEAT and \
+        len(body[1]) == 1 and body[1][0][0] in _SINGLE_CHAR_OPS
+
+
+def _is_greedy_any_run(op: Any, av: Any) -> bool:
+    return op == sre_parse.MAX_REPEAT and av[0] == 0 and \
+        av[1] == sre_parse.MAXREPEAT and av[2] == ("seq", ((sre_parse.ANY, None),))
+
+
+def _drop_redundant_repeats(node: Any) -> Any:
+    """
+    Tree form of the textual rewrite: next to a greedy `.*`, `X*` is dropped
+    and `X+` becomes `X`.
+    """
+    if not isinstance(node, tuple):
+        return node
+    if len(node) == 2 and node[0] == "seq":
+        items: List[Tuple[Any, Any]] = []
+        for op, av in node[1]:
+            av = _drop_redundant_repeats(av)
+            if items and _is_greedy_any_run(*items[-1]) and _is_single_char_run(op, av):
+                if av[0] == 1:
+                    items.append(av[2][1][0])
+                continue
+            if _is_greedy_any_run(op, av):
+                while items and _is_single_char_run(*items[-1]):
+                    low, _, body = items.pop()[1]
+                    if low == 1:
+                        items.append(body[1][0])
+                        break
+            items.append((op, av))
+        return ("seq", tuple(items))
+    return tuple(_drop_redundant_repeats(value) for value in node)
+
+
+def rewrite_pattern(pattern: re.Pattern) -> re.Pattern:
+    """
+    Rewrites `.*\\s*`, `\\d+.*`, `.*[a-z]+` and similar shapes so `.*` is the
+    only repeat at that point. For single lines (no newlines) the rewritten
+    pattern matches the same text, but without the quadratic backtracking on
+    long space-padded lines. Returns the pattern unchanged when the rewrite
+    cannot be verified against the parsed pattern.
+    """
+    source = pattern.pattern
+    if not isinstance(source, str):
+        return pattern
+
+    def replace_after(match: re.Match) -> str:
+        return match.group(1) if match.group(3) == "*" else match.group(1) + match.group(2)
+
+    def replace_before(match: re.Match) -> str:
+        kept = "" if match.group(3) == "*" else match.group(2)
+        return match.group(1) + kept + match.group(4)
+
+    rewritten = source
+    while True:
+        updated = _REDUNDANT_AFTER_ANY.sub(replace_after, rewritten)
+        updated = _REDUNDANT_BEFORE_ANY.sub(replace_before, updated)
+        if updated == rewritten:
+            break
+        rewritten = updated
+    if rewritten == source:
+        return pattern
+
+    try:
+        original_tree = _drop_redundant_repeats(_tree(sre_parse.parse(source, pattern.flags)))
+        if original_tree != _tree(sre_parse.parse(rewritten, pattern.flags)):
+            return pattern
+        return re.compile(rewritten, pattern.flags)
+    except Exception:
+        return pattern
+
+
+def _char_matcher(body: Any, flags: int) -> Optional[Callable[[str], Any]]:
+    try:
+        return sre_compile.compile(body, flags).fullmatch
+    except Exception:
+        return None
+
+
+def _repeats_overlap(first: Any, second: Any, flags: int) -> bool:
+    first_match, second_match = _char_matcher(first, flags), _char_matcher(second, flags)
+    if first_match is None or second_match is None:
+        return True
+    return any(first_match(c) and second_match(c) for c in _PROBE_CHARS)
+
+
+def _subpatterns(av: Any) -> List[Any]:
+    """Nested patterns of a group, branch, assertion or conditional."""
+    if isinstance(av, sre_parse.SubPattern):
+        return [av]
+    if isinstance(av, (tuple, list)):
+        return [p for value in av for p in _subpatterns(value)]
+    return []
+
+
+def _find_risk(node: Any, flags: int, in_repeat: bool) -> Optional[str]:
+    previous_run = None
+    for op, av in node:
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, high, body = av
+            unbounded = high == sre_parse.MAXREPEAT
+            if unbounded and in_repeat:
+                return "nested repeats"
+            if unbounded and len(body) == 1 and body[0][0] in _SINGLE_CHAR_OPS:
+                if previous_run is not None and _repeats_overlap(previous_run, body, flags):
+                    return "adjacent repeats over the same characters"
+                previous_run = body
+            elif low > 0:
+                previous_run = None
+            risk = _find_risk(body, flags, in_repeat or unbounded)
+        else:
+            previous_run = None
+            risk = None
+            for child in _subpatterns(av):
+                risk = risk or _find_risk(child, flags, in_repeat)
+        if risk:
+            return risk
+    return None
+
+
+def backtracking_risk(pattern: re.Pattern) -> Optional[str]:
+    """
+    Describes why a pattern may backtrack catastrophically on long lines,
+    or returns None. Flags nested unbounded repeats such as `(\\w+\\s?)*` and
+    adjacent unbounded repeats over shared characters such as `\\s*\\s*`.
+    """
+    parsed = _parse(pattern)
+    if parsed is None:
+        return None
+    return _find_risk(parsed, pattern.flags, False)
+
+
+def _matches_newline(op: Any, av: Any, state: Any, flags: int) -> bool:
+    matcher = _char_matcher(sre_parse.SubPattern(state, [(op, av)]), flags)
+    return matcher is None or matcher("\n") is not None
+
+
+def _is_line_local_tree(node: Any, state: Any, flags: int) -> bool:
+    for op, av in node:
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            return False
+        if op == sre_parse.AT and av in (sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING):
+            return False
+        if op in _SINGLE_CHAR_OPS:
+            if _matches_newline(op, av, state, flags):
+                return False
+            continue
+        if not all(_is_line_local_tree(child, state, flags) for child in _subpatterns(av)):
+            return False
+    return True
+
+
+def is_line_local(pattern: re.Pattern) -> bool:
+    """
+    True when a pattern cannot tell a single line from a line inside a
+    larger text compiled with re.MULTILINE: it never matches a newline or
+    an empty string, and has no lookarounds or \\A / \\Z anchors.
+    """
+    parsed = _parse(pattern)
+    if parsed is None or parsed.getwidth()[0] == 0:
+        return False
+    return _is_line_local_tree(parsed, parsed.state, pattern.flags)
+
+
+def _has_line_anchors(node: Any) -> bool:
+    for op, av in node:
+        if op == sre_parse.AT and av in (sre_parse.AT_BEGINNING, sre_parse.AT_END):
+            return True
+        if any(_has_line_anchors(child) for child in _subpatterns(av)):
+            return True
+    return False
+
+
+def uses_line_anchors(pattern: re.Pattern) -> bool:
+    """
+    True when a pattern has ^ or $, which with re.MULTILINE also match at
+    line breaks inside a single element of the text.
+    """
+    parsed = _parse(pattern)
+    return parsed is not None and _has_line_anchors(parsed)
+
+
+def can_share_alternation(pattern: re.Pattern) -> bool:
+    """True when a pattern can be one branch of a combined alternation."""
+    parsed = _parse(pattern)
+    return parsed is not None and _is_mergeable(pattern, parsed)
+
+
+# --- Engines ---
+
+_RE2_MODULE: Any = None
+
+
+def load_re2() -> Optional[Any]:
+    """Imports google-re2 on first use, or returns None when it is missing."""
+    global _RE2_MODULE
+    if _RE2_MODULE is None:
+        try:
+            import re2
+            _RE2_MODULE = re2
+        except ImportError:
+            _RE2_MODULE = False
+    return _RE2_MODULE or None
+
+
+def _compile_re2(pattern: re.Pattern) -> Optional[Any]:
+    """
+    Compiles a pattern with RE2, which matches in linear time. Returns None
+    for flags or syntax RE2 does not support, e.g. backreferences.
+    """
+    re2 = load_re2()
+    if re2 is None or not isinstance(pattern.pattern, str):
+        return None
+    if pattern.flags & ~(re.IGNORECASE | re.MULTILINE | re.UNICODE):
+        return None
+
+    options = re2.Options()
+    options.case_sensitive = not pattern.flags & re.IGNORECASE
+    options.log_errors = False
+    source = pattern.pattern
+    if pattern.flags & re.MULTILINE:
+        source = "(?m)" + source
+    try:
+        return re2.compile(source, options)
+    except re2.error:
+        return None
+
+
+def compile_user_pattern(pattern: re.Pattern, engine: str = "re") -> Any:
+    """
+    Returns the object used to run a user supplied pattern: an RE2 regex when
+    that engine is selected and supports the pattern, otherwise the pattern
+    with redundant repeats rewritten.
+    """
+    if engine == "re2":
+        compiled = _compile_re2(pattern)
+        if compiled is not None:
+            return compiled
+    return rewrite_pattern(pattern)
+
+
+def validate_regex_engine(engine: Any) -> str:
+    """Checks the configured engine, falling back to 're'."""
+    if engine not in REGEX_ENGINES:
+        print(f"Warning: Unknown regex_engine '{engine}'. Options: {', '.join(REGEX_ENGINES)}. Using 're'.")
+        return "re"
+    if engine == "re2" and load_re2() is None:
+        print(RE2_ERROR)
+        return "re"
+    return engine
+
+
+def report_risky_patterns(patterns: List[re.Pattern], engine: str) -> None:
+    """Warns about patterns that stay prone to backtracking under the engine."""
+    for pattern in patterns:
+        executable = compile_user_pattern(pattern, engine)
+        if not isinstance(executable, re.Pattern):
+            continue
+        risk = backtracking_risk(executable)
+        if risk:
+            print(f"Warning: Pattern '{pattern.pattern}' may backtrack heavily on long lines ({risk}).")
+
+
+# --- Footer matching ---
+
+class FooterMatcher:
+    """
+    Matches lines against all footer patterns at once. Returns the same
+    result as trying every pattern with `pattern.match` on the stripped line.
+
+    - `^.*LIT.*$` patterns become substring checks on the lowercased line,
+      indexed by trigram once there are many of them.
+    - Patterns with a required literal only run when the literal is present.
+    - The rest share a single alternation, unless that would change their
+      meaning, in which case they run one by one.
+
+    Substring checks are only used for ASCII lines, where lowercasing agrees
+    with the regex engine's case folding. Lines are expected without newlines.
+
+    Regex checks share a per page time budget. Time is only measured after a
+    match returns, so a single slow match is not interrupted: once a page
+    exceeds the budget, the slowest check is switched off for the rest of
+    that page with a warning.
+    """
+
+    def __init__(
+        self,
+        patterns: List[re.Pattern],
+        engine: str = "re",
+        budget_ms: float = 0
+    ):
+        literals: List[str] = []
+        self.gated: List[Tuple[str, re.Pattern]] = []
+        self.individual: List[re.Pattern] = []
+        mergeable: Dict[Tuple[int, bool], List[re.Pattern]] = {}
+
+        for pattern in patterns:
+            pattern = rewrite_pattern(pattern)
+            parsed = _parse(pattern)
+            if parsed is None:
+                self.individual.append(pattern)
+                continue
+
+            if pattern.flags & re.IGNORECASE:
+                literal = _contained_literal(parsed)
+                if literal is not None:
+                    literals.append(literal)
+                    continue
+
+                required = _required_literal(parsed)
+                if required is not None:
+                    self.gated.append((required, pattern))
+                    continue
+
+            if _is_mergeable(pattern, parsed):
+                # Patterns prone to backtracking get their own alternation,
+                # so the budget can switch them off without the others
+                risky = engine != "re2" and _find_risk(parsed, pattern.flags, False) is not None
+                mergeable.setdefault((pattern.flags, risky), []).append(pattern)
+            else:
+                self.individual.append(pattern)
+
+        self.merged: List[re.Pattern] = []
+        for (flags, _), group in mergeable.items():
+            self._merge(group, flags)
+
+        self.literals = [lit.lower() for lit in literals]
+        self._literal_search = None
+        if literals:
+            self._literal_search = re.compile(
+                "|".join(re.escape(lit) for lit in literals), re.IGNORECASE
+            )
+
+        self._literal_index: Optional[Dict[str, List[str]]] = None
+        if len(self.literals) >= LITERAL_INDEX_THRESHOLD:
+            self._build_literal_index()
+
+        # (literal prefilter, regex, label) in the order they are tried
+        self._checks: List[Tuple[Optional[str], Any, str]] = [
+            (literal, compile_user_pattern(p, engine), p.pattern) for literal, p in self.gated
+        ] + [
+            (None, compile_user_pattern(p, engine), p.pattern)
+            for p in self.merged + self.individual
+        ]
+
+        self._budget = budget_ms / 1000 if budget_ms and budget_ms > 0 else 0.0
+        self.start_page(0)
+
+    def _merge(self, group: List[re.Pattern], flags: int) -> None:
+        if len(group) == 1:
+            self.merged.append(group[0])
+            return
+        try:
+            self.merged.append(re.compile(
+                "|".join(f"(?:{p.pattern})" for p in group), flags
+            ))
+        except re.error:
+            self.individual.extend(group)
+
+    def _build_literal_index(self) -> None:
+        index: Dict[str, List[str]] = {}
+        short: List[str] = []
+        for literal in self.literals:
+            if len(literal) < LITERAL_INDEX_WIDTH:
+                short.append(literal)
+            else:
+                index.setdefault(literal[:LITERAL_INDEX_WIDTH], []).append(literal)
+        self._literal_index = index
+        self._short_literals = short
+        self._index_keys = frozenset(index)
+
+    def _contains_literal(self, lowered: str) -> bool:
+        if self._literal_index is None:
+            return any(literal in lowered for literal in self.literals)
+
+        if any(literal in lowered for literal in self._short_literals):
+            return True
+        width = LITERAL_INDEX_WIDTH
+        grams = {lowered[i:i + width] for i in range(len(lowered) - width + 1)}
+        index = self._literal_index
+        for gram in self._index_keys.intersection(grams):
+            if any(literal in lowered for literal in index[gram]):
+                return True
+        return False
+
+    def start_page(self, page_num: int) -> None:
+        """Starts a new page budget. Checks switched off earlier run again."""
+        self._page_num = page_num
+        self._spent = [0.0] * len(self._checks)
+        self._page_spent = 0.0
+        self._disabled: set = set()
+
+    def budget_exceeded(self) -> bool:
+        """Whether a check was switched off on the current page."""
+        return bool(self._disabled)
+
+    def _shed_slowest_check(self) -> None:
+        index = max(
+            (i for i in range(len(self._checks)) if i not in self._disabled),
+            key=lambda i: self._spent[i]
+        )
+        self._disabled.add(index)
+        self._page_spent = 0.0
+        print(f"Warning: Footer matching on page {self._page_num + 1} exceeded its "
+              f"{self._budget * 1000:.0f} ms budget. Skipping pattern "
+              f"'{self._checks[index][2]}' for the rest of the page.")
+
+    def _run_checks(self, cleaned_line: str, lowered: Optional[str]) -> bool:
+        budget = self._budget
+        disabled = self._disabled
+        for index, (literal, regex, _) in enumerate(self._checks):
+            if index in disabled:
+                continue
+            if literal is not None and lowered is not None and literal not in lowered:
+                continue
+            if not budget:
+                if regex.match(cleaned_line):
+                    return True
+                continue
+
+            start = time.perf_counter()
+            hit = regex.match(cleaned_line) is not None
+            elapsed = time.perf_counter() - start
+            self._spent[index] += elapsed
+            self._page_spent += elapsed
+            if self._page_spent > budget:
+                self._shed_slowest_check()
+            if hit:
+                return True
+        return False
+
+    def matches(self, line: str) -> bool:
+        cleaned_line = line.strip()
+        if not cleaned_line:
+            return False
+
+        lowered = None
+        if cleaned_line.isascii():
+            lowered = cleaned_line.lower()
+            if self.literals and self._contains_literal(lowered):
+                return True
+        elif self._literal_search is not None and self._literal_search.search(cleaned_line):
+            return True
+
+        return self._run_checks(cleaned_line, lowered)
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of patterns per matching strategy."""
+        return {
+            "literals": len(self.literals),
+            "gated": len(self.gated),
+            "merged": len(self.merged),
+            "individual": len(self.individual),
+        }
+
@@ -1,86 +1,113 @@
-from typing import List
-from pdf_fmt.spell import enforce_spelling
+from typing import List, Optional, Callable
+from pdf_fmt.spell import enforce_spelling, SpellingEngine
 from pdf_fmt.core import replace_successive_spaces
 import re
 
+CAMEL_CASE_PATTERN = re.compile(r'([a-z0-9])([A-Z])')
+# Whitespace runs and camel case boundaries in a single pass. The boundary
+# is zero width, so replacing it with a space splits "wordWord".
+SPACING_PATTERN = re.compile(r'\s{2,}|(?<=[a-z0-9])(?=[A-Z])')
+
+UNICODE_REPLACEMENTS = {
+    "\u2013": "-",
+    "\u2014": " -",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u2026": "...",
+    "\u00a0": " ",
+    "\u00bf": "?",
+    "\u00d7": "\\cdot",
+    "\u00f7": "/",
+    "\u00b1": "\\pm",
+    "\u2212": "-",
+    "\u2217": "*",
+    "\u2215": "/",
+    "\u221a": "\\sqrt",
+    "\u221e": "\\infty",
+    "\u2248": "\\approx",
+    "\u2260": "\\neq",
+    "\u2264": "\\leq",
+    "\u2265": "\\geq",
+
+    "\u2200": "\\forall",
+    "\u2203": "\\exists",
+    "\u2208": "\\in",
+    "\u2209": "\\notin",
+    "\u2211": "\\sum",
+    "\u2202": "\\partial",
+    "\u2206": "\\delta",
+    "\u2207": "\\nabla",
+    "\u222b": "\\int",
+    "\u2192": "\\rightarrow",
+    "\u2190": "\\leftarrow",
+    "\u21d2": "\\implies",
+    "\u21d4": "\\Longleftrightarrow",
+
+    "\u03b1": "\\alpha",
+    "\u03b2": "\\beta",
+    "\u03b3": "\\gamma",
+    "\u03b4": "\\delta",
+    "\u03b5": "\\epsilon",
+    "\u03bc": "\\mu",
+    "\u03c0": "\\pi",
+    "\u03c3": "\\sigma",
+    "\u03c4": "\\tau",
+    "\u03c6": "phi",
+    "\u03b8": "theta",
+    "\u03a9": "Omega",
+
+    "\u00b2": "[^2]",
+    "\u00b3": "[^3]",
+    "\u00b9": "[^1]",
+    "\u2070": "[^0]",
+    "\u2074": "[^4]",
+    "\u2075": "[^5]",
+    "\u2076": "[^6]",
+    "\u2077": "[^7]",
+    "\u2078": "[^8]",
+    "\u2079": "[^9]",
+
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+}
+UNICODE_TABLE = str.maketrans(UNICODE_REPLACEMENTS)
+
 
 def fix_spacing(text: str) -> str:
-    text = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', text)
+    text = CAMEL_CASE_PATTERN.sub(r'\1 \2', text)
     return text
 
 
 def replace_unicode_chars(line: str) -> str:
-    replacement_map = {
-        "\u2013": "-",
-        "\u2014": " -",
-        "\u201c": '"',
-        "\u201d": '"',
-        "\u2018": "'",
-        "\u2019": "'",
-        "\u2026": "...",
-        "\u00a0": " ",
-        "\u00bf": "?",
-        "\u00d7": "\\cdot",
-        "\u00f7": "/",
-        "\u00b1": "\\pm",
-        "\u2212": "-",
-        "\u2217": "*",
-        "\u2215": "/",
-        "\u221a": "\\sqrt",
-        "\u221e": "\\infty",
-        "\u2248": "\\approx",
-        "\u2260": "\\neq",
-        "\u2264": "\\leq",
-        "\u2265": "\\geq",
-
-        "\u2200": "\\forall",
-        "\u2203": "\\exists",
-        "\u2208": "\\in",
-        "\u2209": "\\notin",
-        "\u2211": "\\sum",
-        "\u2202": "\\partial",
-        "\u2206": "\\delta",
-        "\u2207": "\\nabla",
-        "\u222b": "\\int",
-        "\u2192": "\\rightarrow",
-        "\u2190": "\\leftarrow",
-        "\u21d2": "\\implies",
-        "\u21d4": "\\Longleftrightarrow",
-
-        "\u03b1": "\\alpha",
-        "\u03b2": "\\beta",
-        "\u03b3": "\\gamma",
-        "\u03b4": "\\delta",
-        "\u03b5": "\\epsilon",
-        "\u03bc": "\\mu",
-        "\u03c0": "\\pi",
-        "\u03c3": "\\sigma",
-        "\u03c4": "\\tau",
-        "\u03c6": "phi",
-        "\u03b8": "theta",
-        "\u03a9": "Omega",
-
-        "\u00b2": "[^2]",
-        "\u00b3": "[^3]",
-        "\u00b9": "[^1]",
-        "\u2070": "[^0]",
-        "\u2074": "[^4]",
-        "\u2075": "[^5]",
-        "\u2076": "[^6]",
-        "\u2077": "[^7]",
-        "\u2078": "[^8]",
-        "\u2079": "[^9]",
-
-        "\ufb00": "ff",
-        "\ufb01": "fi",
-        "\ufb02": "fl",
-        "\ufb03": "ffi",
-        "\ufb04": "ffl",
-    }
-
-    table = str.maketrans(replacement_map)
-
-    return line.translate(table)
+    # Every replaced character is non-ASCII, most lines are not
+    if line.isascii():
+        return line
+    return line.translate(UNICODE_TABLE)
+
+
+def normalize_spacing(line: str) -> str:
+    """Same result as fix_spacing(replace_successive_spaces(line))."""
+    return SPACING_PATTERN.sub(' ', line).strip()
+
+
+def line_normalizer_factory(allowed_chars_pattern: re.Pattern) -> Callable[[str], str]:
+    """
+    Creates a raw line normaliser that replaces unicode symbols and keeps
+    only the allowed characters (Closure).
+    """
+    findall = allowed_chars_pattern.findall
+    table = UNICODE_TABLE
+
+    def normalize_func(line: str) -> str:
+        if not line.isascii():
+            line = line.translate(table)
+        return " ".join(findall(line))
+    return normalize_func
 
 
 def clean_and_lint_text(text: str, locale: str, ignore_list: List[str]) -> str:
@@ -91,3 +118,16 @@ def clean_and_lint_text(text: str, locale: str, ignore_list: List[str]) -> str:
     text = replace_successive_spaces(text)
     text = fix_spacing(text)
     return text
+
+
+def clean_and_lint_lines(
+    lines: List[str],
+    engine: Optional[SpellingEngine]
+) -> List[str]:
+    """
+    Page level variant of clean_and_lint_text. Spelling is enforced on all
+    lines in one pass through the engine's memo.
+    """
+    if engine is not None:
+        lines = engine.enforce_lines(lines)
+    return [normalize_spacing(line) for line in lines]
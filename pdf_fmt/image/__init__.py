@@ -1,22 +1,60 @@
 import os
 import re
 import io
-import glob
+import sys
 import time
+import math
 import base64
+import signal
 import multiprocessing
+from collections import Counter
 
 from PIL import Image
-from typing import Optional, List, Tuple
+from typing import Dict, NamedTuple, Optional, List, Tuple
 
 import pdfplumber
 
-COMPLEX_PAGENUM_REGEX = re.compile(r'-\s*p(\d+)-\d+\.')
-simple_page_str: str = r'(?:Image|Im|img_)(\d+)(?:\.\d+)?(?:\.\d+)?\.'
-SIMPLE_PAGENUM_REGEX = re.compile(simple_page_str)
+from pdf_fmt.processing import split_page_ranges
 
-PDFPLUMBER_OUTPUT_REGEX = re.compile(r'^temp_raw_img_\d+\.')
-_ImageProcessArgs = Tuple[str, str, List[str], int, str, int]
+
+class ExtractedImage(NamedTuple):
+    """An image read from a PDF, still encoded as stored or rendered."""
+    number: int
+    data: bytes
+    ext: str
+
+
+class _ImageRangeTask(NamedTuple):
+    """A contiguous range of pages whose images one worker extracts."""
+    pdf_path: str
+    password: str
+    page_numbers: List[int]
+    fallback_kb: int
+    image_source: str
+
+
+# (image, output_dir, base_name, format_list, fallback_size_kb, timestamp)
+_ImageProcessArgs = Tuple[ExtractedImage, str, str, List[str], int, str]
+
+# "render" rasterizes the image's area of the page, as it is shown there.
+# "embedded" writes the image data stored in the PDF where it can, which
+# ignores clipping and transformations
+IMAGE_SOURCES = ("embedded", "render")
+DEFAULT_IMAGE_SOURCE = "render"
+RENDER_RESOLUTIONS = [400, 300, 200, 150, 72]
+
+# Samples used to predict the encoded size of a rendered image: tiles of the
+# full resolution crop, and two thumbnails whose sizes give the rate at
+# which the encoded size grows with resolution
+_SAMPLE_TILES = 4
+_SAMPLE_TILE_PX = 160
+_SAMPLE_RESOLUTIONS = (36, 72)
+# A rendered image under this fraction of the budget is tried once at a
+# higher resolution
+_UNDERSHOOT = 0.6
+
+# Pillow modes of 8 bit colour spaces whose samples can be used as they are
+_PLAIN_COLORSPACES = {"DeviceGray": "L", "DeviceRGB": "RGB", "CalGray": "L", "CalRGB": "RGB"}
 
 
 def _get_format_details(format_str: str) -> Optional[Tuple[str, str]]:
@@ -33,50 +71,388 @@ def _get_format_details(format_str: str) -> Optional[Tuple[str, str]]:
     return None
 
 
+def validate_image_source(source: object) -> str:
+    if source in IMAGE_SOURCES:
+        return str(source)
+    print(f"Warning: 'image_source' must be one of {list(IMAGE_SOURCES)}. Using '{DEFAULT_IMAGE_SOURCE}'.")
+    return DEFAULT_IMAGE_SOURCE
+
+
+def _pdf_name(obj: object) -> Optional[str]:
+    """The name of a PDF name object, e.g. 'DCTDecode' for /DCTDecode."""
+    from pdfminer.pdftypes import resolve1
+
+    obj = resolve1(obj)
+    name = getattr(obj, "name", obj)
+    return name if isinstance(name, str) else None
+
+
+def _color_mode(colorspace: object) -> Optional[str]:
+    """Pillow mode for a PDF colour space, or None if it needs converting."""
+    from pdfminer.pdftypes import resolve1
+
+    colorspace = resolve1(colorspace)
+    if isinstance(colorspace, list) and colorspace:
+        if _pdf_name(colorspace[0]) == "ICCBased" and len(colorspace) > 1:
+            components = resolve1(colorspace[1]).get("N")
+            return {1: "L", 3: "RGB"}.get(components)
+        if len(colorspace) == 1:
+            colorspace = colorspace[0]
+    return _PLAIN_COLORSPACES.get(_pdf_name(colorspace) or "")
+
+
+def _read_embedded_image(img_obj: dict) -> Optional[Tuple[bytes, str]]:
+    """
+    Returns (data, extension) of an image as stored in the PDF: JPEG and
+    JPEG 2000 streams unchanged, and 8 bit Flate streams as PNG. Returns None
+    for images that only look right when rendered: inline images, masks,
+    soft masks, decode arrays and other colour spaces.
+    """
+    stream = img_obj.get("stream")
+    attrs = getattr(stream, "attrs", None)
+    # Inline images only have the abbreviated keys (W, H, BPC, ...)
+    if not attrs or "Width" not in attrs:
+        return None
+    if attrs.get("ImageMask") or "SMask" in attrs or "Mask" in attrs or "Decode" in attrs:
+        return None
+
+    filters = [_pdf_name(f) for f, _ in stream.get_filters()]
+    if filters == ["JPXDecode"]:
+        from PIL import features
+
+        return (stream.get_rawdata(), ".jp2") if features.check_codec("jpg_2000") else None
+
+    mode = _color_mode(attrs.get("ColorSpace"))
+    if mode is None:
+        return None
+    if filters == ["DCTDecode"]:
+        return stream.get_rawdata(), ".jpg"
+
+    if filters not in ([], ["FlateDecode"]) or attrs.get("BitsPerComponent") != 8:
+        return None
+    size = (int(attrs["Width"]), int(attrs["Height"]))
+    data = stream.get_data()
+    if len(data) < size[0] * size[1] * len(mode):
+        return None
+
+    buf = io.BytesIO()
+    Image.frombytes(mode, size, data).save(buf, "PNG")
+    return buf.getvalue(), ".png"
+
+
+class _PageRaster:
+    """
+    A page rendered once at the highest resolution needed. Every image on
+    the page is cropped from it, and resampled for lower resolutions.
+    """
+
+    def __init__(self, page, resolution: int):
+        rendered = page.to_image(resolution=resolution)
+        self.image = rendered.original
+        self.bounds = rendered.bbox
+        self.scale = rendered.scale
+        self.resolution = resolution
+
+    def region(self, bbox: Tuple[float, float, float, float]) -> Image.Image:
+        """The area of the page under bbox, at the raster's resolution."""
+        x0, top = max(bbox[0], self.bounds[0]), max(bbox[1], self.bounds[1])
+        x1, bottom = min(bbox[2], self.bounds[2]), min(bbox[3], self.bounds[3])
+        if x1 <= x0 or bottom <= top:
+            raise ValueError("Image lies outside the page")
+
+        box = (
+            int((x0 - self.bounds[0]) * self.scale), int((top - self.bounds[1]) * self.scale),
+            int((x1 - self.bounds[0]) * self.scale), int((bottom - self.bounds[1]) * self.scale),
+        )
+        return self.image.crop(box)
+
+    def resample(self, region: Image.Image, resolution: int) -> Image.Image:
+        if resolution == self.resolution:
+            return region
+
+        factor = resolution / self.resolution
+        size = (max(1, round(region.width * factor)), max(1, round(region.height * factor)))
+        return region.resize(size, Image.Resampling.LANCZOS)
+
+    def crop(self, bbox: Tuple[float, float, float, float], resolution: int) -> Image.Image:
+        return self.resample(self.region(bbox), resolution)
+
+    def close(self) -> None:
+        self.image.close()
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _predict_full_size(region: Image.Image, encoded: Dict[int, bytes], resolution: int) -> float:
+    """
+    Predicts the PNG size in bytes of the full resolution crop from a few
+    tiles spread over it. Crops no larger than the tiles are encoded whole,
+    and kept in encoded for reuse.
+    """
+    width, height = region.size
+    tile_w, tile_h = min(_SAMPLE_TILE_PX, width), min(_SAMPLE_TILE_PX, height)
+    if width * height <= _SAMPLE_TILES * tile_w * tile_h:
+        encoded[resolution] = _encode_png(region)
+        return len(encoded[resolution])
+
+    sampled = 0
+    for i in range(_SAMPLE_TILES):
+        x = int((width - tile_w) * (i + 0.5) / _SAMPLE_TILES)
+        y = int((height - tile_h) * ((3 * i + 1) % _SAMPLE_TILES + 0.5) / _SAMPLE_TILES)
+        sampled += len(_encode_png(region.crop((x, y, x + tile_w, y + tile_h))))
+    return sampled * width * height / (_SAMPLE_TILES * tile_w * tile_h)
+
+
+def _predict_resampled_sizes(
+    raster: _PageRaster,
+    region: Image.Image,
+    encoded: Dict[int, bytes]
+) -> Dict[int, float]:
+    """
+    Predicts the PNG size in bytes of region resampled to each lower render
+    resolution, from the growth in size between two thumbnails. The larger
+    thumbnail is itself a render resolution and is kept in encoded.
+    """
+    low, high = _SAMPLE_RESOLUTIONS
+    low_size = len(_encode_png(raster.resample(region, low)))
+    encoded[high] = _encode_png(raster.resample(region, high))
+    high_size = len(encoded[high])
+
+    # Line art grows with the edge length, photos with the area
+    growth = math.log(max(high_size, 1) / max(low_size, 1), high / low)
+    growth = min(2.0, max(1.0, growth))
+    return {res: high_size * (res / high) ** growth
+            for res in RENDER_RESOLUTIONS if res < raster.resolution}
+
+
+def _pick_resolution(predicted: Dict[int, float], budget: float, below: int) -> int:
+    """The highest render resolution under below that is predicted to fit."""
+    candidates = [res for res in RENDER_RESOLUTIONS if res < below]
+    for res in candidates:
+        if predicted[res] <= budget:
+            return res
+    return candidates[-1]
+
+
+def _render_image(raster: _PageRaster, bbox: Tuple[float, float, float, float],
+                  budget: float, stats: Counter) -> bytes:
+    """
+    PNG data of the image under bbox at the highest resolution predicted to
+    fit budget bytes. Lower resolutions are only sampled when the full one
+    does not fit. A wrong prediction is corrected once by scaling the
+    predictions by the error: downward when the data does not fit, upward
+    when it is well under the budget and the higher resolution fits.
+    """
+    region = raster.region(bbox)
+    encoded: Dict[int, bytes] = {}
+    predicted: Dict[int, float] = {}
+
+    def encode(res: int) -> bytes:
+        if res not in encoded:
+            encoded[res] = _encode_png(raster.resample(region, res))
+            stats["encodes"] += 1
+        return encoded[res]
+
+    def sample_lower() -> None:
+        if len(predicted) == 1:
+            predicted.update(_predict_resampled_sizes(raster, region, encoded))
+            stats["encodes"] += 1
+
+    full = raster.resolution
+    predicted[full] = _predict_full_size(region, encoded, full)
+    stats["encodes"] += len(encoded)
+    if predicted[full] <= budget or full == RENDER_RESOLUTIONS[-1]:
+        res = full
+    else:
+        sample_lower()
+        res = _pick_resolution(predicted, budget, below=full)
+    data = encode(res)
+
+    if len(data) > budget and res != RENDER_RESOLUTIONS[-1]:
+        sample_lower()
+        error = len(data) / max(predicted[res], 1)
+        res = _pick_resolution({r: size * error for r, size in predicted.items()}, budget, below=res)
+        data = encode(res)
+        stats["corrected"] += 1
+    elif res != full and len(data) < _UNDERSHOOT * budget:
+        error = len(data) / max(predicted[res], 1)
+        # The full resolution is predicted from tiles and is known not to fit
+        higher = [r for r in RENDER_RESOLUTIONS
+                  if res < r < full and predicted[r] * error <= budget]
+        if higher:
+            larger = encode(higher[0])
+            stats["corrected"] += 1
+            if len(larger) <= budget:
+                res, data = higher[0], larger
+
+    # Stepping down from the top, the ladder would encode about every
+    # resolution down to this one
+    stats["images"] += 1
+    stats["ladder_encodes"] += RENDER_RESOLUTIONS.index(res) + 1
+    return data
+
+
+def _open_raster(page) -> Optional[_PageRaster]:
+    """
+    The page rendered at the highest resolution that succeeds, stepping
+    down when a render fails (e.g. too large for memory). None if even the
+    lowest fails.
+    """
+    for resolution in RENDER_RESOLUTIONS:
+        try:
+            return _PageRaster(page, resolution)
+        except Exception:
+            continue
+    return None
+
+
+def _render_page_images(
+    page,
+    images: List[Tuple[int, dict]],
+    fallback_kb: int,
+    extracted: List[ExtractedImage]
+) -> Counter:
+    """
+    Adds each (counter, image) of a page to extracted as PNG data, at the
+    highest resolution predicted to fit fallback_kb. The page raster is
+    freed before returning. Returns counts of the images and encodes.
+    """
+    stats: Counter = Counter()
+    raster = _open_raster(page)
+    if raster is None:
+        return stats
+
+    try:
+        for img_counter, img_obj in images:
+            bbox = (img_obj["x0"], img_obj["top"], img_obj["x1"], img_obj["bottom"])
+            try:
+                data = _render_image(raster, bbox, fallback_kb * 1024, stats)
+            except Exception:
+                continue
+            extracted.append(ExtractedImage(img_counter, data, ".png"))
+    finally:
+        raster.close()
+    return stats
+
+
+def _extract_page_range(task: _ImageRangeTask) -> Tuple[List[ExtractedImage], Counter]:
+    """
+    Worker entry point. Opens the PDF independently and reads the images of
+    its pages, numbered from 1 in page order within the range.
+    """
+    extracted: List[ExtractedImage] = []
+    stats: Counter = Counter()
+    with pdfplumber.open(task.pdf_path, password=task.password) as pdf:
+        img_counter = 0
+        for page_num in task.page_numbers:
+            page = pdf.pages[page_num]
+            to_render: List[Tuple[int, dict]] = []
+            for img_obj in page.images:
+                img_counter += 1
+
+                if task.image_source == "embedded":
+                    try:
+                        embedded = _read_embedded_image(img_obj)
+                    except Exception:
+                        embedded = None
+                    if embedded and len(embedded[0]) / 1024 <= task.fallback_kb:
+                        extracted.append(ExtractedImage(img_counter, *embedded))
+                        continue
+
+                to_render.append((img_counter, img_obj))
+
+            if to_render:
+                stats += _render_page_images(page, to_render, task.fallback_kb, extracted)
+            page.close()
+    return sorted(extracted), stats
+
+
+def _exit_on_sigterm(signum, frame) -> None:
+    # Unwinds through the pools' with blocks, which terminate their workers
+    sys.exit(1)
+
+
+def _default_sigterm() -> None:
+    """Pool initializer. Workers must not inherit _exit_on_sigterm."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _extract_page_ranges(tasks: List[_ImageRangeTask], cores: int) -> List[Tuple[List[ExtractedImage], Counter]]:
+    """Extracts the ranges on a pool, or in this process for a single core."""
+    if cores > 1 and len(tasks) > 1:
+        try:
+            with multiprocessing.Pool(processes=min(cores, len(tasks)),
+                                      initializer=_default_sigterm) as pool:
+                return pool.map(_extract_page_range, tasks)
+        except Exception as e:
+            print(f"Warning: Parallel image extraction failed ({e}). Falling back to sequential.")
+    return [_extract_page_range(task) for task in tasks]
+
+
 def extract_images_from_pdf(
     pdf_path: str,
-    output_dir: str,
     password: str = "",
-    fallback_kb: int = 2000
-) -> bool:
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
+    fallback_kb: int = 2000,
+    image_source: str = DEFAULT_IMAGE_SOURCE,
+    cores: int = 1
+) -> Optional[List[ExtractedImage]]:
+    """
+    Reads every image of the PDF into memory, or returns None if the PDF
+    cannot be read. With the "embedded" source the stored image data is used
+    where it fits fallback_kb, otherwise the image's area of the page is
+    cropped from a single render of the page, at the highest resolution
+    predicted to fit. Page ranges are split across cores, and images are
+    numbered from 1 by page and position on the page, whatever the split.
+    """
     try:
         with pdfplumber.open(pdf_path, password=password) as pdf:
-            img_counter = 0
-            for page in pdf.pages:
-                page.extract_tables()
-                for img_obj in page.images:
-                    img_counter += 1
-                    # Save initial high-res source as PNG
-                    img_path = os.path.join(output_dir, f"temp_raw_img_{img_counter}.png")
-                    bbox = (img_obj["x0"], img_obj["top"], img_obj["x1"], img_obj["bottom"])
-
-                    for res in [400, 300, 200, 150, 72]:
-                        try:
-                            img_data = page.within_bbox(bbox).to_image(resolution=res)
-                            img_data.save(img_path)
-                            if os.path.getsize(img_path) / 1024 <= fallback_kb:
-                                break
-                        except Exception:
-                            continue
-        return True
+            total_pages = len(pdf.pages)
+
+        ranges = split_page_ranges(total_pages, cores) if cores > 1 else [list(range(total_pages))]
+        tasks = [
+            _ImageRangeTask(pdf_path, password, page_numbers, fallback_kb, image_source)
+            for page_numbers in ranges
+        ]
+
+        extracted: List[ExtractedImage] = []
+        stats: Counter = Counter()
+        for range_images, range_stats in _extract_page_ranges(tasks, cores):
+            for image in range_images:
+                extracted.append(image._replace(number=len(extracted) + 1))
+            stats += range_stats
+
+        if stats["images"]:
+            avoided = stats["ladder_encodes"] - stats["encodes"]
+            print(f"INFO: Rendered {stats['images']} images with {stats['encodes']} full encodes "
+                  f"({stats['corrected']} corrected), an estimated {max(avoided, 0)} fewer than "
+                  f"stepping down from {RENDER_RESOLUTIONS[0]} DPI.")
+        return extracted
     except Exception as e:
         print(f"Warning: Extraction failed: {e}")
-        return False
+        return None
 
 
 def _process_single_image(args: _ImageProcessArgs) -> Optional[str]:
-    (original_path, base_name, format_list, fallback_size_kb, timestamp, im_id) = args
-    output_dir = os.path.dirname(original_path)
+    """
+    Writes an extracted image to output_dir in the first format that fits
+    fallback_size_kb, decoding and encoding it in memory. Data already
+    stored in that format is written unchanged.
+    """
+    (image, output_dir, base_name, format_list, fallback_size_kb, timestamp) = args
+    im_id = image.number
+    stem = os.path.join(output_dir, f"{base_name}_{timestamp}_p{im_id}_{im_id}")
 
     try:
-        with Image.open(original_path) as img:
+        with Image.open(io.BytesIO(image.data)) as img:
             img_rgb = img.convert('RGB') if img.mode in ('RGBA', 'P') else img
+            source_size_kb = len(image.data) / 1024
 
             # Default fallback if all in list exceed size
-            final_pillow_format, final_ext = ('PNG', '.png')
+            final_ext, final_data = '.png', None
 
             for fmt_str in format_list:
                 details = _get_format_details(fmt_str)
@@ -85,12 +461,15 @@ def _process_single_image(args: _ImageProcessArgs) -> Optional[str]:
 
                 pillow_fmt, ext = details
 
+                # Already stored in this format, keep the bytes as they are
+                if pillow_fmt == img.format and source_size_kb <= fallback_size_kb:
+                    final_ext, final_data = ext, image.data
+                    break
+
                 # Handle SVG output specifically
                 if pillow_fmt == 'SVG':
-                    new_filename = os.path.join(output_dir, f"{base_name}_{timestamp}_p{im_id}_{im_id}.svg")
-                    img.save(original_path)
-                    _save_as_svg_wrapper(original_path, new_filename)
-                    os.remove(original_path)
+                    png_data = image.data if img.format == 'PNG' else _encode_png(img)
+                    _save_as_svg_wrapper(png_data, img.size, stem + ".svg")
                     return None
 
                 # Standard Raster Formats
@@ -99,30 +478,26 @@ def _process_single_image(args: _ImageProcessArgs) -> Optional[str]:
                 img_to_save.save(buf, pillow_fmt, quality=90)
 
                 if (len(buf.getvalue()) / 1024) <= fallback_size_kb:
-                    final_pillow_format, final_ext = pillow_fmt, ext
+                    final_ext, final_data = ext, buf.getvalue()
                     break
 
-            # Final Save for non-SVG formats
-            new_name = f"{base_name}_{timestamp}_p{im_id}_{im_id}{final_ext}"
-            final_path = os.path.join(output_dir, new_name)
-            img_to_save = img if final_pillow_format == 'PNG' else img_rgb
-            img_to_save.save(final_path, final_pillow_format, quality=90)
+            if final_data is None:
+                final_data = image.data if img.format == 'PNG' else _encode_png(img)
 
-        os.remove(original_path)
+        # The only write of the image
+        with open(stem + final_ext, "wb") as f:
+            f.write(final_data)
         return None
     except Exception as e:
-        return f"Warning: Failed {os.path.basename(original_path)}: {e}"
+        return f"Warning: Failed image {im_id}: {e}"
 
 
-def _save_as_svg_wrapper(source_png: str, output_svg: str):
+def _save_as_svg_wrapper(png_data: bytes, size: Tuple[int, int], output_svg: str):
     """Wraps a raster image in an SVG container to provide SVG support."""
-    with Image.open(source_png) as img:
-        w, h = img.size
+    w, h = size
 
     # Minimalistic SVG wrapper embedding the high-res data
-    import base64
-    with open(source_png, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode('ascii')
+    encoded = base64.b64encode(png_data).decode('ascii')
 
     svg_content = f' <svg width="{w}" height="{h}" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
     svg_content += f'<image href="data:image/png;base64,{encoded}" width="{w}" height="{h}"/></svg>'
@@ -133,25 +508,26 @@ def _save_as_svg_wrapper(source_png: str, output_svg: str):
 
 def post_process_images(
     pdf_path: str,
+    images: List[ExtractedImage],
     output_dir: str,
     format_list: List[str],
     fallback_size_kb: int,
     cores_used: int
 ):
+    """
+    Encodes the extracted images on a pool of workers. The image data goes
+    to the workers through the pool's pipes, so the final files are the
+    only ones written.
+    """
     filename = os.path.basename(pdf_path)
     pdf_base_name = os.path.splitext(filename)[0].replace(' ', '_')
     timestamp = time.strftime("%m-%d_%H-%M-%S", time.localtime())
+    os.makedirs(output_dir, exist_ok=True)
 
-    files_to_process: List[_ImageProcessArgs] = []
-    image_id_counter = 0
-
-    # Search for the temporary files created by pdfplumber
-    for original_path in glob.glob(os.path.join(output_dir, "temp_raw_img_*")):
-        image_id_counter += 1
-        files_to_process.append((
-            original_path, pdf_base_name, format_list,
-            fallback_size_kb, timestamp, image_id_counter
-        ))
+    files_to_process: List[_ImageProcessArgs] = [
+        (image, output_dir, pdf_base_name, format_list, fallback_size_kb, timestamp)
+        for image in images
+    ]
 
     if files_to_process:
         max_cores = max(1, (os.cpu_count() or 2) - 1)
@@ -161,7 +537,7 @@ def post_process_images(
         try:
             print(f"""INFO: Processing {len(files_to_process)} images
 on {final_cores} cores.""")
-            with multiprocessing.Pool(processes=final_cores) as pool:
+            with multiprocessing.Pool(processes=final_cores, initializer=_default_sigterm) as pool:
                 results = pool.map(_process_single_image, files_to_process)
             for result in [r for r in results if r]:
                 print(result)
@@ -271,18 +647,26 @@ def _extract_and_format_images(
     output_dir: str,
     format_list: List[str],
     fallback_size: int,
-    cores_used: int
+    cores_used: int,
+    image_source: str = DEFAULT_IMAGE_SOURCE
 ) -> None:
+    """
+    Entry point of the image extraction process. Terminating it on timeout
+    also terminates the pools it runs.
+    """
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
     print(f"INFO: Starting extraction to '{output_dir}'...")
-    success = extract_images_from_pdf(
+    images = extract_images_from_pdf(
         pdf_path=pdf_path,
-        output_dir=output_dir,
-        fallback_kb=fallback_size
+        fallback_kb=fallback_size,
+        image_source=image_source,
+        cores=cores_used
     )
 
-    if success:
+    if images is not None:
         post_process_images(
             pdf_path=pdf_path,
+            images=images,
             output_dir=output_dir,
             format_list=format_list,
             fallback_size_kb=fallback_size,
@@ -0,0 +1,337 @@
+"""
+Reads the text of DOCX, PPTX and ODT documents straight from their zipped
+XML parts, so that they need not be converted to PDF first. Each slide, or
+each section or explicit page break of a text document, becomes one page
+block for the usual page processing.
+"""
+
+import os
+import posixpath
+from typing import Any, Dict, List, Optional, Set
+
+NATIVE_FORMATS = ("docx", "pptx", "odt")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+_TABLE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+_OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+_STYLE = "{urn:oasis:names:tc:opendocument:xmlns:style:1.0}"
+_FO = "{urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0}"
+
+# Placeholder types that PowerPoint shows with bullets unless told otherwise
+_BULLETED_PLACEHOLDERS = (None, "body", "obj")
+
+
+def is_native_document(path: str) -> bool:
+    return os.path.splitext(path)[1].lstrip('.').lower() in NATIVE_FORMATS
+
+
+def use_native_extraction(path: str, config: Dict[str, Any]) -> bool:
+    """
+    True if the text of a document should be read directly. Images can only
+    be extracted from a PDF, so documents are still converted when
+    'actions.image_dir' is set.
+    """
+    from pdf_fmt.core import DEFAULT_CONVERT_FORMATS
+
+    conv_cfg = config.get("conversion", {})
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension not in NATIVE_FORMATS or not conv_cfg.get("native_extraction", True):
+        return False
+    if extension not in conv_cfg.get("supported_formats", DEFAULT_CONVERT_FORMATS):
+        return False
+    return not isinstance(config.get("actions", {}).get("image_dir"), str)
+
+
+class _Pages:
+    """Collects lines into page blocks, skipping pages that stay empty."""
+
+    def __init__(self):
+        self.pages: List[List[str]] = [[]]
+
+    def add(self, text: str) -> None:
+        self.pages[-1].append(text)
+
+    def add_table(self, rows: List[List[Optional[str]]]) -> None:
+        # Imported here, processing imports this module
+        from pdf_fmt.processing import _to_markdown_table
+
+        if rows:
+            self.add(_to_markdown_table(rows))
+
+    def break_page(self) -> None:
+        if any(line.strip() for line in self.pages[-1]):
+            self.pages.append([])
+
+    def blocks(self) -> List[str]:
+        return ["\n".join(lines) for lines in self.pages
+                if any(line.strip() for line in lines)]
+
+
+def _list_item(text: str, level: int) -> str:
+    return f"{'  ' * level}- {text}"
+
+
+# --- DOCX ---
+
+def _docx_paragraph(paragraph: Any, pages: _Pages) -> None:
+    ppr = paragraph.find(_W + "pPr")
+    level: Optional[int] = None
+    if ppr is not None:
+        page_break = ppr.find(_W + "pageBreakBefore")
+        if page_break is not None and page_break.get(_W + "val", "true") not in ("0", "false"):
+            pages.break_page()
+        numpr = ppr.find(_W + "numPr")
+        if numpr is not None:
+            ilvl = numpr.find(_W + "ilvl")
+            level = int(ilvl.get(_W + "val", "0")) if ilvl is not None else 0
+
+    def flush(parts: List[str]) -> None:
+        text = "".join(parts)
+        pages.add(_list_item(text, level) if level is not None and text.strip() else text)
+        parts.clear()
+
+    parts: List[str] = []
+    for el in paragraph.iter():
+        if el.tag == _W + "t":
+            parts.append(el.text or "")
+        elif el.tag == _W + "tab":
+            parts.append("\t")
+        elif el.tag in (_W + "br", _W + "cr"):
+            if el.get(_W + "type") == "page":
+                if parts:
+                    flush(parts)
+                pages.break_page()
+            else:
+                parts.append("\n")
+    flush(parts)
+
+    # A paragraph carrying section properties ends its section
+    if ppr is not None and ppr.find(_W + "sectPr") is not None:
+        pages.break_page()
+
+
+def _docx_cell_text(cell: Any) -> str:
+    return " ".join(
+        "".join(t.text or "" for t in p.iter(_W + "t"))
+        for p in cell.iter(_W + "p")
+    ).strip()
+
+
+def _docx_blocks(container: Any, pages: _Pages) -> None:
+    for child in container:
+        if child.tag == _W + "p":
+            _docx_paragraph(child, pages)
+        elif child.tag == _W + "tbl":
+            pages.add_table([
+                [_docx_cell_text(cell) for cell in row.findall(_W + "tc")]
+                for row in child.findall(_W + "tr")
+            ])
+        elif child.tag == _W + "sdt":
+            content = child.find(_W + "sdtContent")
+            if content is not None:
+                _docx_blocks(content, pages)
+
+
+def _read_docx(archive: Any) -> List[str]:
+    from xml.etree import ElementTree
+
+    with archive.open("word/document.xml") as f:
+        body = ElementTree.parse(f).getroot().find(_W + "body")
+
+    pages = _Pages()
+    if body is not None:
+        _docx_blocks(body, pages)
+    return pages.blocks()
+
+
+# --- PPTX ---
+
+def _slide_paths(archive: Any) -> List[str]:
+    """Slide part names in presentation order."""
+    from xml.etree import ElementTree
+
+    with archive.open("ppt/_rels/presentation.xml.rels") as f:
+        targets = {rel.get("Id"): rel.get("Target")
+                   for rel in ElementTree.parse(f).getroot().iter(_REL + "Relationship")}
+    with archive.open("ppt/presentation.xml") as f:
+        slide_ids = ElementTree.parse(f).getroot().iter(_P + "sldId")
+        rel_ids = [slide.get(_R + "id") for slide in slide_ids]
+
+    paths: List[str] = []
+    for rel_id in rel_ids:
+        target = targets.get(rel_id)
+        if not target:
+            continue
+        if target.startswith("/"):
+            paths.append(target.lstrip("/"))
+        else:
+            paths.append(posixpath.normpath(posixpath.join("ppt", target)))
+    return paths
+
+
+def _pptx_paragraph_text(paragraph: Any) -> str:
+    parts: List[str] = []
+    for child in paragraph:
+        if child.tag in (_A + "r", _A + "fld"):
+            parts.extend(t.text or "" for t in child.iter(_A + "t"))
+        elif child.tag == _A + "br":
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _pptx_text_body(body: Any, bulleted: bool, pages: _Pages) -> None:
+    for paragraph in body.findall(_A + "p"):
+        text = _pptx_paragraph_text(paragraph)
+        if not text.strip():
+            continue
+
+        ppr = paragraph.find(_A + "pPr")
+        level = int(ppr.get("lvl", "0")) if ppr is not None else 0
+        is_item = bulleted or level > 0
+        if ppr is not None:
+            if ppr.find(_A + "buNone") is not None:
+                is_item = False
+            elif ppr.find(_A + "buChar") is not None or ppr.find(_A + "buAutoNum") is not None:
+                is_item = True
+        pages.add(_list_item(text, level) if is_item else text)
+
+
+def _pptx_shapes(tree: Any, pages: _Pages) -> None:
+    for shape in tree:
+        if shape.tag == _P + "sp":
+            body = shape.find(_P + "txBody")
+            if body is None:
+                continue
+            placeholder = shape.find(f"{_P}nvSpPr/{_P}nvPr/{_P}ph")
+            bulleted = (placeholder is not None
+                        and placeholder.get("type") in _BULLETED_PLACEHOLDERS)
+            _pptx_text_body(body, bulleted, pages)
+        elif shape.tag == _P + "grpSp":
+            _pptx_shapes(shape, pages)
+        elif shape.tag == _P + "graphicFrame":
+            for table in shape.iter(_A + "tbl"):
+                pages.add_table([
+                    [" ".join(_pptx_paragraph_text(p) for p in cell.iter(_A + "p")).strip()
+                     for cell in row.findall(_A + "tc")]
+                    for row in table.findall(_A + "tr")
+                ])
+
+
+def _read_pptx(archive: Any) -> List[str]:
+    from xml.etree import ElementTree
+
+    blocks: List[str] = []
+    for path in _slide_paths(archive):
+        with archive.open(path) as f:
+            slide = ElementTree.parse(f).getroot()
+        if slide.get("show") in ("0", "false"):
+            continue
+
+        pages = _Pages()
+        tree = slide.find(f"{_P}cSld/{_P}spTree")
+        if tree is not None:
+            _pptx_shapes(tree, pages)
+        # Every slide is a page, even an empty one, so numbering matches
+        blocks.append("\n".join(pages.pages[0]))
+    return blocks
+
+
+# --- ODT ---
+
+def _odf_break_styles(roots: List[Any]) -> Dict[str, Set[str]]:
+    """Names of the paragraph styles with a page break before or after."""
+    breaks: Dict[str, Set[str]] = {"before": set(), "after": set()}
+    for root in roots:
+        for style in root.iter(_STYLE + "style"):
+            props = style.find(_STYLE + "paragraph-properties")
+            if props is None:
+                continue
+            for side in ("before", "after"):
+                if props.get(f"{_FO}break-{side}") == "page":
+                    breaks[side].add(style.get(_STYLE + "name"))
+    return breaks
+
+
+def _odf_text(el: Any) -> str:
+    parts = [el.text or ""]
+    for child in el:
+        if child.tag == _TEXT + "s":
+            parts.append(" " * int(child.get(_TEXT + "c", "1")))
+        elif child.tag == _TEXT + "tab":
+            parts.append("\t")
+        elif child.tag == _TEXT + "line-break":
+            parts.append("\n")
+        elif child.tag != _TEXT + "note":
+            parts.append(_odf_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _odf_list(lst: Any, level: int, pages: _Pages) -> None:
+    for item in lst:
+        if item.tag not in (_TEXT + "list-item", _TEXT + "list-header"):
+            continue
+        for child in item:
+            if child.tag in (_TEXT + "p", _TEXT + "h"):
+                text = _odf_text(child)
+                if text.strip():
+                    pages.add(_list_item(text, level))
+            elif child.tag == _TEXT + "list":
+                _odf_list(child, level + 1, pages)
+
+
+def _odf_blocks(container: Any, breaks: Dict[str, Set[str]], pages: _Pages) -> None:
+    for child in container:
+        if child.tag in (_TEXT + "p", _TEXT + "h"):
+            style = child.get(_TEXT + "style-name")
+            if style in breaks["before"]:
+                pages.break_page()
+            pages.add(_odf_text(child))
+            if style in breaks["after"]:
+                pages.break_page()
+        elif child.tag == _TEXT + "list":
+            _odf_list(child, 0, pages)
+        elif child.tag == _TABLE + "table":
+            pages.add_table([
+                [" ".join(_odf_text(p) for p in cell.iter(_TEXT + "p")).strip()
+                 for cell in row.findall(_TABLE + "table-cell")]
+                for row in child.iter(_TABLE + "table-row")
+            ])
+        elif child.tag == _TEXT + "section":
+            pages.break_page()
+            _odf_blocks(child, breaks, pages)
+            pages.break_page()
+
+
+def _read_odt(archive: Any) -> List[str]:
+    from xml.etree import ElementTree
+
+    with archive.open("content.xml") as f:
+        content = ElementTree.parse(f).getroot()
+    roots = [content]
+    if "styles.xml" in archive.namelist():
+        with archive.open("styles.xml") as f:
+            roots.append(ElementTree.parse(f).getroot())
+
+    pages = _Pages()
+    text = content.find(f"{_OFFICE}body/{_OFFICE}text")
+    if text is not None:
+        _odf_blocks(text, _odf_break_styles(roots), pages)
+    return pages.blocks()
+
+
+_READERS = {"docx": _read_docx, "pptx": _read_pptx, "odt": _read_odt}
+
+
+def extract_page_blocks(path: str) -> List[str]:
+    """Returns the raw text block of every page of a DOCX, PPTX or ODT file."""
+    import zipfile
+
+    reader = _READERS[os.path.splitext(path)[1].lstrip('.').lower()]
+    with zipfile.ZipFile(path) as archive:
+        return reader(archive)
@@ -1,27 +1,24 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import sys
 import os
-import multiprocessing
+import glob
+import argparse
+from contextlib import closing
 
-from pdf_fmt.core import DEFAULT_CONVERT_FORMATS, DEFAULT_CHARS_REGEX
+from pdf_fmt.core import DEFAULT_CONVERT_FORMATS, DEFAULT_CHARS_REGEX, DEFAULT_IMAGE_TIMEOUT
 from pdf_fmt.spell import locale_checks
-from pdf_fmt.startup import setup_cli, StartupCheckError
-from pdf_fmt.conversion import convert_to_pdf
-from pdf_fmt.processing import extract_text_from_pdf, perform_post_actions
-from pdf_fmt.image import _discard_similar_images, _extract_and_format_images
-
-
-def _get_validated_cores(config: Dict[str, Any]) -> int:
-    """Calculates and validates the number of CPU cores to use."""
-    max_cores = max(1, os.cpu_count() - 1)
-    cores = config.get("processing", {}).get("cores", max_cores)
-    try:
-        cores_int = int(cores)
-        if 0 < cores_int < os.cpu_count():
-            return cores_int
-    except (ValueError, TypeError):
-        pass
-    return max_cores
+from pdf_fmt.startup import setup_cli, is_glob_pattern, StartupCheckError
+from pdf_fmt.conversion import convert_many, convert_to_pdf, remove_converted
+from pdf_fmt.office import use_native_extraction
+from pdf_fmt.cache import (
+    DiskCache, open_cache, hash_output_config, extraction_key
+)
+from pdf_fmt.processing import (
+    extract_text_from_pdf, perform_post_actions, get_validated_cores,
+    iter_extracted_pages, stream_content, iter_batch_extracted,
+    write_content_to_file, build_processing_plan, _open_pool
+)
+from pdf_fmt.profiling import profile_run, profile_stage
 
 
 def _get_image_formats(actions: Dict[str, Any]) -> List[str]:
@@ -34,6 +31,18 @@ def _get_image_formats(actions: Dict[str, Any]) -> List[str]:
     return ['png']
 
 
+def _get_image_timeout(actions: Dict[str, Any]) -> Optional[float]:
+    """Seconds to wait for image extraction, or None to wait until it ends."""
+    setting = actions.get('image_timeout', DEFAULT_IMAGE_TIMEOUT)
+    if setting is None or (setting == 0 and not isinstance(setting, bool)):
+        return None
+    if isinstance(setting, bool) or not isinstance(setting, (int, float)) or setting < 0:
+        print(f"Warning: 'actions.image_timeout' must be a number of seconds. "
+              f"Defaulting to {DEFAULT_IMAGE_TIMEOUT}.")
+        return DEFAULT_IMAGE_TIMEOUT
+    return setting
+
+
 def _run_image_pipeline(
     pdf_path: str,
     actions: Dict[str, Any],
@@ -44,46 +53,304 @@ def _run_image_pipeline(
     if not isinstance(image_dir, str):
         return
 
+    # Pillow and the image helpers are only needed when images are extracted
+    import multiprocessing
+    from pdf_fmt.image import (
+        DEFAULT_IMAGE_SOURCE, _discard_similar_images, _extract_and_format_images,
+        validate_image_source
+    )
+
     res_dir = os.path.abspath(os.path.expanduser(image_dir))
     os.makedirs(res_dir, exist_ok=True)
 
     # Get values directly from YAML config
     fallback_size = actions.get('fallback_image_kb', 2000)
     formats = _get_image_formats(actions)
+    source = validate_image_source(actions.get("image_source", DEFAULT_IMAGE_SOURCE))
 
     proc = multiprocessing.Process(
         target=_extract_and_format_images,
-        args=(pdf_path, res_dir, formats, fallback_size, cores)
+        args=(pdf_path, res_dir, formats, fallback_size, cores, source)
     )
+    timeout = _get_image_timeout(actions)
 
     print(f"INFO: Starting extraction (Max {fallback_size}KB, Formats: {formats})")
-    proc.start()
-    proc.join(timeout=120)
+    with profile_stage("images"):
+        proc.start()
+        proc.join(timeout=timeout)
 
-    if proc.is_alive():
-        print("Warning: Image extraction timed out. Terminating.")
-        proc.terminate()
+        if proc.is_alive():
+            print(f"Warning: Image extraction timed out after {timeout}s "
+                  f"('actions.image_timeout'). Terminating.")
+            proc.terminate()
+            proc.join()
 
     # Similarity discard check
     threshold = actions.get("image_discard_threshold", 95)
-    _discard_similar_images(res_dir, threshold)
+    with profile_stage("image_dedup"):
+        _discard_similar_images(res_dir, threshold)
+
+
+def _get_extraction_cache(
+    args: argparse.Namespace,
+    config: Dict[str, Any]
+) -> Optional[DiskCache]:
+    if args.no_cache:
+        return None
+    return open_cache(config, "extraction")
+
+
+def _get_conversion_cache(
+    args: argparse.Namespace,
+    config: Dict[str, Any]
+) -> Optional[DiskCache]:
+    if args.no_cache:
+        return None
+    return open_cache(config, "conversion", "conversion_max_size_mb")
+
+
+def _lookup_cache(
+    cache: Optional[DiskCache],
+    pdf_path: str,
+    config_digest: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """Returns (cache key, cached content). Both are None without a cache."""
+    if cache is None:
+        return None, None
+    try:
+        key = extraction_key(pdf_path, config_digest)
+    except OSError:
+        return None, None
+    return key, cache.get_text(key)
+
+
+def _cleanup_temp_pdf(pdf_path: str, is_temp: bool) -> None:
+    """Removes the PDF created by conversion, if any."""
+    if is_temp and os.path.exists(pdf_path):
+        try:
+            remove_converted(pdf_path)
+            print(f"INFO: Cleaned up temporary PDF: {pdf_path}")
+        except Exception as e:
+            print(f"Warning: Cleanup failed: {e}")
+
+
+def _run_streaming_pipeline(
+    pdf_path: str,
+    is_temp: bool,
+    config: Dict[str, Any],
+    chars: str,
+    footers: List[str],
+    locale: str,
+    ignores: List[str]
+) -> None:
+    """Streams formatted pages to the output targets as they are produced."""
+    error = None
+    try:
+        pages = iter_extracted_pages(
+            pdf_path, config, chars, footers, locale, ignores
+        )
+        with profile_stage("stream"):
+            stream_content(pages, config)
+    except BrokenPipeError:
+        # Output is gone, remove the converted PDF silently and let the
+        # caller's BrokenPipeError handling exit right away.
+        if is_temp and os.path.exists(pdf_path):
+            remove_converted(pdf_path)
+        raise
+    except Exception as e:
+        error = f"An error occurred during PDF parsing: {e}"
+
+    _run_image_pipeline(pdf_path, config.get("actions", {}), get_validated_cores(config))
+    _cleanup_temp_pdf(pdf_path, is_temp)
+
+    if error:
+        print(f"Error: Extraction failed.\nDetails: {error}")
+        sys.exit(1)
 
 
-def execute_main_pipeline(config: Dict[str, Any]) -> None:
+def _expand_inputs(paths: List[str], formats: List[str]) -> List[str]:
     """
-    Executes the main pipeline by coordinating specialized helpers.
+    Expands directories and glob patterns into a sorted list of input files.
+    Directories are searched recursively for PDFs and convertible formats.
     """
-    args = setup_cli()
+    extensions = {"pdf", *(str(f).lower() for f in formats)}
+    files: List[str] = []
 
-    locale, ignores = locale_checks(config)
+    def is_supported(name: str) -> bool:
+        return os.path.splitext(name)[1].lstrip('.').lower() in extensions
 
-    conv_cfg = config.get("conversion", {})
-    formats = conv_cfg.get("supported_formats", DEFAULT_CONVERT_FORMATS)
-    pdf_path, is_temp = convert_to_pdf(args.file_path, formats)
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name)
+                             for name in sorted(names) if is_supported(name))
+        elif is_glob_pattern(path):
+            files.extend(match for match in sorted(glob.glob(path, recursive=True))
+                         if os.path.isfile(match) and is_supported(match))
+        else:
+            files.append(path)
 
-    if not pdf_path:
+    seen = set()
+    unique_files: List[str] = []
+    for path in files:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique_files.append(path)
+    return unique_files
+
+
+def _get_output_path(output_dir: str, input_path: str, used: set) -> str:
+    """Returns a unique '<stem>.md' path in output_dir for an input file."""
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    target = os.path.join(output_dir, f"{stem}.md")
+
+    counter = 0
+    while target in used:
+        counter += 1
+        target = os.path.join(output_dir, f"{stem}_{counter}.md")
+    used.add(target)
+    return target
+
+
+def _run_batch_pipeline(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    chars: str,
+    footers: List[str],
+    locale: str,
+    ignores: List[str],
+    formats: List[str]
+) -> None:
+    """
+    Processes many inputs in one run, reusing the loaded config, the
+    conversion tool lookup and a single worker pool for every document.
+    """
+    inputs = _expand_inputs(args.file_paths, formats)
+    if not inputs:
+        print("Error: No supported input files found.")
         sys.exit(1)
 
+    print(f"INFO: Processing {len(inputs)} files.")
+
+    native = [use_native_extraction(path, config) for path in inputs]
+    with profile_stage("convert"):
+        conversions = iter(convert_many(
+            [path for path, is_native in zip(inputs, native) if not is_native],
+            formats, config.get("conversion", {}), _get_conversion_cache(args, config)
+        ))
+
+    converted: List[Tuple[str, str, bool]] = []
+    failed = 0
+    for input_path, is_native in zip(inputs, native):
+        if is_native:
+            pdf_path, is_temp = os.path.abspath(input_path), False
+        else:
+            pdf_path, is_temp = next(conversions)
+        if pdf_path:
+            converted.append((input_path, pdf_path, is_temp))
+        else:
+            failed += 1
+
+    output_dir: Optional[str] = None
+    if args.output_dir:
+        output_dir = os.path.abspath(os.path.expanduser(args.output_dir))
+        os.makedirs(output_dir, exist_ok=True)
+
+    cores = get_validated_cores(config)
+    actions = config.get("actions", {})
+
+    cache = _get_extraction_cache(args, config)
+    config_digest = hash_output_config(config, locale, ignores)
+    cache_keys: Dict[int, str] = {}
+    cached: List[Tuple[int, Optional[str], Optional[str]]] = []
+    pending: List[int] = []
+
+    for index, (_, pdf_path, _) in enumerate(converted):
+        key, content = _lookup_cache(cache, pdf_path, config_digest)
+        if content is not None:
+            cached.append((index, content, None))
+            continue
+        if key:
+            cache_keys[index] = key
+        pending.append(index)
+
+    if cached:
+        print(f"INFO: Loaded {len(cached)} files from the extraction cache.")
+
+    sections: Dict[int, str] = {}
+    used_paths: set = set()
+
+    def handle_result(index: int, content: Optional[str], error: Optional[str],
+                      budget_cut: bool = False) -> None:
+        nonlocal failed
+        input_path, pdf_path, is_temp = converted[index]
+
+        _run_image_pipeline(pdf_path, actions, cores)
+        _cleanup_temp_pdf(pdf_path, is_temp)
+
+        if error:
+            failed += 1
+            print(f"Error: Extraction failed for '{input_path}'.\nDetails: {error}")
+            return
+
+        if cache is not None and index in cache_keys and content is not None and not budget_cut:
+            cache.put_text(cache_keys[index], content)
+
+        if output_dir:
+            target = _get_output_path(output_dir, input_path, used_paths)
+            write_content_to_file(content or "", target)
+        elif content:
+            sections[index] = f"# {os.path.basename(input_path)}\n\n{content}"
+
+    for index, content, error in cached:
+        handle_result(index, content, error)
+
+    plan = build_processing_plan(config, chars, footers, locale, ignores)
+    pool = _open_pool(cores, plan) if cores > 1 and pending else None
+
+    try:
+        # Closed before the pool, so that its feeding thread is not left waiting
+        with closing(iter_batch_extracted(
+            [converted[index][1] for index in pending], config, plan, pool
+        )) as results, profile_stage("batch"):
+            for pending_index, content, error, budget_cut in results:
+                handle_result(pending[pending_index], content, error, budget_cut)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if sections:
+        content = "\n\n".join(sections[index] for index in sorted(sections))
+        print(content)
+        perform_post_actions(content, config)
+
+    print(f"INFO: Processed {len(inputs) - failed}/{len(inputs)} files.")
+    if failed:
+        sys.exit(1)
+
+
+def execute_main_pipeline(
+    config: Dict[str, Any],
+    args: Optional[argparse.Namespace] = None
+) -> None:
+    """
+    Executes the main pipeline by coordinating specialized helpers.
+    With --profile, the whole run is timed and a report is written.
+    Pass args when the command line has already been parsed.
+    """
+    if args is None:
+        args = setup_cli()
+
+    report_path = args.profile_output if args.profile else None
+    with profile_run(report_path, args.profile_with, args.profile_top):
+        _run_main_pipeline(args, config)
+
+
+def get_filter_settings(config: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Returns the allowed characters regex and the footer regexes of a config."""
     filt_cfg = config.get("filters", {})
     footers = filt_cfg.get("footer_regexes", [])
     if not isinstance(footers, list):
@@ -92,24 +359,67 @@ def execute_main_pipeline(config: Dict[str, Any]) -> None:
     chars = filt_cfg.get("allowed_chars_regex", DEFAULT_CHARS_REGEX)
     if not isinstance(chars, str):
         chars = DEFAULT_CHARS_REGEX
+    return chars, footers
 
-    content, error = extract_text_from_pdf(
-        pdf_path, config, chars, footers, locale, ignores
-    )
 
-    _run_image_pipeline(pdf_path, config.get("actions", {}), _get_validated_cores(config))
+def _run_main_pipeline(args: argparse.Namespace, config: Dict[str, Any]) -> None:
+    locale, ignores = locale_checks(config)
 
-    if is_temp and os.path.exists(pdf_path):
-        try:
-            os.remove(pdf_path)
-            print(f"INFO: Cleaned up temporary PDF: {pdf_path}")
-        except Exception as e:
-            print(f"Warning: Cleanup failed: {e}")
+    conv_cfg = config.get("conversion", {})
+    formats = conv_cfg.get("supported_formats", DEFAULT_CONVERT_FORMATS)
+
+    chars, footers = get_filter_settings(config)
+
+    if args.batch:
+        _run_batch_pipeline(
+            args, config, chars, footers, locale, ignores, formats
+        )
+        return
+
+    if use_native_extraction(args.file_path, config):
+        pdf_path, is_temp = os.path.abspath(args.file_path), False
+    else:
+        with profile_stage("convert"):
+            pdf_path, is_temp = convert_to_pdf(
+                args.file_path, formats, conv_cfg, _get_conversion_cache(args, config)
+            )
+
+    if not pdf_path:
+        sys.exit(1)
+
+    cache = _get_extraction_cache(args, config)
+    with profile_stage("cache_lookup"):
+        cache_key, content = _lookup_cache(
+            cache, pdf_path, hash_output_config(config, locale, ignores)
+        )
+    error = None
+
+    if content is not None:
+        print("INFO: Loaded extracted content from cache.")
+    elif args.stream or config.get("processing", {}).get("stream", False):
+        _run_streaming_pipeline(
+            pdf_path, is_temp, config, chars, footers, locale, ignores
+        )
+        return
+    else:
+        page_store = None
+        if cache is not None and config.get("cache", {}).get("incremental", True):
+            page_store = open_cache(config, "pages")
+
+        content, error, budget_cut = extract_text_from_pdf(
+            pdf_path, config, chars, footers, locale, ignores, page_store
+        )
+        if cache is not None and cache_key and content is not None and not budget_cut:
+            cache.put_text(cache_key, content)
+
+    _run_image_pipeline(pdf_path, config.get("actions", {}), get_validated_cores(config))
+    _cleanup_temp_pdf(pdf_path, is_temp)
 
     if error:
         print(f"Error: Extraction failed.\nDetails: {error}")
         sys.exit(1)
 
     if content:
-        print(content)
-        perform_post_actions(content, config)
+        with profile_stage("output"):
+            print(content)
+            perform_post_actions(content, config)
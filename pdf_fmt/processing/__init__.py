@@ -1,10 +1,30 @@
-from typing import Dict, Any, List, NamedTuple, Tuple, Optional
+from typing import (
+    Deque, Dict, Any, Iterable, List, NamedTuple, Tuple, Optional, Iterator, Union, Callable
+)
 import os
 import re
-import multiprocessing
-import pdfplumber
-
-from pdf_fmt.formatting import fix_spacing
+import sys
+import json
+import hashlib
+
+from pdf_fmt.core import (
+    DEFAULT_CHARS_REGEX, split_fmt_line, compile_footer_patterns
+)
+from pdf_fmt.filter import (
+    FooterMatcher, DEFAULT_MATCH_BUDGET_MS, compile_user_pattern,
+    validate_regex_engine, report_risky_patterns
+)
+from pdf_fmt.formatting import (
+    fix_spacing, clean_and_lint_lines, line_normalizer_factory
+)
+from pdf_fmt.spell import (
+    SpellingEngine, SPELLING_LOCALES, get_spelling_engine
+)
+from pdf_fmt.office import is_native_document, extract_page_blocks
+from pdf_fmt.profiling import (
+    PageRecord, page_timer, profile_stage, is_profiling, get_profiler,
+    enable_page_records, drain_page_records
+)
 
 PYPERCLIP_WARN = "Warning: 'pyperclip' library not found. Clipboard functionality disabled."
 
@@ -37,32 +57,357 @@ def write_content_to_file(content: str, file_path: str):
         print(f"Error: Could not write content to file '{file_path}'. {e}")
 
 
+def _get_write_path(actions: Dict[str, Any]) -> Optional[str]:
+    """Resolves the 'write_file' action target, if one is configured."""
+    file_path = actions.get("write_file")
+    if file_path and isinstance(file_path, str):
+        expanded_path = os.path.expanduser(file_path)
+        return os.path.abspath(expanded_path)
+    return None
+
+
 def perform_post_actions(content: str, config: Dict[str, Any]):
     """Executes post-extraction actions (copy, write file)."""
     actions = config.get("actions", {})
     if actions.get("copy", True):
         copy_content(content)
 
-    file_path = actions.get("write_file")
-    if file_path and isinstance(file_path, str):
-        expanded_path = os.path.expanduser(file_path)
-        resolved_path = os.path.abspath(expanded_path)
+    resolved_path = _get_write_path(actions)
+    if resolved_path:
         write_content_to_file(content, resolved_path)
 
 
-class PageProcessArgs(NamedTuple):
+def stream_content(pages: Iterator[List[str]], config: Dict[str, Any]) -> None:
+    """
+    Writes each page to stdout and the 'write_file' target as soon as it is
+    formatted. The written bytes match printing the fully built content.
+    Content is only kept in memory when it needs to be copied to the clipboard.
+    """
+    from pdf_fmt.core import build_enclosure_engine
+
+    actions = config.get("actions", {})
+    enclosures = build_enclosure_engine(config)
+    resolved_path = _get_write_path(actions)
+    collected: Optional[List[str]] = [] if actions.get("copy", True) else None
+
+    out_file = None
+    wrote_any = False
+
+    try:
+        for page_lines in pages:
+            if not page_lines:
+                continue
+
+            chunk = enclosures.apply(page_lines)
+            if wrote_any:
+                chunk = "\n" + chunk
+
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+
+            if resolved_path and out_file is None:
+                try:
+                    out_file = open(resolved_path, 'w', encoding='utf-8')
+                except Exception as e:
+                    print(f"Error: Could not write content to file '{resolved_path}'. {e}")
+                    resolved_path = None
+
+            if out_file is not None:
+                out_file.write(chunk)
+            if collected is not None:
+                collected.append(chunk)
+            wrote_any = True
+    finally:
+        if out_file is not None:
+            out_file.close()
+
+    if not wrote_any:
+        return
+
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+    if collected is not None:
+        copy_content("".join(collected))
+    if out_file is not None:
+        print(f"SUCCESS: Extracted content written to '{resolved_path}'.")
+
+
+class ProcessingPlan(NamedTuple):
+    """
+    Compiled, immutable settings shared by every page of a run. Built once
+    and installed in each worker by the pool initializer, so that page tasks
+    only carry the page itself.
+    """
+    allowed_chars: re.Pattern
+    footer_patterns: Tuple[re.Pattern, ...]
+    spelling_locale: str
+    ignore_list: Tuple[str, ...]
+    max_chars: int
+    min_chars: int
+    enforce_cap: bool
+    page_separator: Optional[str]
+    table_config: Dict[str, Any]
+    regex_engine: str = "re"
+    match_budget_ms: float = DEFAULT_MATCH_BUDGET_MS
+
+
+class PageTask(NamedTuple):
     page_num: int
     page_text: str
+    total_pages: int
+    # DOCX, PPTX and ODT blocks mark nested list items by indentation alone
+    keep_list_levels: bool = False
+
+
+class PageRangeTask(NamedTuple):
+    pdf_path: str
+    page_numbers: List[int]
+    total_pages: int
+
+
+class ProcessedPages(NamedTuple):
+    """
+    Processed lines of one or more pages. budget_cut is set when the footer
+    match budget switched a pattern off on any of them: the lines then
+    depend on how fast the pages happened to run, so they are never cached.
+    """
+    lines: List[str]
+    budget_cut: bool = False
+
+
+def _finish_content(
+    pages: ProcessedPages,
     config: Dict[str, Any]
-    allowed_chars_regex: str
-    footer_patterns: List[str]
-    spelling_locale: str
+) -> Tuple[str, None, bool]:
+    """The extraction result for the processed pages of a document."""
+    from pdf_fmt.core import post_process_content
+
+    return post_process_content(pages.lines, config), None, pages.budget_cut
+
+
+def _join_pages(pages: Iterable[ProcessedPages]) -> ProcessedPages:
+    lines: List[str] = []
+    budget_cut = False
+    for page in pages:
+        lines.extend(page.lines)
+        budget_cut = budget_cut or page.budget_cut
+    return ProcessedPages(lines, budget_cut)
+
+
+SENTENCE_END_PATTERN = re.compile(r'[.?!]$')
+
+# Per-process state, set by _install_plan
+_PLAN: Optional[ProcessingPlan] = None
+_FILTER_CONTENT: Optional[Callable[[str], str]] = None
+_FOOTERS: Optional[FooterMatcher] = None
+_SPELLING: Optional[SpellingEngine] = None
+
+
+def build_processing_plan(
+    config: Dict[str, Any],
+    allowed_chars_regex_string: str,
+    footer_regex_patterns: List[str],
+    spelling_locale: str,
     ignore_list: List[str]
-    total_pages: int
+) -> ProcessingPlan:
+    """Compiles the filter and formatting settings of a run."""
+    try:
+        allowed_chars = re.compile(allowed_chars_regex_string)
+    except re.error as e:
+        print(f"""Warning: Invalid 'allowed_chars_regex' pattern '{allowed_chars_regex_string}'. Using default.
+Error: {e}
+""")
+        allowed_chars = re.compile(DEFAULT_CHARS_REGEX)
+
+    filters_cfg = config.get("filters", {})
+    regex_engine = validate_regex_engine(filters_cfg.get("regex_engine", "re"))
+    match_budget_ms = filters_cfg.get("match_budget_ms", DEFAULT_MATCH_BUDGET_MS)
+    if not isinstance(match_budget_ms, (int, float)) or isinstance(match_budget_ms, bool):
+        print("Warning: 'match_budget_ms' in config is not a number. Using default.")
+        match_budget_ms = DEFAULT_MATCH_BUDGET_MS
+
+    footer_patterns = compile_footer_patterns(footer_regex_patterns)
+    report_risky_patterns(footer_patterns, regex_engine)
+
+    fmt_cfg = config.get("formatting", {})
+
+    return ProcessingPlan(
+        allowed_chars=allowed_chars,
+        footer_patterns=tuple(footer_patterns),
+        spelling_locale=spelling_locale,
+        ignore_list=tuple(ignore_list),
+        max_chars=fmt_cfg.get("max_chars_per_line", 0),
+        min_chars=fmt_cfg.get("min_chars_per_line", 0),
+        enforce_cap=fmt_cfg.get("enforce_line_capitalization", False),
+        page_separator=fmt_cfg.get("page_separator"),
+        table_config=fmt_cfg.get("extract_table", {}),
+        regex_engine=regex_engine,
+        match_budget_ms=match_budget_ms
+    )
+
+
+def _install_plan(plan: ProcessingPlan) -> None:
+    """
+    Pool initializer. Installs the plan in the current process and builds
+    the filter closures once, instead of once per page.
+    """
+    global _PLAN, _FILTER_CONTENT, _FOOTERS, _SPELLING
+    _PLAN = plan
+    _FILTER_CONTENT = line_normalizer_factory(
+        compile_user_pattern(plan.allowed_chars, plan.regex_engine)
+    )
+    _FOOTERS = FooterMatcher(
+        list(plan.footer_patterns), plan.regex_engine, plan.match_budget_ms
+    )
+
+    _SPELLING = None
+    if plan.spelling_locale.upper() in SPELLING_LOCALES:
+        _SPELLING = get_spelling_engine(
+            plan.spelling_locale, list(plan.ignore_list)
+        )
+
+
+def get_spelling_stats() -> Optional[Dict[str, int]]:
+    """Returns the memo statistics of this process's spelling engine."""
+    return _SPELLING.stats() if _SPELLING is not None else None
+
+
+def _record_spelling_stats() -> None:
+    """Adds this process's spelling memo statistics to the running profile."""
+    stats = get_spelling_stats()
+    if stats and is_profiling():
+        get_profiler().counters["spelling"] = stats
+
+
+def _run_collecting(
+    call: Tuple[Callable[[Any], Any], Any]
+) -> Tuple[Any, int, List[PageRecord], Optional[Dict[str, Dict[str, int]]]]:
+    """
+    Worker entry point while profiling. Runs the task and also returns the
+    page timings it recorded and the worker's spelling statistics.
+    """
+    func, task = call
+    enable_page_records()
+    result = func(task)
+    stats = get_spelling_stats()
+    return result, os.getpid(), drain_page_records(), {"spelling": stats} if stats else None
+
+
+def _merge_collected(item: Tuple[Any, int, List[PageRecord], Any]) -> Any:
+    result, pid, records, counters = item
+    get_profiler().add_worker_result(pid, records, counters)
+    return result
+
+
+def _pool_map(pool: Any, func: Callable[[Any], Any], tasks: Any, lazy: bool = False) -> Any:
+    """
+    pool.map, or pool.imap when lazy. While profiling, the page timings
+    recorded in the workers are merged into the running profile.
+    """
+    if not is_profiling():
+        return pool.imap(func, tasks) if lazy else pool.map(func, tasks)
+
+    calls = ((func, task) for task in tasks)
+    if lazy:
+        return map(_merge_collected, pool.imap(_run_collecting, calls))
+    return [_merge_collected(item) for item in pool.map(_run_collecting, list(calls))]
+
+
+def _open_pdf(pdf_path: str) -> Any:
+    """Opens a PDF; pdfplumber is only imported once a document is parsed."""
+    import pdfplumber
+    return pdfplumber.open(pdf_path)
+
+
+class _BorrowedPool:
+    """
+    A long-lived pool lent to one run. Leaving a 'with' block, close and
+    join do nothing, the pool is shut down by its owner.
+    """
+
+    def __init__(self, pool: Any):
+        self._pool = pool
+
+    def __enter__(self) -> "_BorrowedPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+    def map(self, func: Callable[[Any], Any], tasks: Any) -> List[Any]:
+        return self._pool.map(func, tasks)
+
+    def imap(self, func: Callable[[Any], Any], tasks: Any) -> Iterator[Any]:
+        return self._pool.imap(func, tasks)
+
+    def close(self) -> None:
+        pass
+
+    def join(self) -> None:
+        pass
+
+
+# Warm pool of the server mode (pdf_fmt.server) and the plan it was
+# initialised with. Runs with the same plan borrow it instead of forking.
+_SHARED_POOL: Optional[Tuple[ProcessingPlan, int, Any]] = None
+
+
+def set_shared_pool(pool: Optional[Any], plan: Optional[ProcessingPlan] = None,
+                    processes: int = 0) -> None:
+    """Registers (or with None, forgets) a pool that runs with plan may reuse."""
+    global _SHARED_POOL
+    _SHARED_POOL = (plan, processes, pool) if pool is not None else None
+
+
+def _new_pool(processes: int, plan: ProcessingPlan) -> Any:
+    """Returns the shared pool if it was set up for this plan, else a new pool."""
+    if _SHARED_POOL is not None:
+        shared_plan, shared_processes, pool = _SHARED_POOL
+        if shared_plan == plan and shared_processes >= processes:
+            return _BorrowedPool(pool)
+
+    import multiprocessing
+    return multiprocessing.Pool(
+        processes=processes, initializer=_install_plan, initargs=(plan,)
+    )
+
+
+def _open_pool(cores: int, plan: ProcessingPlan) -> Optional[Any]:
+    """Creates a worker pool, or returns None so callers run sequentially."""
+    try:
+        return _new_pool(cores, plan)
+    except Exception as e:
+        print(f"Warning: Multiprocessing failed ({e}). Falling back to sequential.")
+        return None
+
+
+def get_validated_cores(config: Dict[str, Any]) -> int:
+    """Calculates and validates the number of CPU cores to use."""
+    max_cores = max(1, os.cpu_count() - 1)
+    cores = config.get("processing", {}).get("cores", max_cores)
+    try:
+        cores_int = int(cores)
+        if 0 < cores_int < os.cpu_count():
+            return cores_int
+    except (ValueError, TypeError):
+        pass
+    return max_cores
 
 
 def _get_page_elements(page, table_config: Dict[str, Any]) -> List[Tuple[float, str]]:
-    tables = page.find_tables(table_settings=table_config)
+    page_num = page.page_number - 1
+    elements: List[Tuple[float, str]] = []
+
+    with page_timer(page_num, "tables"):
+        tables = page.find_tables(table_settings=table_config)
+        for table in tables:
+            raw = table.extract()
+            if raw:
+                # We wrap the table in a unique marker to prevent the text
+                # processor from thinking it's just a normal line
+                elements.append((table.bbox[1], _to_markdown_table(raw)))
+
     # Get bboxes and expand them by a tiny margin to catch "ghost" text
     table_bboxes = [t.bbox for t in tables]
 
@@ -81,20 +426,13 @@ def _get_page_elements(page, table_config: Dict[str, Any]) -> List[Tuple[float,
                 return False
         return True
 
-    elements: List[Tuple[float, str]] = []
-    for table in tables:
-        raw = table.extract()
-        if raw:
-            # We wrap the table in a unique marker to prevent the text
-            # processor from thinking it's just a normal line
-            elements.append((table.bbox[1], _to_markdown_table(raw)))
-
-    clean_page = page.filter(is_outside_tables)
-    text = clean_page.extract_text(
-        layout=True, use_text_flow=True,
-        x_tolerance=2, y_tolerance=2
-    )
-    text = fix_spacing(text)
+    with page_timer(page_num, "text"):
+        clean_page = page.filter(is_outside_tables)
+        text = clean_page.extract_text(
+            layout=True, use_text_flow=True,
+            x_tolerance=2, y_tolerance=2
+        )
+        text = fix_spacing(text)
 
     if text:
         elements.append((0, text))
@@ -103,6 +441,11 @@ def _get_page_elements(page, table_config: Dict[str, Any]) -> List[Tuple[float,
     return elements
 
 
+def _join_page_elements(elements: List[Tuple[float, str]]) -> str:
+    """Joins the sorted page elements into a single page text block."""
+    return "\n\n".join(content for _, content in elements)
+
+
 def _get_separator(page_num: int, mode: str) -> str:
     """Returns the formatted page separator based on config."""
     if page_num <= 0:
@@ -122,23 +465,33 @@ def _update_line_buffer(buffer: str, line: str) -> str:
     return f"{buffer}{sep}{line.strip()}"
 
 
-def _process_page_text_block(args: PageProcessArgs) -> List[str]:
-    """Processes a single page block with reduced complexity."""
-    if not args.page_text.strip():
-        return []
+def _list_indent(raw_line: str) -> str:
+    """The spaces before a '- ' list item, which cleaning would strip."""
+    body = raw_line.lstrip(' ')
+    return raw_line[:len(raw_line) - len(body)] if body.startswith('- ') else ""
+
+
+def _process_page_text_block(task: PageTask) -> List[str]:
+    """Processes a single page block with the installed plan."""
+    with page_timer(task.page_num, "process"):
+        return _format_page_text_block(task)
 
-    from pdf_fmt.core import (
-        split_fmt_line, compile_footer_patterns, ln_cont_factory,
-        is_ft_factory, format_indented_line
-    )
-    from pdf_fmt.formatting import clean_and_lint_text, replace_unicode_chars
 
-    cfg = args.config.get("formatting", {})
-    max_chars = cfg.get("max_chars_per_line", 0)
-    enforce_cap = cfg.get("enforce_line_capitalization", False)
+def _process_page(task: PageTask) -> ProcessedPages:
+    """Worker entry point for pages whose result may be cached."""
+    lines = _process_page_text_block(task)
+    # Blank pages return before footer matching starts
+    return ProcessedPages(lines, bool(task.page_text.strip()) and _FOOTERS.budget_exceeded())
 
-    filter_content = ln_cont_factory(re.compile(args.allowed_chars_regex))
-    is_footer = is_ft_factory(compile_footer_patterns(args.footer_patterns))
+
+def _format_page_text_block(task: PageTask) -> List[str]:
+    if not task.page_text.strip():
+        return []
+
+    plan = _PLAN
+    filter_content = _FILTER_CONTENT
+    _FOOTERS.start_page(task.page_num)
+    is_footer = _FOOTERS.matches
 
     processed_content: List[str] = []
     line_buffer = ""
@@ -146,20 +499,27 @@ def _process_page_text_block(args: PageProcessArgs) -> List[str]:
 
     def flush_buffer(buf: str):
         if buf:
-            processed_content.extend(split_fmt_line(
-                buf, max_chars, enforce_cap
+            body = buf.lstrip(' ')
+            indent = buf[:len(buf) - len(body)]
+            processed_content.extend(indent + piece for piece in split_fmt_line(
+                body, plan.max_chars, plan.enforce_cap
             ))
 
-    for raw_line in args.page_text.splitlines():
-        filtered = replace_unicode_chars(raw_line)
-        filtered = filter_content(filtered)
+    kept_lines: List[str] = []
+    indents: List[str] = []
+    for raw_line in task.page_text.splitlines():
+        filtered = filter_content(raw_line)
 
         if not filtered or is_footer(filtered):
             continue
+        kept_lines.append(filtered)
+        if task.keep_list_levels:
+            indents.append(_list_indent(raw_line))
 
-        cleaned = clean_and_lint_text(
-            filtered, args.spelling_locale, args.ignore_list
-        )
+    with page_timer(task.page_num, "process/lint"):
+        cleaned_lines = clean_and_lint_lines(kept_lines, _SPELLING)
+
+    for i, cleaned in enumerate(cleaned_lines):
         trimmed = cleaned.strip()
         is_table = trimmed.startswith('|') and trimmed.endswith('|')
 
@@ -176,14 +536,17 @@ def _process_page_text_block(args: PageProcessArgs) -> List[str]:
             processed_content.append("")
             in_table = False
 
-        # Text Wrapping Logic
-        formatted = format_indented_line(cleaned)
-        if not formatted.strip():
+        # Text Wrapping Logic. Cleaned lines are already stripped, so
+        # format_indented_line would return them unchanged.
+        formatted = cleaned
+        if not formatted:
             continue
+        if indents and trimmed.startswith('- '):
+            formatted = indents[i] + formatted
 
         is_break = (trimmed.startswith(('-', '*')) or
-                    re.search(r'[.?!]$', trimmed) or
-                    len(trimmed) >= cfg.get("min_chars_per_line", 0))
+                    SENTENCE_END_PATTERN.search(trimmed) or
+                    len(trimmed) >= plan.min_chars)
 
         if is_break:
             flush_buffer(line_buffer)
@@ -193,10 +556,10 @@ def _process_page_text_block(args: PageProcessArgs) -> List[str]:
 
     flush_buffer(line_buffer)
 
-    is_last_page = (args.page_num + 1) >= args.total_pages
+    is_last_page = (task.page_num + 1) >= task.total_pages
 
     if not is_last_page:
-        if (sep := _get_separator(args.page_num, cfg.get("page_separator"))):
+        if (sep := _get_separator(task.page_num, plan.page_separator)):
             processed_content.append(sep)
 
     return processed_content
@@ -231,20 +594,260 @@ def _to_markdown_table(table: List[List[Optional[str]]]) -> str:
     return "\n" + "\n".join(lines) + "\n"
 
 
-def _run_processing_pool(args_list: List[Any], cores: int) -> List[str]:
-    """Handles the switch between parallel and sequential execution."""
-    if len(args_list) > 1 and cores > 1:
+def _map_page_blocks(
+    tasks: List[PageTask],
+    plan: ProcessingPlan,
+    cores: int
+) -> List[ProcessedPages]:
+    """Processes page blocks in parallel or sequentially, keeping page order."""
+    if len(tasks) > 1 and cores > 1:
         try:
-            with multiprocessing.Pool(processes=cores) as pool:
-                return [line for page_result in pool.map(
-                    _process_page_text_block, args_list
-                )
-                        for line in page_result]
+            with _new_pool(cores, plan) as pool:
+                return _pool_map(pool, _process_page, tasks)
         except Exception as e:
             print(f"Warning: Multiprocessing failed ({e}). Falling back to sequential.")
 
-    return [line for args in args_list
-            for line in _process_page_text_block(args)]
+    _install_plan(plan)
+    results = [_process_page(task) for task in tasks]
+    _record_spelling_stats()
+    return results
+
+
+def _run_processing_pool(
+    tasks: List[PageTask],
+    plan: ProcessingPlan,
+    cores: int
+) -> ProcessedPages:
+    """Handles the switch between parallel and sequential execution."""
+    return _join_pages(_map_page_blocks(tasks, plan, cores))
+
+
+def split_page_ranges(total_pages: int, cores: int) -> List[List[int]]:
+    """
+    Splits the page indices into contiguous ranges. A few more ranges than
+    cores are created so that slow pages do not stall a single worker.
+    """
+    chunk_count = max(1, min(total_pages, cores * 4))
+    size, extra = divmod(total_pages, chunk_count)
+
+    ranges: List[List[int]] = []
+    start = 0
+    for i in range(chunk_count):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def _parse_page_range(task: PageRangeTask) -> List[ProcessedPages]:
+    """
+    Worker entry point for parallel parsing. Opens the PDF independently,
+    parses its own pages and returns the finished page blocks in order.
+    """
+    results: List[ProcessedPages] = []
+
+    for page_num, block in zip(task.page_numbers, _parse_page_blocks(task)):
+        results.append(_process_page(
+            PageTask(page_num, block, task.total_pages)
+        ))
+    return results
+
+
+def _parse_page_blocks(task: PageRangeTask) -> List[str]:
+    """Worker entry point that only parses pages, without processing them."""
+    blocks: List[str] = []
+
+    with _open_pdf(task.pdf_path) as pdf:
+        for page_num in task.page_numbers:
+            page = pdf.pages[page_num]
+            blocks.append(_join_page_elements(
+                _get_page_elements(page, _PLAN.table_config)
+            ))
+            page.close()
+    return blocks
+
+
+def _build_range_tasks(
+    pdf_path: str,
+    total_count: int,
+    cores: int
+) -> List[PageRangeTask]:
+    return [
+        PageRangeTask(pdf_path, page_numbers, total_count)
+        for page_numbers in split_page_ranges(total_count, cores)
+    ]
+
+
+def _run_parallel_parse(
+    pdf_path: str,
+    plan: ProcessingPlan,
+    cores: int
+) -> Optional[ProcessedPages]:
+    """
+    Parses and processes page ranges across worker processes.
+    Returns None if the pool could not be used, so that the caller can fall
+    back to the sequential path.
+    """
+    with _open_pdf(pdf_path) as pdf:
+        total_count = len(pdf.pages)
+
+    if total_count < 2:
+        return None
+
+    range_tasks = _build_range_tasks(pdf_path, total_count, cores)
+
+    try:
+        with _new_pool(min(cores, len(range_tasks)), plan) as pool:
+            range_results = _pool_map(pool, _parse_page_range, range_tasks)
+    except Exception as e:
+        print(f"Warning: Parallel parsing failed ({e}). Falling back to sequential.")
+        return None
+
+    return _join_pages(page for pages in range_results for page in pages)
+
+
+def _hash_pdf_object(obj: Any, memo: Dict[int, str], depth: int = 0) -> str:
+    """
+    Hashes a PDF object graph. Indirect objects are hashed once per document
+    through the memo, which also guards against reference cycles.
+    """
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+    from pdfminer.psparser import PSLiteral
+
+    if isinstance(obj, PDFObjRef):
+        objid = obj.objid
+        if objid in memo:
+            return memo[objid]
+        memo[objid] = f"cycle:{objid}"
+        try:
+            resolved = obj.resolve()
+        except Exception:
+            resolved = None
+        memo[objid] = _hash_pdf_object(resolved, memo, depth)
+        return memo[objid]
+
+    digest = hashlib.sha256()
+    if depth > 32:
+        digest.update(b"depth")
+    elif isinstance(obj, PDFStream):
+        raw = obj.get_rawdata()
+        digest.update(b"stream:")
+        digest.update(_hash_pdf_object(obj.attrs, memo, depth + 1).encode())
+        digest.update(raw if raw is not None else b"data:" + obj.get_data())
+    elif isinstance(obj, dict):
+        digest.update(b"dict:")
+        for key in sorted(obj, key=str):
+            digest.update(str(key).encode())
+            digest.update(_hash_pdf_object(obj[key], memo, depth + 1).encode())
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"list:")
+        for item in obj:
+            digest.update(_hash_pdf_object(item, memo, depth + 1).encode())
+    elif isinstance(obj, PSLiteral):
+        digest.update(b"name:" + str(obj.name).encode())
+    elif isinstance(obj, bytes):
+        digest.update(b"bytes:" + obj)
+    else:
+        digest.update(f"{type(obj).__name__}:{obj!r}".encode())
+    return digest.hexdigest()
+
+
+def _fingerprint_page(page, memo: Dict[int, str]) -> str:
+    """
+    Fingerprints a page by its content streams, resources and geometry, so
+    that unchanged pages of a re-exported document can be recognised.
+    """
+    page_obj = page.page_obj
+    return _hash_pdf_object([
+        page_obj.contents,
+        page_obj.resources,
+        list(page.bbox),
+        page.rotation,
+    ], memo)
+
+
+def _extract_incremental(
+    pdf_path: str,
+    config: Dict[str, Any],
+    plan: ProcessingPlan,
+    page_store: Any,
+    cores: int
+) -> ProcessedPages:
+    """
+    Extracts a document page by page against a persistent page store. Only
+    pages whose fingerprint is unknown are parsed, and only pages whose
+    processed lines are unknown are processed. Results are spliced back
+    together in page order.
+    """
+    from pdf_fmt.cache import hash_data, hash_output_config, hash_parse_config
+
+    parallel_parse = config.get("processing", {}).get("parallel_parse", False)
+    config_digest = hash_output_config(
+        config, plan.spelling_locale, list(plan.ignore_list)
+    )
+    parse_digest = hash_parse_config(config)
+
+    with _open_pdf(pdf_path) as pdf:
+        total_count = len(pdf.pages)
+        memo: Dict[int, str] = {}
+        fingerprints = [_fingerprint_page(page, memo) for page in pdf.pages]
+
+        block_keys = [hash_data(["block", fp, parse_digest]) for fp in fingerprints]
+        line_keys = [
+            hash_data(["lines", block_keys[i], config_digest, i, total_count])
+            for i in range(total_count)
+        ]
+
+        pages: List[Optional[ProcessedPages]] = []
+        for key in line_keys:
+            cached = page_store.get(key)
+            pages.append(ProcessedPages(json.loads(cached)) if cached is not None else None)
+
+        to_process = [i for i in range(total_count) if pages[i] is None]
+        blocks: Dict[int, str] = {}
+        to_parse: List[int] = []
+
+        for i in to_process:
+            cached = page_store.get(block_keys[i])
+            if cached is not None:
+                blocks[i] = cached.decode('utf-8')
+            else:
+                to_parse.append(i)
+
+        use_pool = parallel_parse and cores > 1 and len(to_parse) > 1
+        if not use_pool:
+            for i in to_parse:
+                page = pdf.pages[i]
+                blocks[i] = _join_page_elements(
+                    _get_page_elements(page, plan.table_config)
+                )
+                page.close()
+
+    if to_parse and use_pool:
+        range_tasks = [
+            PageRangeTask(pdf_path, [to_parse[j] for j in index_range], total_count)
+            for index_range in split_page_ranges(len(to_parse), cores)
+        ]
+        with _new_pool(min(cores, len(range_tasks)), plan) as pool:
+            for task, range_blocks in zip(range_tasks,
+                                          _pool_map(pool, _parse_page_blocks, range_tasks)):
+                blocks.update(zip(task.page_numbers, range_blocks))
+
+    for i in to_parse:
+        page_store.put(block_keys[i], blocks[i].encode('utf-8'))
+
+    tasks = [PageTask(i, blocks[i], total_count) for i in to_process]
+
+    for i, page in zip(to_process, _map_page_blocks(tasks, plan, cores)):
+        pages[i] = page
+        if not page.budget_cut:
+            page_store.put(line_keys[i], json.dumps(page.lines).encode('utf-8'))
+
+    if len(to_process) < total_count:
+        print(f"INFO: Reused {total_count - len(to_process)}/{total_count} cached pages, "
+              f"parsed {len(to_parse)}.")
+
+    return _join_pages(pages)
 
 
 def extract_text_from_pdf(
@@ -253,49 +856,294 @@ def extract_text_from_pdf(
     allowed_chars_regex_string: str,
     footer_regex_patterns: List[str],
     spelling_locale: str,
-    ignore_list: List[str]
-) -> Tuple[Optional[str], Optional[str]]:
-
+    ignore_list: List[str],
+    page_store: Optional[Any] = None
+) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Returns (content, error, budget_cut). budget_cut is set when the footer
+    match budget changed the content, which must then not be cached.
+    """
     if not os.path.exists(pdf_path):
-        return None, f"Error: PDF file not found at '{pdf_path}'"
-
-    from pdf_fmt.core import post_process_content
+        return None, f"Error: PDF file not found at '{pdf_path}'", False
 
-    fmt_cfg = config.get("formatting", {})
     proc_cfg = config.get("processing", {})
-    table_cfg = fmt_cfg.get("extract_table", {})
+    plan = build_processing_plan(
+        config, allowed_chars_regex_string, footer_regex_patterns,
+        spelling_locale, ignore_list
+    )
 
-    max_cores = max(1, os.cpu_count() - 1)
-    cores_used = int(proc_cfg.get("cores", max_cores))
+    cores_used = get_validated_cores(config)
+
+    if is_native_document(pdf_path):
+        try:
+            with profile_stage("parse"):
+                page_data_blocks = extract_page_blocks(pdf_path)
+        except Exception as e:
+            return None, f"An error occurred during document parsing: {e}", False
+        return _process_page_blocks(page_data_blocks, config, plan, cores_used,
+                                    keep_list_levels=True)
+
+    if page_store is not None:
+        try:
+            with profile_stage("incremental"):
+                extracted = _extract_incremental(
+                    pdf_path, config, plan, page_store, cores_used
+                )
+        except Exception as e:
+            return None, f"An error occurred during PDF parsing: {e}", False
+
+        with profile_stage("post_process"):
+            return _finish_content(extracted, config)
+
+    if proc_cfg.get("parallel_parse", False) and cores_used > 1:
+        try:
+            with profile_stage("parallel_parse"):
+                extracted = _run_parallel_parse(pdf_path, plan, cores_used)
+        except Exception as e:
+            return None, f"An error occurred during PDF parsing: {e}", False
+
+        if extracted is not None:
+            with profile_stage("post_process"):
+                return _finish_content(extracted, config)
 
     page_data_blocks: List[str] = []
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with profile_stage("parse"), _open_pdf(pdf_path) as pdf:
             for page in pdf.pages:
-                elements = _get_page_elements(page, table_cfg)
-                page_data_blocks.append(
-                    "\n\n".join(content for _, content in elements)
-                )
+                elements = _get_page_elements(page, plan.table_config)
+                page_data_blocks.append(_join_page_elements(elements))
     except Exception as e:
-        return None, f"An error occurred during PDF parsing: {e}"
+        return None, f"An error occurred during PDF parsing: {e}", False
 
+    return _process_page_blocks(page_data_blocks, config, plan, cores_used)
+
+
+def _process_page_blocks(
+    page_data_blocks: List[str],
+    config: Dict[str, Any],
+    plan: ProcessingPlan,
+    cores: int,
+    keep_list_levels: bool = False
+) -> Tuple[str, None, bool]:
+    """Processes the parsed page blocks of a document into its content."""
     total_count = len(page_data_blocks)
 
-    pool_args = [
-        PageProcessArgs(
-            page_num=i,
-            page_text=block,
-            config=config,
-            allowed_chars_regex=allowed_chars_regex_string,
-            footer_patterns=footer_regex_patterns,
-            spelling_locale=spelling_locale,
-            ignore_list=ignore_list,
-            total_pages=total_count
-        )
+    tasks = [
+        PageTask(i, block, total_count, keep_list_levels)
         for i, block in enumerate(page_data_blocks)
     ]
 
-    extracted_lines = _run_processing_pool(pool_args, cores_used)
+    with profile_stage("process"):
+        extracted = _run_processing_pool(tasks, plan, cores)
+
+    with profile_stage("post_process"):
+        return _finish_content(extracted, config)
+
+
+def iter_extracted_pages(
+    pdf_path: str,
+    config: Dict[str, Any],
+    allowed_chars_regex_string: str,
+    footer_regex_patterns: List[str],
+    spelling_locale: str,
+    ignore_list: List[str]
+) -> Iterator[List[str]]:
+    """
+    Generator variant of extract_text_from_pdf for streaming output.
+    Yields the processed lines of each page in page order, before enclosures
+    are applied.
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"PDF file not found at '{pdf_path}'")
+
+    proc_cfg = config.get("processing", {})
+    plan = build_processing_plan(
+        config, allowed_chars_regex_string, footer_regex_patterns,
+        spelling_locale, ignore_list
+    )
+
+    cores_used = get_validated_cores(config)
 
-    return post_process_content(extracted_lines, config), None
+    if is_native_document(pdf_path):
+        blocks = extract_page_blocks(pdf_path)
+        total_count = len(blocks)
+        pool = (_open_pool(cores_used, plan)
+                if cores_used > 1 and total_count > 1 else None)
+        yield from _iter_processed(
+            (PageTask(i, block, total_count, True) for i, block in enumerate(blocks)),
+            plan, pool
+        )
+        return
+
+    with _open_pdf(pdf_path) as pdf:
+        total_count = len(pdf.pages)
+        pool = (_open_pool(cores_used, plan)
+                if cores_used > 1 and total_count > 1 else None)
+
+        if pool is not None and proc_cfg.get("parallel_parse", False):
+            range_tasks = _build_range_tasks(pdf_path, total_count, cores_used)
+            with pool:
+                for pages in _pool_map(pool, _parse_page_range, range_tasks, lazy=True):
+                    yield from (page.lines for page in pages)
+            return
+
+        def page_tasks() -> Iterator[PageTask]:
+            for i, page in enumerate(pdf.pages):
+                block = _join_page_elements(
+                    _get_page_elements(page, plan.table_config)
+                )
+                page.close()
+                yield PageTask(i, block, total_count)
+
+        yield from _iter_processed(page_tasks(), plan, pool)
+
+
+def _iter_processed(
+    tasks: Iterator[PageTask],
+    plan: ProcessingPlan,
+    pool: Optional[Any]
+) -> Iterator[List[str]]:
+    """Yields the processed lines of each task in order, closing the pool."""
+    if pool is None:
+        _install_plan(plan)
+        for task in tasks:
+            yield _process_page_text_block(task)
+        _record_spelling_stats()
+        return
+
+    with pool:
+        yield from _pool_map(pool, _process_page_text_block, tasks, lazy=True)
+
+
+BatchTask = Union[PageRangeTask, PageTask]
+
+
+def _run_batch_task(task: BatchTask) -> Tuple[List[ProcessedPages], Optional[str]]:
+    """
+    Worker entry point for batch runs. Errors are returned rather than raised
+    so that one broken document does not abort the whole batch.
+    """
+    try:
+        if isinstance(task, PageRangeTask):
+            return _parse_page_range(task), None
+        return [_process_page(task)], None
+    except Exception as e:
+        return [], str(e)
+
+
+def _iter_batch_tasks(
+    pdf_path: str,
+    plan: ProcessingPlan,
+    parallel_parse: bool,
+    cores: int
+) -> Iterator[BatchTask]:
+    """
+    Yields the tasks of a single document. With parallel parsing the workers
+    receive page ranges, otherwise each page is parsed here when its task is
+    requested and only the page processing is scheduled. DOCX, PPTX and ODT
+    documents are always read here.
+    """
+    if is_native_document(pdf_path):
+        blocks = extract_page_blocks(pdf_path)
+        yield from (PageTask(i, block, len(blocks), True) for i, block in enumerate(blocks))
+        return
+
+    with _open_pdf(pdf_path) as pdf:
+        total_count = len(pdf.pages)
+        if parallel_parse and cores > 1:
+            yield from _build_range_tasks(pdf_path, total_count, cores)
+            return
+
+        for i, page in enumerate(pdf.pages):
+            block = _join_page_elements(
+                _get_page_elements(page, plan.table_config)
+            )
+            page.close()
+            yield PageTask(i, block, total_count)
+
+
+def _batch_result(
+    index: int,
+    pages: List[ProcessedPages],
+    error: Optional[str],
+    config: Dict[str, Any]
+) -> Tuple[int, Optional[str], Optional[str], bool]:
+    if error:
+        return index, None, error, False
+    return (index,) + _finish_content(_join_pages(pages), config)
+
+
+def iter_batch_extracted(
+    pdf_paths: List[str],
+    config: Dict[str, Any],
+    plan: ProcessingPlan,
+    pool: Optional[Any] = None
+) -> Iterator[Tuple[int, Optional[str], Optional[str], bool]]:
+    """
+    Extracts many documents with one shared pool, which must have been
+    opened with the same plan. Pages of all documents are scheduled
+    together, and (index, content, error, budget_cut) is yielded for each
+    document in input order as soon as all of its pages are done.
+
+    Documents are parsed as the pool asks for work, at most a few tasks per
+    core ahead of the results collected, so parsing overlaps processing and
+    memory does not grow with the number of documents.
+    """
+    import threading
+    from collections import deque
+
+    cores_used = get_validated_cores(config)
+    parallel_parse = config.get("processing", {}).get("parallel_parse", False)
+    owners: Deque[int] = deque()
+    parse_errors: Dict[int, str] = {}
+    in_flight = threading.Semaphore(cores_used * 4) if pool is not None else None
+    stopped = threading.Event()
+
+    def tasks() -> Iterator[BatchTask]:
+        # Runs in the pool's task feeding thread, which waits on in_flight
+        for index, pdf_path in enumerate(pdf_paths):
+            try:
+                for task in _iter_batch_tasks(
+                    pdf_path, plan, parallel_parse and pool is not None, cores_used
+                ):
+                    if in_flight is not None:
+                        in_flight.acquire()
+                    if stopped.is_set():
+                        return
+                    owners.append(index)
+                    yield task
+            except Exception as e:
+                parse_errors[index] = f"An error occurred during PDF parsing: {e}"
+
+    if pool is not None:
+        results = _pool_map(pool, _run_batch_task, tasks(), lazy=True)
+    else:
+        _install_plan(plan)
+        results = map(_run_batch_task, tasks())
+
+    next_index = 0
+    pages: List[ProcessedPages] = []
+    error: Optional[str] = None
+    try:
+        for page_results, task_error in results:
+            if in_flight is not None:
+                in_flight.release()
+            owner = owners.popleft()
+            # Every earlier document has no tasks left
+            while next_index < owner:
+                yield _batch_result(next_index, pages, parse_errors.get(next_index) or error, config)
+                next_index, pages, error = next_index + 1, [], None
+
+            if task_error and not error:
+                error = f"An error occurred during PDF parsing: {task_error}"
+            pages.extend(page_results)
+
+        while next_index < len(pdf_paths):
+            yield _batch_result(next_index, pages, parse_errors.get(next_index) or error, config)
+            next_index, pages, error = next_index + 1, [], None
+    finally:
+        # Lets a feeding thread that is waiting for room finish
+        stopped.set()
+        if in_flight is not None:
+            in_flight.release()
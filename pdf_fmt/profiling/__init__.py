@@ -0,0 +1,312 @@
+"""
+Wall time, CPU time and memory growth of pipeline stages and pages, and the
+peak memory of the run.
+
+Stages are timed in the main process. Pages are timed wherever they are
+parsed or processed; pool workers return their page records together with
+their results, so time spent inside workers is part of the report. Page
+stages named "parent/child" are nested in another stage and are left out
+of the page totals.
+"""
+
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+PROFILE_HOOKS = ("cprofile", "tracemalloc")
+DEFAULT_REPORT_PATH = "pdf-fmt-profile.json"
+DEFAULT_TOP_PAGES = 10
+
+
+class StageRecord(NamedTuple):
+    name: str
+    wall: float
+    cpu: float
+    children_cpu: float
+    rss_delta_kb: Optional[int]
+
+
+class PageRecord(NamedTuple):
+    page_num: int
+    stage: str
+    wall: float
+    cpu: float
+    rss_delta_kb: Optional[int]
+    pid: int
+
+
+def _load_resource() -> Optional[Any]:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows, memory figures are reported as null
+        return None
+    return resource
+
+
+def peak_rss_kb(children: bool = False) -> Optional[int]:
+    """Returns the peak resident set size of this process (or its children) in KB."""
+    resource = _load_resource()
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def current_rss_kb() -> Optional[int]:
+    """
+    Returns the current resident set size of this process in KB. Unlike the
+    peak, it can be compared before and after a stage. None where /proc is
+    not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _rss_delta(before: Optional[int]) -> Optional[int]:
+    after = current_rss_kb()
+    return after - before if before is not None and after is not None else None
+
+
+def _add_kb(total: Optional[int], delta: Optional[int]) -> Optional[int]:
+    return delta if total is None else total + (delta or 0)
+
+
+def _children_cpu() -> float:
+    resource = _load_resource()
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+# Per-process page records, None while page timing is disabled
+_PAGE_RECORDS: Optional[List[PageRecord]] = None
+
+
+def enable_page_records(records: Optional[List[PageRecord]] = None) -> None:
+    """Starts collecting page records in this process."""
+    global _PAGE_RECORDS
+    _PAGE_RECORDS = records if records is not None else []
+
+
+def drain_page_records() -> List[PageRecord]:
+    """Returns and clears the page records collected in this process."""
+    global _PAGE_RECORDS
+    records = _PAGE_RECORDS or []
+    _PAGE_RECORDS = []
+    return records
+
+
+@contextmanager
+def page_timer(page_num: int, stage: str) -> Iterator[None]:
+    """Times one stage of one page, if page timing is enabled."""
+    records = _PAGE_RECORDS
+    if records is None:
+        yield
+        return
+
+    wall, cpu, rss = time.perf_counter(), time.process_time(), current_rss_kb()
+    try:
+        yield
+    finally:
+        records.append(PageRecord(
+            page_num, stage, time.perf_counter() - wall,
+            time.process_time() - cpu, _rss_delta(rss), os.getpid()
+        ))
+
+
+class Profiler:
+    """Collects the stage and page records of one run."""
+
+    def __init__(self):
+        self.stages: List[StageRecord] = []
+        self.pages: List[PageRecord] = []
+        self.worker_counters: Dict[int, Dict[str, Dict[str, int]]] = {}
+        self.counters: Dict[str, Any] = {}
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._children_start = _children_cpu()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu, children = time.perf_counter(), time.process_time(), _children_cpu()
+        rss = current_rss_kb()
+        try:
+            yield
+        finally:
+            self.stages.append(StageRecord(
+                name, time.perf_counter() - wall, time.process_time() - cpu,
+                _children_cpu() - children, _rss_delta(rss)
+            ))
+
+    def add_worker_result(self, pid: int, records: List[PageRecord],
+                          counters: Optional[Dict[str, Dict[str, int]]]) -> None:
+        """Merges what a worker recorded; counters are cumulative per worker."""
+        self.pages.extend(records)
+        if counters:
+            self.worker_counters[pid] = counters
+
+    def _merged_counters(self) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {name: dict(values) for name, values in self.counters.items()}
+        for counters in self.worker_counters.values():
+            for name, values in counters.items():
+                total = merged.setdefault(name, {})
+                for key, value in values.items():
+                    total[key] = total.get(key, 0) + value
+        return merged
+
+    def _page_totals(self) -> List[Dict[str, Any]]:
+        totals: Dict[int, Dict[str, Any]] = {}
+        for record in self.pages:
+            page = totals.setdefault(record.page_num, {
+                "page": record.page_num + 1, "wall": 0.0, "cpu": 0.0,
+                "rss_delta_kb": None, "stages": {}
+            })
+            if "/" not in record.stage:
+                page["wall"] += record.wall
+                page["cpu"] += record.cpu
+                page["rss_delta_kb"] = _add_kb(page["rss_delta_kb"], record.rss_delta_kb)
+            stage = page["stages"].setdefault(record.stage, {"wall": 0.0, "cpu": 0.0})
+            stage["wall"] += record.wall
+            stage["cpu"] += record.cpu
+        return [totals[page_num] for page_num in sorted(totals)]
+
+    def report(self) -> Dict[str, Any]:
+        stages: Dict[str, Dict[str, Any]] = {}
+        for record in self.stages:
+            stage = stages.setdefault(record.name, {
+                "wall": 0.0, "cpu": 0.0, "children_cpu": 0.0, "rss_delta_kb": None, "calls": 0
+            })
+            stage["wall"] += record.wall
+            stage["cpu"] += record.cpu
+            stage["children_cpu"] += record.children_cpu
+            stage["rss_delta_kb"] = _add_kb(stage["rss_delta_kb"], record.rss_delta_kb)
+            stage["calls"] += 1
+
+        page_stages: Dict[str, Dict[str, float]] = {}
+        for record in self.pages:
+            stage = page_stages.setdefault(record.stage, {"wall": 0.0, "cpu": 0.0, "pages": 0})
+            stage["wall"] += record.wall
+            stage["cpu"] += record.cpu
+            stage["pages"] += 1
+
+        return {
+            "wall": time.perf_counter() - self._start,
+            "cpu": time.process_time() - self._cpu_start,
+            "children_cpu": _children_cpu() - self._children_start,
+            "peak_rss_kb": peak_rss_kb(),
+            "children_peak_rss_kb": peak_rss_kb(children=True),
+            "workers": sorted({record.pid for record in self.pages} - {os.getpid()}),
+            "stages": stages,
+            "page_stages": page_stages,
+            "pages": self._page_totals(),
+            "counters": self._merged_counters(),
+        }
+
+    def summary(self, report: Dict[str, Any], top_n: int) -> str:
+        lines = [f"Profile: {report['wall']:.3f}s wall, {report['cpu']:.3f}s CPU "
+                 f"(+{report['children_cpu']:.3f}s in child processes)"]
+        for name, stage in report["stages"].items():
+            lines.append(f"  {name:<20} {stage['wall']:>9.3f}s wall {stage['cpu']:>9.3f}s CPU")
+
+        slowest = sorted(report["pages"], key=lambda page: page["wall"], reverse=True)[:top_n]
+        if slowest:
+            lines.append(f"Slowest {len(slowest)} of {len(report['pages'])} pages:")
+        for page in slowest:
+            detail = ", ".join(f"{name} {stage['wall'] * 1000:.1f}ms"
+                               for name, stage in page["stages"].items())
+            lines.append(f"  page {page['page']:>5} {page['wall'] * 1000:>9.1f}ms  ({detail})")
+        return "\n".join(lines)
+
+
+# The profiler of the running command, None unless --profile is given
+_ACTIVE: Optional[Profiler] = None
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _ACTIVE
+
+
+def is_profiling() -> bool:
+    return _ACTIVE is not None
+
+
+def profile_stage(name: str):
+    """Times a stage of the running command, or does nothing when not profiling."""
+    return _ACTIVE.stage(name) if _ACTIVE is not None else nullcontext()
+
+
+def _start_hook(hook: Optional[str]) -> Optional[Any]:
+    if hook == "cprofile":
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+    if hook == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start(25)
+    return None
+
+
+def _stop_hook(hook: Optional[str], handle: Optional[Any], report_path: str) -> Optional[str]:
+    base = os.path.splitext(report_path)[0]
+    if hook == "cprofile" and handle is not None:
+        handle.disable()
+        dump_path = f"{base}.prof"
+        handle.dump_stats(dump_path)
+        return dump_path
+    if hook == "tracemalloc":
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        dump_path = f"{base}.tracemalloc.txt"
+        with open(dump_path, "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:50]:
+                f.write(f"{stat}\n")
+        return dump_path
+    return None
+
+
+@contextmanager
+def profile_run(report_path: Optional[str], hook: Optional[str] = None,
+                top_n: int = DEFAULT_TOP_PAGES) -> Iterator[Optional[Profiler]]:
+    """
+    Profiles the enclosed run when report_path is set. The JSON report is
+    written and the summary printed to stderr even if the run exits early.
+    """
+    global _ACTIVE, _PAGE_RECORDS
+    if not report_path:
+        yield None
+        return
+
+    profiler = Profiler()
+    _ACTIVE = profiler
+    enable_page_records(profiler.pages)
+    handle = _start_hook(hook)
+    try:
+        yield profiler
+    finally:
+        dump_path = _stop_hook(hook, handle, report_path)
+        _ACTIVE = None
+        _PAGE_RECORDS = None
+
+        report = profiler.report()
+        try:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(profiler.summary(report, top_n), file=sys.stderr)
+            print(f"INFO: Profile written to '{report_path}'.", file=sys.stderr)
+            if dump_path:
+                print(f"INFO: {hook} output written to '{dump_path}'.", file=sys.stderr)
+        except OSError as e:
+            print(f"Warning: Could not write profile '{report_path}': {e}", file=sys.stderr)
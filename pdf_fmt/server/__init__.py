@@ -0,0 +1,380 @@
+"""
+Warm server mode. 'pdf-fmt --serve' keeps the imports, the loaded config and
+a worker pool alive and listens on a local Unix socket. Other invocations
+forward their command line to it, and run in-process when no server is
+listening.
+
+The protocol is JSON lines. A request is a single object, e.g.
+{"command": "run", "argv": [...], "cwd": "...", "env": {...},
+"config_path": "..."}. The server answers with {"out": text} and
+{"err": text} messages as the run prints, then {"exit": code}.
+"""
+
+import io
+import os
+import sys
+import json
+import stat
+import socket
+import tempfile
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+SOCKET_ENV = "PDF_FMT_SOCKET"
+CONNECT_TIMEOUT = 1.0
+
+
+def _private_temp_dir() -> str:
+    """The per-user directory for the socket when there is no runtime directory."""
+    user = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"pdf-fmt-{user}")
+
+
+def get_socket_path() -> str:
+    """
+    $PDF_FMT_SOCKET, else a per-user socket in the runtime directory, or in
+    a private directory under the temp directory.
+    """
+    env_path = os.environ.get(SOCKET_ENV)
+    if env_path:
+        return os.path.abspath(os.path.expanduser(env_path))
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "pdf-fmt.sock")
+    return os.path.join(_private_temp_dir(), "pdf-fmt.sock")
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def _is_private(path: str) -> bool:
+    """
+    True if path belongs to the current user and nobody else may use it.
+    Requests carry the command line, environment and config path, and
+    replies are printed as they are, so other users must not be able to
+    pose as the server.
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    if not is_supported() or not os.path.lexists(path):
+        return None
+    if not _is_private(path):
+        print(f"Warning: Ignoring '{path}', which is not a server socket private to this user.")
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+def _client_env() -> Dict[str, str]:
+    return {key: value for key, value in os.environ.items() if key.startswith("PDF_FMT_")}
+
+
+def forward_to_server(
+    argv: List[str],
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None
+) -> Optional[int]:
+    """
+    Runs the command line on the server and relays its output. Returns the
+    exit code, or None if no server answered and the caller should run
+    in-process.
+    """
+    sock = _connect(get_socket_path())
+    if sock is None:
+        return None
+
+    from pdf_fmt.config import find_config_file
+
+    out = stdout or sys.stdout
+    err = stderr or sys.stderr
+    received = False
+    with sock, sock.makefile("rb") as replies:
+        try:
+            _send(sock, {
+                "command": "run", "argv": argv, "cwd": os.getcwd(),
+                "env": _client_env(), "config_path": find_config_file(),
+            })
+            for raw in replies:
+                message = json.loads(raw)
+                received = True
+                if "out" in message:
+                    out.write(message["out"])
+                elif "err" in message:
+                    err.write(message["err"])
+                elif "exit" in message:
+                    out.flush()
+                    return message["exit"]
+        except BrokenPipeError:
+            # Our own stdout was closed, handled like any in-process run
+            raise
+        except (OSError, ValueError):
+            pass
+
+    if not received:
+        return None
+    print("Warning: Lost the connection to the pdf-fmt server.", file=err)
+    return 1
+
+
+def stop_server() -> int:
+    sock = _connect(get_socket_path())
+    if sock is None:
+        print("INFO: No pdf-fmt server is running.")
+        return 1
+    with sock, sock.makefile("rb") as replies:
+        _send(sock, {"command": "stop"})
+        replies.readline()
+    print("INFO: Stopped the pdf-fmt server.")
+    return 0
+
+
+class _SocketWriter(io.TextIOBase):
+    """
+    A text stream that sends every write to the client straight away.
+    Nothing is buffered, so processes forked during a run (image
+    extraction) cannot repeat output that was pending at the fork.
+    """
+
+    def __init__(self, sock: socket.socket, key: str):
+        self._sock = sock
+        self._key = key
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            _send(self._sock, {self._key: text})
+        return len(text)
+
+
+@contextmanager
+def _client_context(request: Dict[str, Any]) -> Iterator[None]:
+    """Runs a request in the client's directory with its PDF_FMT_* variables."""
+    saved_cwd = os.getcwd()
+    saved_env = _client_env()
+    try:
+        os.chdir(request.get("cwd") or saved_cwd)
+        for key in saved_env:
+            os.environ.pop(key, None)
+        os.environ.update(request.get("env") or {})
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        for key in _client_env():
+            os.environ.pop(key, None)
+        os.environ.update(saved_env)
+
+
+class WarmState:
+    """The config last loaded by the server and the pool built for it."""
+
+    def __init__(self):
+        self.config: Optional[Dict[str, Any]] = None
+        self.pool: Optional[Any] = None
+        self._defaults: Dict[str, Any] = {}
+
+    def refresh(self, config_path: Optional[str]) -> Dict[str, Any]:
+        """Reloads the config if its file changed, rebuilding the pool with it."""
+        from pdf_fmt.config import CONFIG_FILENAME, load_config
+
+        if config_path:
+            config = load_config(config_path)
+        else:
+            # The client found no config file, as load_config would report
+            print(f"Warning: Configuration file '{CONFIG_FILENAME}' not found. Using defaults.")
+            config = self._defaults
+
+        if config is not self.config:
+            self.config = config
+            self._rebuild_pool(config)
+        return config
+
+    def _rebuild_pool(self, config: Dict[str, Any]) -> None:
+        import multiprocessing
+        from pdf_fmt.parser import get_filter_settings
+        from pdf_fmt.processing import (
+            build_processing_plan, get_validated_cores, set_shared_pool, _install_plan
+        )
+        from pdf_fmt.spell import locale_checks
+
+        self.close()
+        cores = get_validated_cores(config)
+        if cores < 2:
+            return
+
+        # Workers must not inherit the stdout of the request being served
+        with redirect_stdout(sys.__stdout__), redirect_stderr(sys.__stderr__):
+            locale, ignores = locale_checks(config)
+            chars, footers = get_filter_settings(config)
+            plan = build_processing_plan(config, chars, footers, locale, ignores)
+            self.pool = multiprocessing.Pool(
+                processes=cores, initializer=_install_plan, initargs=(plan,)
+            )
+        set_shared_pool(self.pool, plan, cores)
+
+    def close(self) -> None:
+        from pdf_fmt.processing import set_shared_pool
+
+        set_shared_pool(None)
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+
+def _run_request(request: Dict[str, Any], state: WarmState, sock: socket.socket) -> int:
+    """Runs one forwarded command line, with its output sent to the client."""
+    from pdf_fmt.parser import execute_main_pipeline
+    from pdf_fmt.startup import StartupCheckError, setup_cli
+
+    saved_argv = sys.argv
+    with _client_context(request), \
+            redirect_stdout(_SocketWriter(sock, "out")), \
+            redirect_stderr(_SocketWriter(sock, "err")):
+        try:
+            sys.argv = ["pdf-fmt"] + list(request.get("argv") or [])
+            args = setup_cli()
+            config = state.refresh(request.get("config_path"))
+            execute_main_pipeline(config, args)
+            return 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code)
+            return 1
+        except StartupCheckError as e:
+            print(e.message)
+            return e.exit_code
+        except (BrokenPipeError, ConnectionError):
+            raise
+        except Exception as e:
+            print(f"Unknown error: {e}")
+            return 1
+        finally:
+            sys.argv = saved_argv
+
+
+def _handle_connection(sock: socket.socket, state: WarmState) -> bool:
+    """Serves one client. Returns False once the server was asked to stop."""
+    with sock.makefile("rb") as requests:
+        line = requests.readline()
+    if not line:
+        return True
+
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return True
+
+    if request.get("command") == "stop":
+        _send(sock, {"exit": 0})
+        return False
+
+    exit_code = _run_request(request, state, sock)
+    _send(sock, {"exit": exit_code})
+    return True
+
+
+def _preload() -> None:
+    """Imports what the first request would otherwise have to load."""
+    import multiprocessing  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import pdf_fmt.image  # noqa: F401
+    import pdf_fmt.parser  # noqa: F401
+
+
+def serve(path: Optional[str] = None) -> int:
+    """Runs the server in the foreground until it is stopped."""
+    if not is_supported():
+        print("Error: Server mode needs Unix domain sockets, which this platform lacks.")
+        return 1
+
+    path = path or get_socket_path()
+    directory = os.path.dirname(path)
+    if directory == _private_temp_dir():
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not _is_private(directory):
+            print(f"Error: '{directory}' must belong to this user with mode 0700. Not serving.")
+            return 1
+
+    if os.path.lexists(path):
+        if not (_is_private(path) and stat.S_ISSOCK(os.lstat(path).st_mode)):
+            print(f"Error: '{path}' exists and is not a socket private to this user. Not serving.")
+            return 1
+        existing = _connect(path)
+        if existing is not None:
+            existing.close()
+            print(f"Error: A pdf-fmt server is already listening on '{path}'.")
+            return 1
+        os.remove(path)
+
+    _preload()
+    state = WarmState()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Only the current user may connect, requests run with our permissions
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(8)
+    print(f"INFO: pdf-fmt server listening on '{path}'. Stop it with 'pdf-fmt --stop-server'.")
+    sys.stdout.flush()
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    if not _handle_connection(conn, state):
+                        break
+                except (BrokenPipeError, ConnectionError):
+                    # The client went away mid-run
+                    continue
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.close()
+        server.close()
+        if os.path.exists(path):
+            os.remove(path)
+    print("INFO: pdf-fmt server stopped.")
+    return 0
+
+
+def handle_server_args(args: Any) -> None:
+    """
+    Serves, stops the server, or forwards the command line to a running
+    server and exits with its status. Returns only if the command should
+    run in-process.
+    """
+    if args.serve:
+        sys.exit(serve())
+    if args.stop_server:
+        sys.exit(stop_server())
+    if args.no_server or args.file_path == "-":
+        return
+
+    exit_code = forward_to_server(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
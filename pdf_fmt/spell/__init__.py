@@ -2,57 +2,179 @@
 Spelling and clipboard helper
 """
 
-import re
-from typing import List, Any, Tuple, Dict
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import List, Any, Tuple, Dict, Callable, Optional
+
+from pdf_fmt.core import NON_ALPHA_PATTERN, preserve_case
 
 # Constants
 BREAME_ERROR = "Error: 'breame' library required for spelling. Run: pip install breame."
+SPELLING_LOCALES = ("EN-US", "EN-UK")
+DEFAULT_MEMO_SIZE = 65536
 
+# Precompiled tables: only words whose spelling differs, sorted by key.
+# Layout: header (magic, version, count), count + 1 record offsets, then
+# records of b"key\0value" so a lookup is a binary search over the mmap.
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+TABLE_FILES = {"EN-US": "en-us.tbl", "EN-UK": "en-uk.tbl"}
+TABLE_MAGIC = b"PFSP"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<4sHHI")
+TABLE_OFFSET = struct.Struct("<I")
 
-def enforce_spelling(text: str, locale: str, ignore_list: List[str]) -> str:
+_ENGINES: Dict[Tuple[str, Tuple[str, ...]], "SpellingEngine"] = {}
+_TABLES: Dict[str, Optional["SpellingTable"]] = {}
+
+
+class SpellingTable:
     """
-    Enforces US or UK spelling using the breame library, preserving case.
-    Handles local imports for breame and core utilities.
+    Read-only view of a precompiled spelling table. The file is memory
+    mapped, so worker processes share the same pages and nothing is parsed
+    up front.
     """
 
-    try:
-        from breame.spelling import get_american_spelling, get_british_spelling
-    except ImportError:
-        print(BREAME_ERROR)
-
-    try:
-        from pdf_fmt.core import NON_ALPHA_PATTERN, preserve_case
-    except ImportError:
-        # Fallback if pattern isn't available
-        NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z]')
-
-        def preserve_case(original: str, modified: str) -> str:
-            if original.isupper():
-                return modified.upper()
-            if original[0].isupper():
-                return modified.capitalize()
-            return modified
-
-    ignore_set = {s.lower() for s in ignore_list}
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = TABLE_HEADER.unpack_from(self._map, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            self._map.close()
+            raise ValueError(f"'{path}' is not a version {TABLE_VERSION} spelling table.")
+
+        self._count = count
+        self._offsets = TABLE_HEADER.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, index: int) -> Tuple[int, int, int]:
+        start, end = struct.unpack_from("<II", self._map, self._offsets + 4 * index)
+        return start, self._map.find(b"\0", start, end), end
+
+    def get(self, word: str) -> str:
+        """Returns the replacement for a lowercase word, or the word itself."""
+        key = word.encode("utf-8")
+        table = self._map
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, sep, end = self._record(mid)
+            probe = table[start:sep]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return table[sep + 1:end].decode("utf-8")
+        return word
+
+
+def write_spelling_table(path: str, mapping: Dict[str, str]) -> int:
+    """Writes the entries that change a word to a table file, returning the count."""
+    entries = sorted(
+        (k.encode("utf-8"), v.encode("utf-8")) for k, v in mapping.items() if k != v
+    )
+    records = [k + b"\0" + v for k, v in entries]
+
+    offset = TABLE_HEADER.size + TABLE_OFFSET.size * (len(records) + 1)
+    offsets = []
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+    offsets.append(offset)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, 0, len(records)))
+        f.write(b"".join(TABLE_OFFSET.pack(o) for o in offsets))
+        f.write(b"".join(records))
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def build_spelling_tables(output_dir: str = TABLE_DIR) -> None:
+    """Builds the US and UK tables from breame. Run at build time."""
+    from breame.spelling import AMERICAN_ENGLISH_SPELLINGS, BRITISH_ENGLISH_SPELLINGS
+
+    os.makedirs(output_dir, exist_ok=True)
+    # get_american_spelling looks words up in the British table and vice versa
+    sources = {"EN-US": BRITISH_ENGLISH_SPELLINGS, "EN-UK": AMERICAN_ENGLISH_SPELLINGS}
+    for locale, mapping in sources.items():
+        path = os.path.join(output_dir, TABLE_FILES[locale])
+        count = write_spelling_table(path, mapping)
+        print(f"INFO: Wrote {count} {locale} spellings to '{path}'.")
+
+
+def load_spelling_table(locale: str) -> Optional[SpellingTable]:
+    """Maps the precompiled table for a locale once per process, if present."""
     locale_upper = locale.upper()
+    if locale_upper not in _TABLES:
+        table = None
+        filename = TABLE_FILES.get(locale_upper)
+        if filename:
+            try:
+                table = SpellingTable(os.path.join(TABLE_DIR, filename))
+            except (OSError, ValueError, struct.error):
+                table = None
+        _TABLES[locale_upper] = table
+    return _TABLES[locale_upper]
+
+
+class SpellingEngine:
+    """
+    Enforces US or UK spelling, preserving case. Looks words up in the
+    precompiled tables and falls back to the breame library without them.
+    Created once per locale. Lecture text repeats the same words, so every
+    converted word is kept in a bounded LRU memo.
+    """
 
-    def process_word(word: str) -> str:
+    def __init__(
+        self,
+        locale: str,
+        ignore_list: List[str],
+        memo_size: int = DEFAULT_MEMO_SIZE
+    ):
+        self.locale_upper = locale.upper()
+        self.ignore_set = {s.lower() for s in ignore_list}
+        self._lookup = self._resolve_lookup()
+        self._convert = lru_cache(maxsize=memo_size)(self._convert_word)
+
+    def _resolve_lookup(self) -> Callable[[str], str]:
+        table = load_spelling_table(self.locale_upper)
+        if table is not None:
+            return table.get
+
+        # Tables are missing in source checkouts that never ran `make tables`
+        try:
+            from breame.spelling import (
+                get_american_spelling, get_british_spelling
+            )
+        except ImportError:
+            print(BREAME_ERROR)
+            return lambda word: word
+
+        if self.locale_upper == "EN-US":
+            return get_american_spelling
+        if self.locale_upper == "EN-UK":
+            return get_british_spelling
+        return lambda word: word
+
+    def _convert_word(self, word: str) -> str:
         clean_word = NON_ALPHA_PATTERN.sub('', word)
         if not clean_word:
             return word
 
         word_to_lookup_lower = clean_word.lower()
-        if word_to_lookup_lower in ignore_set:
+        if word_to_lookup_lower in self.ignore_set:
             return word
 
         try:
-            if locale_upper == "EN-US":
-                base_converted = get_american_spelling(word_to_lookup_lower)
-            elif locale_upper == "EN-UK":
-                base_converted = get_british_spelling(word_to_lookup_lower)
-            else:
-                base_converted = word_to_lookup_lower
-        except (ValueError, Exception):
+            base_converted = self._lookup(word_to_lookup_lower)
+        except Exception:
             base_converted = word_to_lookup_lower
 
         # If no change was made, return original; otherwise preserve case
@@ -62,9 +184,35 @@ def enforce_spelling(text: str, locale: str, ignore_list: List[str]) -> str:
         case_preserved_word = preserve_case(clean_word, base_converted)
         return word.replace(clean_word, case_preserved_word, 1)
 
-    return " ".join(process_word(w) for w in text.split())
+    def enforce_line(self, text: str) -> str:
+        convert = self._convert
+        return " ".join([convert(w) for w in text.split()])
+
+    def enforce_lines(self, lines: List[str]) -> List[str]:
+        """Enforces spelling on every line of a page in one pass."""
+        convert = self._convert
+        return [" ".join([convert(w) for w in line.split()]) for line in lines]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the memo's hit and miss counts."""
+        info = self._convert.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+def get_spelling_engine(locale: str, ignore_list: List[str]) -> SpellingEngine:
+    """Returns the engine for a locale, creating it on first use."""
+    key = (locale.upper(), tuple(ignore_list))
+    engine = _ENGINES.get(key)
+    if engine is None:
+        engine = _ENGINES[key] = SpellingEngine(locale, ignore_list)
+    return engine
 
 
+def enforce_spelling(text: str, locale: str, ignore_list: List[str]) -> str:
+    """
+    Enforces US or UK spelling using the breame library, preserving case.
+    """
+    return get_spelling_engine(locale, ignore_list).enforce_line(text)
 
 
 def locale_checks(CONFIG: Dict[str, Any]) -> Tuple[str, List[str]]:
@@ -2,23 +2,28 @@ import sys
 import os
 import platform
 import getpass
-import ctypes
 import argparse
 import re
-import importlib.metadata
+import glob
+from functools import lru_cache
 
+from pdf_fmt.profiling import PROFILE_HOOKS, DEFAULT_REPORT_PATH, DEFAULT_TOP_PAGES
 
+
+@lru_cache(maxsize=None)
 def get_script_version() -> str:
     """
     Resolves version with support for:
     1. CI Environment variables (PDF_FMT_VERSION).
     2. Local root execution (./pyproject.toml).
     3. Installed package execution (../../pyproject.toml).
+    Resolved on first use, importlib.metadata is slow to import.
     """
     ci_version = os.environ.get('PDF_FMT_VERSION')
     if ci_version:
         return ci_version
 
+    import importlib.metadata
     try:
         return importlib.metadata.version("pdf-fmt")
     except importlib.metadata.PackageNotFoundError:
@@ -44,7 +49,13 @@ def get_script_version() -> str:
     return "0.1.0"
 
 
-SCRIPT_VERSION = get_script_version()
+def __getattr__(name: str) -> str:
+    # SCRIPT_VERSION is resolved lazily, see get_script_version
+    if name == "SCRIPT_VERSION":
+        return get_script_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 IS_CI_BUILD = os.environ.get('PDF_FMT_CI_BUILD', '0') == '1'
 IS_NUITKA_COMPILED = "__compiled__" in globals()
 
@@ -97,6 +108,7 @@ Please run this application as a regular user.
 
     elif platform.system() == 'Windows':
         try:
+            import ctypes
             if ctypes.windll.shell32.IsUserAnAdmin():
                 message = non_admin_warning
                 raise StartupCheckError(message, 1)
@@ -107,6 +119,24 @@ Please run this application as a regular user.
                 raise StartupCheckError(message, 1)
 
 
+class _VersionAction(argparse.Action):
+    """Like argparse's 'version' action, but resolves the version when used."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS,
+                 default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest,
+                         default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        parser._print_message(f"{parser.prog} {get_script_version()}\n", sys.stdout)
+        parser.exit()
+
+
+def is_glob_pattern(path: str) -> bool:
+    """True if the path is a glob pattern rather than an existing file name."""
+    return glob.has_magic(path) and not os.path.exists(path)
+
+
 def setup_cli() -> argparse.Namespace:
     default_str: str = """pdf-fmt
 
@@ -115,6 +145,12 @@ Licensed under GPLv3.
     """
     path_str: str = """
 Path to the file. Use '-' or leave empty to read from stdin (pipe).
+Pass several files, a directory or a glob pattern to process them
+in one run.
+    """
+    output_dir_str: str = """
+Write one output file per input into this directory, instead of
+collating all inputs into a single output.
     """
 
     parser = argparse.ArgumentParser(
@@ -123,21 +159,92 @@ Path to the file. Use '-' or leave empty to read from stdin (pipe).
         formatter_class=argparse.RawTextHelpFormatter
     )
     parser.add_argument(
-        'file_path',
-        nargs='?',
-        default=None,
+        'file_paths',
+        nargs='*',
+        metavar='file_path',
         help=path_str
     )
 
+    parser.add_argument(
+        '-o', '--output-dir',
+        default=None,
+        help=output_dir_str
+    )
+
+    parser.add_argument(
+        '-s', '--stream',
+        action='store_true',
+        help="Write each page as soon as it is formatted instead of\nbuilding the whole document first."
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Ignore and do not update the extraction cache."
+    )
+
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help="Run a warm background server on a local socket. Other\ninvocations forward to it while it runs."
+    )
+
+    parser.add_argument(
+        '--stop-server',
+        action='store_true',
+        help="Stop the running server."
+    )
+
+    parser.add_argument(
+        '--no-server',
+        action='store_true',
+        help="Run in this process even if a server is running."
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Report wall time, CPU time and peak memory per stage and per\npage, including time spent in worker processes."
+    )
+
+    parser.add_argument(
+        '--profile-output',
+        default=DEFAULT_REPORT_PATH,
+        metavar='REPORT',
+        help=f"Where --profile writes its JSON report (default: {DEFAULT_REPORT_PATH})."
+    )
+
+    parser.add_argument(
+        '--profile-with',
+        choices=PROFILE_HOOKS,
+        default=None,
+        help="Also run cProfile or tracemalloc and dump its results next\nto the report."
+    )
+
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=DEFAULT_TOP_PAGES,
+        metavar='N',
+        help=f"Number of slowest pages to print (default: {DEFAULT_TOP_PAGES})."
+    )
+
     parser.add_argument(
         '-v', '--version',
-        action='version',
-        version=f'%(prog)s {SCRIPT_VERSION}',
+        action=_VersionAction,
         help="Show script's version and exit."
     )
 
     try:
         args = parser.parse_args()
+        args.file_path = args.file_paths[0] if args.file_paths else None
+        if args.serve or args.stop_server:
+            return args
+
+        args.batch = (len(args.file_paths) > 1 or args.output_dir is not None
+                      or (args.file_path is not None
+                          and (os.path.isdir(args.file_path)
+                               or is_glob_pattern(args.file_path))))
 
         cond: bool = (args.file_path == "-" or
                       (args.file_path is None and not sys.stdin.isatty())
@@ -156,8 +263,9 @@ Path to the file. Use '-' or leave empty to read from stdin (pipe).
         os.dup2(devnull, sys.stdout.fileno())
         sys.exit(0)
 
-    if not os.path.exists(args.file_path):
-        message = f"Error: Input file not found at path: '{args.file_path}'"
-        raise StartupCheckError(message, 1)
+    for path in args.file_paths:
+        if not is_glob_pattern(path) and not os.path.exists(path):
+            message = f"Error: Input file not found at path: '{path}'"
+            raise StartupCheckError(message, 1)
 
     return args
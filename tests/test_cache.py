@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pdf_fmt.cache import DiskCache, hash_output_config
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmp.name, max_bytes=350)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.cache.put_text("ab" * 32, "hello")
+        self.assertEqual(self.cache.get_text("ab" * 32), "hello")
+        self.assertIsNone(self.cache.get_text("cd" * 32))
+
+    def test_evicts_least_recently_used(self):
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, b"x" * 100)
+            os.utime(self.cache._entry_path(key), (i, i))
+
+        # Reading the oldest entry makes it the most recently used one
+        self.cache.get(keys[0])
+        self.cache.put("99" * 32, b"x" * 100)
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_overwrites_are_counted_once_and_eviction_leaves_room(self):
+        key = "ab" * 32
+        for _ in range(5):
+            self.cache.put(key, b"x" * 100)
+        self.assertEqual(self.cache._total_bytes, 100)
+        self.assertIsNotNone(self.cache.get(key))
+
+        for i in range(3):
+            self.cache.put(f"{i:02d}" * 32, b"x" * 100)
+        self.assertLessEqual(self.cache._total_bytes, 350 * 0.9)
+
+        # Below the cap again, the next write does not rescan the namespace
+        with mock.patch.object(self.cache, "evict") as evict:
+            self.cache.put("77" * 32, b"x" * 10)
+        evict.assert_not_called()
+
+
+class TestConfigHash(unittest.TestCase):
+
+    def test_only_output_sections_change_the_hash(self):
+        config = {"filters": {"footer_regexes": ["^x$"]}, "actions": {"copy": True}}
+        base = hash_output_config(config, "en-UK", [])
+
+        config["actions"]["copy"] = False
+        self.assertEqual(hash_output_config(config, "en-UK", []), base)
+
+        config["filters"]["footer_regexes"].append("^y$")
+        self.assertNotEqual(hash_output_config(config, "en-UK", []), base)
+        self.assertNotEqual(hash_output_config({}, "en-US", []),
+                            hash_output_config({}, "en-UK", []))
+
+
+if __name__ == '__main__':
+    print("Run from root directory, see README for instructions")
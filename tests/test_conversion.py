@@ -0,0 +1,204 @@
+import io
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from pdf_fmt import conversion
+from pdf_fmt.cache import DiskCache
+from pdf_fmt.conversion import convert_many, convert_to_pdf, remove_converted
+
+# Stands in for soffice: logs each launch and writes '<stem>.pdf' to --outdir
+FAKE_SOFFICE = """#!{python}
+import os, sys
+args = sys.argv[1:]
+with open(os.environ["FAKE_SOFFICE_LOG"], "a") as log:
+    log.write(" ".join(args) + "\\n")
+if args == ["--version"]:
+    sys.exit(0)
+out_dir = args[args.index("--outdir") + 1]
+for path in args[args.index("--outdir") + 2:]:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with open(os.path.join(out_dir, stem + ".pdf"), "w") as f:
+        f.write("%PDF-1.4 " + path)
+"""
+
+
+@unittest.skipIf(sys.platform == "win32", "the fake converter is a shell script")
+class TestLibreOfficeBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bin_dir = bin_dir = os.path.join(self.tmp.name, "bin")
+        os.makedirs(bin_dir)
+        self._install_tool("soffice", FAKE_SOFFICE)
+
+        self.log = os.path.join(self.tmp.name, "launches.log")
+        env = mock.patch.dict(os.environ, {
+            "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+            "FAKE_SOFFICE_LOG": self.log,
+            "PDF_FMT_CACHE_DIR": os.path.join(self.tmp.name, "cache"),
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        conversion._TOOLS = None
+        self.addCleanup(setattr, conversion, "_TOOLS", None)
+
+    def _install_tool(self, name, script):
+        tool = os.path.join(self.bin_dir, name)
+        with open(tool, "w") as f:
+            f.write(script.format(python=sys.executable))
+        os.chmod(tool, os.stat(tool).st_mode | stat.S_IEXEC)
+        return tool
+
+    def _make_docs(self, *names):
+        paths = []
+        for name in names:
+            path = os.path.join(self.tmp.name, name)
+            with open(path, "w") as f:
+                f.write(name)
+            paths.append(path)
+        return paths
+
+    def _launches(self):
+        with open(self.log) as f:
+            return [line.split() for line in f if line.strip() != "--version"]
+
+    def _version_checks(self):
+        with open(self.log) as f:
+            return sum(1 for line in f if line.strip() == "--version")
+
+    def test_files_are_converted_in_batches_with_isolated_profiles(self):
+        docs = self._make_docs("a.docx", "b.pptx", "c.odt", "a.pptx")
+        with redirect_stdout(io.StringIO()):
+            results = convert_many(docs, ["docx", "pptx", "odt"],
+                                   {"max_instances": 2, "batch_size": 2})
+
+        self.assertEqual([os.path.basename(path) for path, _ in results],
+                         ["a.pdf", "b.pdf", "c.pdf", "a.pdf"])
+        self.assertTrue(all(is_temp for _, is_temp in results))
+        with open(results[3][0]) as f:
+            self.assertTrue(f.read().endswith("a.pptx"))
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.endswith(".pdf")])
+        for path, _ in results:
+            remove_converted(path)
+        self.assertFalse(any(os.path.exists(os.path.dirname(path)) for path, _ in results))
+
+        launches = self._launches()
+        self.assertEqual(len(launches), 2)
+        profiles = {arg for launch in launches for arg in launch
+                    if arg.startswith("-env:UserInstallation=")}
+        self.assertEqual(len(profiles), 2)
+
+    def test_existing_pdfs_are_neither_converted_nor_overwritten(self):
+        existing, doc = self._make_docs("report.pdf", "report.docx")
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(convert_to_pdf(existing, ["docx"]), (existing, False))
+            pdf_path, is_temp = convert_to_pdf(doc, ["docx"])
+
+        self.assertTrue(is_temp)
+        self.assertNotEqual(os.path.dirname(pdf_path), self.tmp.name)
+        remove_converted(pdf_path)
+        with open(existing) as f:
+            self.assertEqual(f.read(), "report.pdf")
+
+    def test_unchanged_documents_are_converted_once(self):
+        doc, = self._make_docs("slides.pptx")
+        cache = DiskCache(os.path.join(self.tmp.name, "cache", "conversion"), 1024 * 1024)
+        with redirect_stdout(io.StringIO()):
+            first, _ = convert_to_pdf(doc, ["pptx"], cache=cache)
+            second, is_temp = convert_to_pdf(doc, ["pptx"], cache=cache)
+
+            with open(doc, "w") as f:
+                f.write("edited")
+            third, _ = convert_to_pdf(doc, ["pptx"], cache=cache)
+
+        self.assertTrue(is_temp)
+        self.assertNotEqual(first, second)
+        with open(first) as a, open(second) as b:
+            self.assertEqual(a.read(), b.read())
+        for path in (first, second, third):
+            remove_converted(path)
+        self.assertEqual(len(self._launches()), 2)
+
+    def test_tool_discovery_is_remembered_until_the_executable_changes(self):
+        self.assertEqual(conversion.discover_tools()[0].name, "soffice")
+        conversion._TOOLS = None
+        conversion.discover_tools()
+        self.assertEqual(self._version_checks(), 1)
+
+        tool = os.path.join(self.bin_dir, "soffice")
+        stat_result = os.stat(tool)
+        os.utime(tool, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+        conversion._TOOLS = None
+        conversion.discover_tools()
+        self.assertEqual(self._version_checks(), 2)
+
+    def test_formats_go_to_the_tool_that_handles_them(self):
+        # Pandoc reads '<input> -o <output>'
+        self._install_tool("pandoc", FAKE_SOFFICE.replace(
+            'out_dir = args[args.index("--outdir") + 1]\nfor path in args[args.index("--outdir") + 2:]:',
+            'out_dir = os.path.dirname(args[2])\nfor path in args[:1]:'
+        ))
+        docs = self._make_docs("notes.md", "slides.pptx", "letter.docx")
+        with redirect_stdout(io.StringIO()):
+            results = convert_many(docs, ["md", "pptx", "docx"],
+                                   {"preferred_tools": {"docx": "pandoc"}})
+
+        self.assertTrue(all(is_temp for _, is_temp in results))
+        launches = self._launches()
+        office = [launch for launch in launches if launch[0].startswith("-env:")]
+        pandoc = [os.path.basename(launch[0]) for launch in launches if launch not in office]
+        self.assertEqual([os.path.basename(launch[-1]) for launch in office], ["slides.pptx"])
+        self.assertEqual(sorted(pandoc), ["letter.docx", "notes.md"])
+        for path, _ in results:
+            remove_converted(path)
+
+    def test_profiles_in_use_by_another_process_are_skipped(self):
+        doc, = self._make_docs("a.docx")
+        profile_root = os.path.join(self.tmp.name, "cache", conversion.PROFILE_DIR_NAME)
+        os.makedirs(profile_root)
+        # A second open file holds the lock just as another process would
+        held = conversion._lock_file(os.path.join(profile_root, "profile-0.lock"))
+        self.addCleanup(held.close)
+        with redirect_stdout(io.StringIO()):
+            pdf_path, _ = convert_to_pdf(doc, ["docx"])
+        remove_converted(pdf_path)
+
+        launch, = self._launches()
+        self.assertTrue(launch[0].endswith("/profile-1"))
+
+    def test_files_cut_short_by_a_timeout_are_discarded(self):
+        # Finishes the first file, starts the second and hangs
+        self._install_tool("soffice", FAKE_SOFFICE.replace(
+            'for path in args[args.index("--outdir") + 2:]:\n    stem',
+            'import time\n'
+            'for i, path in enumerate(args[args.index("--outdir") + 2:]):\n'
+            '    if i:\n'
+            '        open(os.path.join(out_dir, "b.pdf"), "w").write("%PDF-1.4 partial")\n'
+            '        time.sleep(30)\n'
+            '    stem'
+        ).replace('f.write("%PDF-1.4 " + path)', 'f.write("%PDF-1.4 " + path + "\\n%%EOF\\n")'))
+        docs = self._make_docs("a.docx", "b.docx")
+        with redirect_stdout(io.StringIO()) as out:
+            results = convert_many(docs, ["docx"], {"timeout": 1})
+
+        self.assertEqual(os.path.basename(results[0][0]), "a.pdf")
+        self.assertEqual(results[1], (None, False))
+        self.assertIn("b.docx was stopped before it finished", out.getvalue())
+        self.assertEqual(os.listdir(os.path.dirname(results[0][0])), ["a.pdf"])
+        remove_converted(results[0][0])
+
+    def test_unsupported_formats_are_reported(self):
+        doc, = self._make_docs("notes.txt")
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(convert_to_pdf(doc, ["docx"]), (None, False))
+        self.assertIn("not in supported list", out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from pdf_fmt.core import EnclosureEngine, post_process_content
+
+
+class TestEnclosureEngine(unittest.TestCase):
+
+    def test_default_enclosure_scans_whole_text(self):
+        engine = EnclosureEngine([{"pattern": r"\[.*?\]", "wrapper": "`"},
+                                  {"pattern": "", "wrapper": "`"}])
+        self.assertTrue(engine.whole_text)
+        self.assertEqual(
+            engine.apply(["a [1, 2] b", "[x", "y]"]),
+            "a `[1, 2]` b\n[x\ny]"
+        )
+
+    def test_first_listed_enclosure_wins_at_same_position(self):
+        engine = EnclosureEngine([
+            {"pattern": r"fox|dog", "wrapper": "**"},
+            {"pattern": r"dog\w*", "wrapper": "_"},
+            {"pattern": r"\d+", "wrapper": "\\1"},
+        ])
+        self.assertEqual(engine.apply(["dogs and 12 hotdogs"]),
+                         "**dog**s and \\112\\1 hot**dog**s")
+
+    def test_patterns_spanning_lines_are_applied_per_line(self):
+        engine = EnclosureEngine([{"pattern": r"b\s+c", "wrapper": "|"}])
+        self.assertFalse(engine.whole_text)
+        self.assertEqual(engine.apply(["ab", "c b  c"]), "ab\nc |b  c|")
+
+    def test_anchors_do_not_match_inside_a_page_separator(self):
+        engine = EnclosureEngine([{"pattern": r"^--- Page \d+ ---$", "wrapper": "**"},
+                                  {"pattern": r"^intro", "wrapper": "_"}])
+        self.assertTrue(engine.whole_text)
+        lines = ["Intro text", "\n\n--- Page 2 ---\n\n", "More"]
+        self.assertEqual(engine.apply(lines), "_Intro_ text\n" + lines[1] + "\nMore")
+        self.assertEqual(engine.apply(["Intro", "--- Page 2 ---"]), "_Intro_\n**--- Page 2 ---**")
+
+    def test_backreferences_fall_back_to_sequential(self):
+        engine = EnclosureEngine([{"pattern": r"(a)\1", "wrapper": "*"},
+                                  {"pattern": r"\*a", "wrapper": "_"}])
+        self.assertTrue(engine.sequential)
+        self.assertEqual(engine.apply(["aa"]), "_*a_a*")
+
+    def test_invalid_pattern_warns_once(self):
+        config = {"formatting": {"regex_enclosures": [{"pattern": "[", "wrapper": "`"}]}}
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = post_process_content(["a [", "b"], config)
+        self.assertEqual(result, "a [\nb")
+        self.assertEqual(output.getvalue().count("Warning"), 1)
+
+
+if __name__ == '__main__':
+    print("Run from root directory, see README for instructions")
@@ -0,0 +1,103 @@
+import io
+import re
+import unittest
+from contextlib import redirect_stdout
+
+from pdf_fmt.core import compile_footer_patterns, is_ft_factory
+from pdf_fmt.filter import (
+    FooterMatcher, LITERAL_INDEX_THRESHOLD, backtracking_risk, load_re2,
+    rewrite_pattern
+)
+
+
+class TestFooterMatcher(unittest.TestCase):
+
+    PATTERNS = [
+        r'^\s*\d+\s*$',
+        r'^.*\s*[A-Za-z]+\d+\s.*$',
+        r'^.*Copyright.*$',
+        r'^.*All rights reserved.*$',
+        r'^Page\s\d.*$',
+        r'^.*End$',
+        r'(ab)\1',
+        r'(?x) s k i p',
+    ]
+
+    LINES = [
+        "", "   ", " 12 ", "IT1234 notes", "copyright 2024", "Notes (COPYRIGHT)",
+        "ALL RIGHTS RESERVED.", "all rights  reserved", "page 3 of 10",
+        "the end", "end of chapter", "abab", "skip", "Ordinary sentence here.",
+        "ſtraße copyright", "Kelvin Page 1",
+    ]
+
+    def assert_same_as_individual(self, patterns):
+        compiled = compile_footer_patterns(patterns)
+        expected = is_ft_factory(compiled)
+        matcher = FooterMatcher(compiled)
+        for line in self.LINES:
+            self.assertEqual(matcher.matches(line), expected(line), line)
+        return matcher
+
+    def test_strategies_agree_with_individual_patterns(self):
+        matcher = self.assert_same_as_individual(self.PATTERNS)
+        self.assertEqual(matcher.literals, ["copyright", "all rights reserved"])
+        self.assertEqual([lit for lit, _ in matcher.gated], ["page", "end", "skip"])
+        # The backreference cannot share an alternation
+        self.assertEqual(len(matcher.individual), 1)
+
+    def test_literal_index_agrees_with_individual_patterns(self):
+        extra = [rf'^.*filler{i}.*$' for i in range(LITERAL_INDEX_THRESHOLD)]
+        matcher = self.assert_same_as_individual(self.PATTERNS + extra)
+        self.assertIsNotNone(matcher._literal_index)
+
+
+    @unittest.skipIf(load_re2() is None, "google-re2 not installed")
+    def test_re2_engine_agrees_with_individual_patterns(self):
+        compiled = compile_footer_patterns(self.PATTERNS[:-2])
+        expected = is_ft_factory(compiled)
+        matcher = FooterMatcher(compiled, engine="re2")
+        for line in self.LINES:
+            if line.isascii():
+                self.assertEqual(matcher.matches(line), expected(line), line)
+
+    def test_budget_skips_slowest_pattern_for_rest_of_page(self):
+        slow = re.compile(r'^(\w+\s?)*$')
+        matcher = FooterMatcher([slow, re.compile(r'^footer$')], budget_ms=5)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            matcher.start_page(4)
+            self.assertFalse(matcher.matches("a" * 22 + "!"))
+            self.assertTrue(matcher.matches("footer"))
+            self.assertFalse(matcher.matches("ab cd"))
+        self.assertIn("page 5", output.getvalue())
+        self.assertIn(slow.pattern, output.getvalue())
+
+        self.assertTrue(matcher.budget_exceeded())
+
+        matcher.start_page(5)
+        self.assertFalse(matcher.budget_exceeded())
+        self.assertTrue(matcher.matches("ab cd"))
+
+
+class TestBacktrackingRewrite(unittest.TestCase):
+
+    def test_redundant_repeats_next_to_dot_star_are_removed(self):
+        cases = {
+            r'^.*\s*[A-Za-z]+\d+\s.*$': r'^.*[A-Za-z]\d+\s.*$',
+            r'^.*\d+S\d+[vV]\d+.*$': r'^.*\dS\d+[vV]\d.*$',
+            r'[.*\s*]': r'[.*\s*]',
+            r'\\.*\s*': r'\\.*',
+            r'^.*?\s*x': r'^.*?\s*x',
+        }
+        for source, expected in cases.items():
+            self.assertEqual(rewrite_pattern(re.compile(source, re.I)).pattern, expected)
+
+    def test_backtracking_risk(self):
+        self.assertEqual(backtracking_risk(re.compile(r'(\w+\s?)*$')), "nested repeats")
+        self.assertIsNotNone(backtracking_risk(re.compile(r'\s*\s*x')))
+        self.assertIsNone(backtracking_risk(re.compile(r'\d+\s+x')))
+        self.assertIsNone(backtracking_risk(re.compile(r'^Page\s\d.*$')))
+
+
+if __name__ == '__main__':
+    print("Run from root directory, see README for instructions")
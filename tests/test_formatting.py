@@ -0,0 +1,39 @@
+import re
+import unittest
+
+from pdf_fmt.core import (
+    DEFAULT_CHARS_REGEX, ln_cont_factory, replace_successive_spaces
+)
+from pdf_fmt.formatting import (
+    fix_spacing, line_normalizer_factory, normalize_spacing,
+    replace_unicode_chars
+)
+
+
+class TestFusedNormalisation(unittest.TestCase):
+
+    LINES = [
+        "   The  “quick”   fox’s ﬁle\tis  x² ≤ 3  ",
+        "camelCaseWords and dataSet2Values",
+        "aBcD  1X   plain ascii line",
+        "  nbsp—dash",
+        "",
+    ]
+
+    def test_normalizer_matches_separate_passes(self):
+        pattern = re.compile(DEFAULT_CHARS_REGEX)
+        filter_content = ln_cont_factory(pattern)
+        normalize = line_normalizer_factory(pattern)
+        for line in self.LINES:
+            self.assertEqual(normalize(line), filter_content(replace_unicode_chars(line)))
+
+    def test_normalize_spacing_matches_separate_passes(self):
+        for line in self.LINES:
+            self.assertEqual(
+                normalize_spacing(line),
+                fix_spacing(replace_successive_spaces(line))
+            )
+
+
+if __name__ == '__main__':
+    print("Run from root directory, see README for instructions")
@@ -0,0 +1,191 @@
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from unittest import mock
+
+import pdfplumber
+from PIL import Image
+
+from pdf_fmt import image as image_module
+from pdf_fmt.parser import _run_image_pipeline
+from pdf_fmt.image import (
+    _PageRaster, _encode_png, _process_single_image, _read_embedded_image, _render_image,
+    extract_images_from_pdf, post_process_images
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from synthetic_pdf import build_corpus  # noqa: E402
+
+
+class _Stream:
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+
+def _stalled_range(task):
+    with open(os.path.join(os.environ["PDF_FMT_TEST_PIDS"], str(os.getpid())), "w"):
+        pass
+    time.sleep(60)
+
+
+def _is_running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+class TestImageExtraction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        # One page: a Flate logo, a JPEG picture and a Flate picture
+        cls.pdf_path = os.path.join(cls.tmp.name, "images.pdf")
+        build_corpus("images", cls.pdf_path, pages_scale=0.05)
+        cls.pages_path = os.path.join(cls.tmp.name, "pages.pdf")
+        build_corpus("images", cls.pages_path, pages_scale=0.2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.out = tempfile.TemporaryDirectory()
+        self.addCleanup(self.out.cleanup)
+
+    def _extract(self, **kwargs):
+        with redirect_stdout(io.StringIO()) as out:
+            images = extract_images_from_pdf(self.pdf_path, **kwargs)
+        return images, out.getvalue()
+
+    def test_embedded_images_keep_their_stored_data(self):
+        images, _ = self._extract(image_source="embedded")
+        self.assertEqual([(image.number, image.ext) for image in images],
+                         [(1, ".png"), (2, ".jpg"), (3, ".png")])
+
+        with pdfplumber.open(self.pdf_path) as pdf:
+            jpeg = pdf.pages[0].images[1]["stream"].get_rawdata()
+        self.assertEqual(images[1].data, jpeg)
+
+        # Written as JPEG again, the stored bytes are kept as they are
+        self.assertIsNone(_process_single_image((images[1], self.out.name, "doc", ["jpg"], 2000, "t")))
+        self.assertEqual(os.listdir(self.out.name), ["doc_t_p2_2.jpg"])
+        with open(os.path.join(self.out.name, "doc_t_p2_2.jpg"), "rb") as f:
+            self.assertEqual(f.read(), jpeg)
+
+    def test_render_source_rasterizes_every_image(self):
+        images, _ = self._extract(image_source="render")
+        self.assertEqual([(image.number, image.ext) for image in images],
+                         [(1, ".png"), (2, ".png"), (3, ".png")])
+        # Rendering is the default, so images match what the page shows
+        self.assertEqual(self._extract()[0], images)
+
+    def test_only_the_final_images_are_written(self):
+        images, _ = self._extract(image_source="embedded")
+        with redirect_stdout(io.StringIO()):
+            post_process_images(self.pdf_path, images, self.out.name, ["webp", "png"], 2000, 1)
+        names = sorted(os.listdir(self.out.name))
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith("images_") and name.endswith(".webp") for name in names))
+
+    def test_page_ranges_number_images_as_a_single_pass_would(self):
+        with redirect_stdout(io.StringIO()):
+            serial = extract_images_from_pdf(self.pages_path)
+            parallel = extract_images_from_pdf(self.pages_path, cores=2)
+        self.assertEqual([image.number for image in serial], list(range(1, 13)))
+        self.assertEqual(parallel, serial)
+
+    def test_each_page_is_rendered_once_for_all_its_images(self):
+        from pdfplumber.page import Page
+
+        render = Page.to_image
+        rendered = []
+
+        def counting_render(page, *args, **kwargs):
+            rendered.append(page.page_number)
+            return render(page, *args, **kwargs)
+
+        with mock.patch.object(Page, "to_image", counting_render):
+            self._extract(image_source="render")
+        self.assertEqual(rendered, [1])
+
+    def test_failed_page_render_steps_down_a_resolution(self):
+        from pdfplumber.page import Page
+
+        render = Page.to_image
+        resolutions = []
+
+        def failing_render(page, *args, resolution=72, **kwargs):
+            resolutions.append(resolution)
+            if resolution > 300:
+                raise MemoryError
+            return render(page, *args, resolution=resolution, **kwargs)
+
+        with mock.patch.object(Page, "to_image", failing_render):
+            images, _ = self._extract(image_source="render")
+        self.assertEqual(resolutions, [400, 300])
+        self.assertEqual(len(images), 3)
+        for image in images:
+            with Image.open(io.BytesIO(image.data)) as rendered:
+                self.assertEqual(rendered.format, "PNG")
+
+    def test_render_resolution_is_predicted_to_fit_the_budget(self):
+        images, out = self._extract(fallback_kb=20, image_source="render")
+
+        # The pictures are over 20 KB at 400 DPI, and go straight to a lower resolution
+        self.assertEqual(len(images), 3)
+        self.assertTrue(all(len(image.data) <= 20 * 1024 for image in images))
+        self.assertRegex(out, r"Rendered 3 images with [1-4] full encodes")
+
+    def test_overestimated_resolution_is_corrected_upward(self):
+        raster = _PageRaster.__new__(_PageRaster)
+        raster.image = Image.frombytes("RGB", (400, 400), os.urandom(400 * 400 * 3))
+        raster.bounds, raster.scale, raster.resolution = (0, 0, 72, 72), 400 / 72, 400
+        sizes = {res: len(_encode_png(raster.crop(raster.bounds, res)))
+                 for res in image_module.RENDER_RESOLUTIONS}
+        budget = sizes[300] * 1.05
+
+        # Predictions three times too large first pick a resolution far below 300 DPI
+        overestimated = {res: size * 3 for res, size in sizes.items() if res < 400}
+        stats: Counter = Counter()
+        with mock.patch.object(image_module, "_predict_resampled_sizes",
+                               return_value=overestimated):
+            data = _render_image(raster, raster.bounds, budget, stats)
+
+        self.assertEqual(len(data), sizes[300])
+        self.assertEqual(stats["corrected"], 1)
+
+    @unittest.skipUnless(os.path.isdir("/proc/self"), "needs /proc")
+    def test_timeout_also_stops_the_extraction_pool(self):
+        pids = tempfile.TemporaryDirectory()
+        self.addCleanup(pids.cleanup)
+        actions = {"image_dir": self.out.name, "image_timeout": 2}
+        with mock.patch.dict(os.environ, {"PDF_FMT_TEST_PIDS": pids.name}), \
+                mock.patch.object(image_module, "_extract_page_range", _stalled_range), \
+                redirect_stdout(io.StringIO()) as out:
+            _run_image_pipeline(self.pages_path, actions, 2)
+
+        self.assertIn("timed out", out.getvalue())
+        workers = [int(pid) for pid in os.listdir(pids.name)]
+        self.assertTrue(workers)
+        deadline = time.monotonic() + 5
+        while any(map(_is_running, workers)) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertFalse(any(map(_is_running, workers)))
+
+    def test_masked_and_inline_images_are_rendered(self):
+        base = {"Width": 2, "Height": 2, "BitsPerComponent": 8}
+        self.assertIsNone(_read_embedded_image({"stream": _Stream({**base, "SMask": 1})}))
+        self.assertIsNone(_read_embedded_image({"stream": _Stream({**base, "ImageMask": True})}))
+        self.assertIsNone(_read_embedded_image({"stream": _Stream({"W": 2, "H": 2})}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+from pdf_fmt.office import extract_page_blocks, use_native_extraction
+from pdf_fmt.processing import extract_text_from_pdf
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+P = ('xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+     'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"')
+ODF = ('xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+       'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+       'xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0" '
+       'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+       'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"')
+
+DOCUMENT = f"""<w:document {W}><w:body>
+<w:p><w:r><w:t>First page</w:t></w:r></w:p>
+<w:p><w:pPr><w:numPr><w:ilvl w:val="1"/></w:numPr></w:pPr><w:r><w:t>Nested item</w:t></w:r></w:p>
+<w:p><w:r><w:br w:type="page"/><w:t>Second page</w:t></w:r></w:p>
+<w:tbl>
+<w:tr><w:tc><w:p><w:r><w:t>Name</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Value</w:t></w:r></w:p></w:tc></w:tr>
+<w:tr><w:tc><w:p><w:r><w:t>a</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>1</w:t></w:r></w:p></w:tc></w:tr>
+</w:tbl>
+</w:body></w:document>"""
+
+PRESENTATION = f"""<p:presentation {P}><p:sldIdLst>
+<p:sldId id="257" r:id="rId3"/><p:sldId id="256" r:id="rId2"/><p:sldId id="258" r:id="rId4"/>
+</p:sldIdLst></p:presentation>"""
+
+PRESENTATION_RELS = """<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId2" Target="slides/slide1.xml"/>
+<Relationship Id="rId3" Target="slides/slide2.xml"/>
+<Relationship Id="rId4" Target="slides/slide3.xml"/>
+</Relationships>"""
+
+
+def _slide(title, bullets, show="1"):
+    paragraphs = "".join(f"<a:p><a:r><a:t>{text}</a:t></a:r></a:p>" for text in bullets)
+    return f"""<p:sld {P} show="{show}"><p:cSld><p:spTree>
+<p:sp><p:nvSpPr><p:nvPr><p:ph type="title"/></p:nvPr></p:nvSpPr>
+<p:txBody><a:p><a:r><a:t>{title}</a:t></a:r></a:p></p:txBody></p:sp>
+<p:sp><p:nvSpPr><p:nvPr><p:ph idx="1"/></p:nvPr></p:nvSpPr>
+<p:txBody>{paragraphs}</p:txBody></p:sp>
+</p:spTree></p:cSld></p:sld>"""
+
+
+CONTENT = f"""<office:document-content {ODF}>
+<office:automatic-styles>
+<style:style style:name="P1"><style:paragraph-properties fo:break-before="page"/></style:style>
+</office:automatic-styles>
+<office:body><office:text>
+<text:h>Intro</text:h>
+<text:p>Two<text:s text:c="2"/>spaces <text:span>and a span</text:span></text:p>
+<text:list><text:list-item><text:p>Item</text:p>
+<text:list><text:list-item><text:p>Sub item</text:p></text:list-item></text:list>
+</text:list-item></text:list>
+<text:p text:style-name="P1">After the break</text:p>
+</office:text></office:body></office:document-content>"""
+
+
+class TestNativeExtraction(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, name, parts):
+        path = os.path.join(self.tmp.name, name)
+        with zipfile.ZipFile(path, "w") as archive:
+            for part, data in parts.items():
+                archive.writestr(part, data)
+        return path
+
+    def test_docx_page_breaks_lists_and_tables(self):
+        path = self._write("doc.docx", {"word/document.xml": DOCUMENT})
+        blocks = extract_page_blocks(path)
+        self.assertEqual(blocks[0], "First page\n  - Nested item")
+        self.assertEqual(blocks[1].splitlines()[:3],
+                         ["Second page", "", "| Name | Value |"])
+        self.assertIn("| a | 1 |", blocks[1])
+
+    def test_pptx_slides_follow_presentation_order_and_skip_hidden(self):
+        path = self._write("deck.pptx", {
+            "ppt/presentation.xml": PRESENTATION,
+            "ppt/_rels/presentation.xml.rels": PRESENTATION_RELS,
+            "ppt/slides/slide1.xml": _slide("Second", ["b"]),
+            "ppt/slides/slide2.xml": _slide("First", ["a", "aa"]),
+            "ppt/slides/slide3.xml": _slide("Hidden", ["c"], show="0"),
+        })
+        self.assertEqual(extract_page_blocks(path),
+                         ["First\n- a\n- aa", "Second\n- b"])
+
+    def test_odt_lists_spaces_and_break_styles(self):
+        path = self._write("notes.odt", {"content.xml": CONTENT})
+        self.assertEqual(extract_page_blocks(path), [
+            "Intro\nTwo  spaces and a span\n- Item\n  - Sub item",
+            "After the break",
+        ])
+
+    def test_documents_are_processed_like_pdf_pages(self):
+        path = self._write("deck.pptx", {
+            "ppt/presentation.xml": PRESENTATION,
+            "ppt/_rels/presentation.xml.rels": PRESENTATION_RELS,
+            "ppt/slides/slide1.xml": _slide("Second", ["b"]),
+            "ppt/slides/slide2.xml": _slide("First", ["a"]),
+            "ppt/slides/slide3.xml": _slide("Third", ["c"]),
+        })
+        config = {"processing": {"cores": 1},
+                  "formatting": {"page_separator": "--- PAGE SEPARATOR ---"}}
+        content, error, _ = extract_text_from_pdf(path, config, r"[^\n]+", [], "", [])
+        self.assertIsNone(error)
+        self.assertIn("--- Page 2 ---", content)
+        self.assertLess(content.index("First"), content.index("Second"))
+
+    def test_list_levels_survive_page_processing(self):
+        path = self._write("notes.odt", {"content.xml": CONTENT})
+        config = {"processing": {"cores": 1}}
+        content, error, _ = extract_text_from_pdf(path, config, r"[^\n]+", [], "", [])
+        self.assertIsNone(error)
+        self.assertIn("\n- Item\n  - Sub item\n", content)
+
+    def test_documents_are_converted_when_images_are_extracted(self):
+        config = {"conversion": {"supported_formats": ["docx", "ppt"]}}
+        self.assertTrue(use_native_extraction("a.docx", config))
+        self.assertFalse(use_native_extraction("a.ppt", config))
+        self.assertFalse(use_native_extraction("a.odt", config))
+        config["actions"] = {"image_dir": "images"}
+        self.assertFalse(use_native_extraction("a.docx", config))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import closing, redirect_stdout
+from unittest import mock
+
+from pdf_fmt import processing
+from pdf_fmt.cache import DiskCache
+from pdf_fmt.core import post_process_content
+from pdf_fmt.filter import FooterMatcher
+from pdf_fmt.processing import (
+    _open_pool, build_processing_plan, extract_text_from_pdf, iter_batch_extracted,
+    split_page_ranges, stream_content
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from synthetic_pdf import build_corpus  # noqa: E402
+
+
+class TestPageRanges(unittest.TestCase):
+
+    def test_split_page_ranges_covers_every_page_in_order(self):
+        ranges = split_page_ranges(103, 4)
+        flat = [page for page_range in ranges for page in page_range]
+        self.assertEqual(flat, list(range(103)))
+        self.assertEqual(len(ranges), 16)
+
+    def test_split_page_ranges_never_creates_empty_ranges(self):
+        ranges = split_page_ranges(3, 8)
+        self.assertEqual(ranges, [[0], [1], [2]])
+
+
+class TestStreamContent(unittest.TestCase):
+
+    def test_stream_content_matches_full_output(self):
+        pages = [["Line one [1, 2]", "Line two"], [], ["", "\n\n___\n\n"], ["End"]]
+        config = {
+            "formatting": {
+                "regex_enclosures": [{"pattern": r'\[.*?\]', "wrapper": "`"}]
+            },
+            "actions": {"copy": False}
+        }
+        expected = post_process_content(
+            [line for page in pages for line in page], config
+        ) + "\n"
+
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            stream_content(iter(pages), config)
+        self.assertEqual(buffer.getvalue(), expected)
+
+
+class TestParallelParse(unittest.TestCase):
+
+    def test_parallel_parse_matches_the_sequential_output(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "tables.pdf")
+        pages = build_corpus("tables", path, pages_scale=0.1)
+        formatting = {"page_separator": "--- PAGE SEPARATOR ---"}
+
+        def extract(processing_cfg):
+            config = {"processing": processing_cfg, "formatting": formatting}
+            with redirect_stdout(io.StringIO()):
+                content, error, _ = extract_text_from_pdf(path, config, r"[^\n]+", [], "", [])
+            self.assertIsNone(error)
+            return content
+
+        sequential = extract({"cores": 1})
+        run_parallel_parse = processing._run_parallel_parse
+        parallel_runs = []
+
+        def recording_run(*args):
+            result = run_parallel_parse(*args)
+            parallel_runs.append(result is not None)
+            return result
+
+        with mock.patch.object(processing.os, "cpu_count", return_value=4), \
+                mock.patch.object(processing, "_run_parallel_parse", recording_run):
+            parallel = extract({"cores": 2, "parallel_parse": True})
+
+        self.assertEqual(parallel_runs, [True])
+        self.assertEqual(parallel.encode("utf-8"), sequential.encode("utf-8"))
+        # Pages stay in order, each with its tables
+        separators = [parallel.index(f"--- Page {n} ---") for n in range(2, pages)]
+        self.assertEqual(separators, sorted(separators))
+        self.assertGreaterEqual(parallel.count("| --- |"), pages)
+
+
+class TestBatchExtraction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.paths = []
+        for name in ("a", "b"):
+            path = os.path.join(cls.tmp.name, f"{name}.pdf")
+            build_corpus("text", path, pages_scale=0.1)
+            cls.paths.append(path)
+        cls.paths.insert(1, os.path.join(cls.tmp.name, "missing.pdf"))
+        cls.config = {"processing": {"cores": 2}}
+        cls.plan = build_processing_plan(cls.config, r"[^\n]+", [], "", [])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_documents_are_parsed_as_their_results_are_needed(self):
+        parsed = []
+        get_elements = processing._get_page_elements
+
+        def recording_parse(page, table_config):
+            parsed.append(page.page_number)
+            return get_elements(page, table_config)
+
+        with mock.patch.object(processing, "_get_page_elements", recording_parse), \
+                closing(iter_batch_extracted(self.paths, self.config, self.plan)) as results:
+            index, content, error, _ = next(results)
+            self.assertEqual((index, error), (0, None))
+            # Only the first page of the next document was read ahead
+            pages = len(parsed) - 1
+            self.assertEqual(parsed, list(range(1, pages + 1)) + [1])
+            rest = list(results)
+
+        self.assertEqual([result[0] for result in rest], [1, 2])
+        self.assertIn("An error occurred during PDF parsing", rest[0][2])
+        self.assertEqual(rest[1][1], content)
+
+    def test_pool_results_match_sequential_results(self):
+        sequential = list(iter_batch_extracted(self.paths, self.config, self.plan))
+        pool = _open_pool(2, self.plan)
+        with pool:
+            pooled = list(iter_batch_extracted(self.paths, self.config, self.plan, pool))
+        self.assertEqual(pooled, sequential)
+
+    def test_budget_cut_pages_are_not_cached(self):
+        config = {"processing": {"cores": 1}}
+        page_store = DiskCache(os.path.join(self.tmp.name, "pages"), 1 << 30)
+
+        def extract():
+            output = io.StringIO()
+            with redirect_stdout(output):
+                content, error, budget_cut = extract_text_from_pdf(
+                    self.paths[0], config, r"[^\n]+", [], "", [], page_store
+                )
+            self.assertIsNone(error)
+            return content, budget_cut, output.getvalue()
+
+        # Pretend the budget ran out on the first page only
+        with mock.patch.object(FooterMatcher, "budget_exceeded",
+                               lambda matcher: matcher._page_num == 0):
+            cut, budget_cut, _ = extract()
+            batch = list(iter_batch_extracted(self.paths[:1], config, self.plan))
+        self.assertTrue(budget_cut)
+        self.assertTrue(batch[0][3])
+
+        content, budget_cut, output = extract()
+        self.assertFalse(budget_cut)
+        self.assertEqual(content, cut)
+        total = output.split("INFO: Reused ")[1].split(" cached pages")[0]
+        reused, pages = map(int, total.split("/"))
+        self.assertEqual(reused, pages - 1)
+
+
+
+class TestIncrementalExtraction(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "notes.pdf")
+        self.pages = build_corpus("text", self.path, pages_scale=0.1)
+        self.page_store = DiskCache(os.path.join(self.tmp.name, "pages"), 1 << 30)
+
+    def extract(self, config, footers=()):
+        """Returns the content and the pages parsed and processed, from 0."""
+        parsed, processed = [], []
+        get_elements, process_page = processing._get_page_elements, processing._process_page
+
+        def recording_parse(page, table_config):
+            parsed.append(page.page_number - 1)
+            return get_elements(page, table_config)
+
+        def recording_process(task):
+            processed.append(task.page_num)
+            return process_page(task)
+
+        with mock.patch.object(processing, "_get_page_elements", recording_parse), \
+                mock.patch.object(processing, "_process_page", recording_process), \
+                redirect_stdout(io.StringIO()):
+            content, error, _ = extract_text_from_pdf(
+                self.path, config, r"[^\n]+", list(footers), "", [], self.page_store
+            )
+        self.assertIsNone(error)
+        return content, parsed, processed
+
+    def test_only_edited_pages_are_parsed_again(self):
+        config = {"processing": {"cores": 1}}
+        everything = list(range(self.pages))
+        content, parsed, processed = self.extract(config)
+        self.assertEqual((parsed, processed), (everything, everything))
+        self.assertEqual(self.extract(config), (content, [], []))
+
+        # Same length, so the other pages keep their objects and offsets
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data.replace(b"(Lecture 2:", b"(Seminar 2:", 1))
+
+        edited, parsed, processed = self.extract(config)
+        self.assertEqual((parsed, processed), ([1], [1]))
+        self.assertIn("Seminar 2:", edited)
+        self.assertEqual(edited.replace("Seminar 2:", "Lecture 2:"), content)
+
+    def test_output_options_reprocess_pages_without_parsing_them(self):
+        self.extract({"processing": {"cores": 1}})
+        everything = list(range(self.pages))
+
+        formatting = {"processing": {"cores": 1}, "formatting": {"max_chars_per_line": 40}}
+        _, parsed, processed = self.extract(formatting)
+        self.assertEqual((parsed, processed), ([], everything))
+
+        footers = [r'^\s*\d+\s*$']
+        filters = {"processing": {"cores": 1}, "filters": {"footer_regexes": footers}}
+        _, parsed, processed = self.extract(filters, footers)
+        self.assertEqual((parsed, processed), ([], everything))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from pdf_fmt import profiling
+from pdf_fmt.processing import PageTask, _pool_map, _process_page_text_block
+from pdf_fmt.profiling import PageRecord, Profiler, page_timer, profile_run
+
+
+class _FakePool:
+    """Runs map in-process, standing in for a worker pool."""
+
+    def map(self, func, tasks):
+        return [func(task) for task in tasks]
+
+    def imap(self, func, tasks):
+        return map(func, tasks)
+
+
+def _double(value):
+    with page_timer(value, "work"):
+        return value * 2
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_page_timer_records_nothing_when_disabled(self):
+        profiling._PAGE_RECORDS = None
+        with page_timer(0, "tables"):
+            pass
+        self.assertEqual(profiling.drain_page_records(), [])
+
+    def test_nested_page_stages_are_not_counted_twice(self):
+        profiler = Profiler()
+        profiler.pages.extend([
+            PageRecord(0, "process", 0.5, 0.5, 300, 1),
+            PageRecord(0, "process/lint", 0.25, 0.25, 200, 1),
+            PageRecord(0, "tables", 1.0, 1.0, -100, 1),
+        ])
+        page = profiler.report()["pages"][0]
+        self.assertEqual(page["page"], 1)
+        self.assertAlmostEqual(page["wall"], 1.5)
+        self.assertEqual(page["rss_delta_kb"], 200)
+        self.assertIn("process/lint", page["stages"])
+
+    @unittest.skipIf(profiling.current_rss_kb() is None, "needs /proc")
+    def test_stages_report_their_own_memory_growth(self):
+        profiler = Profiler()
+        with profiler.stage("grow"):
+            block = bytearray(64 * 1024 * 1024)
+            block[::4096] = b"x" * len(block[::4096])
+        with profiler.stage("idle"):
+            pass
+        del block
+
+        stages = profiler.report()["stages"]
+        self.assertGreater(stages["grow"]["rss_delta_kb"], 32 * 1024)
+        # A lifetime peak would report the same figure for the later stage
+        self.assertLess(stages["idle"]["rss_delta_kb"], 32 * 1024)
+
+    def test_worker_counters_are_summed_per_worker(self):
+        profiler = Profiler()
+        profiler.add_worker_result(10, [], {"spelling": {"hits": 1, "misses": 2}})
+        profiler.add_worker_result(10, [], {"spelling": {"hits": 3, "misses": 2}})
+        profiler.add_worker_result(11, [], {"spelling": {"hits": 5, "misses": 1}})
+        self.assertEqual(profiler.report()["counters"]["spelling"], {"hits": 8, "misses": 3})
+
+    def test_profile_run_collects_worker_pages_and_writes_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = os.path.join(tmp, "profile.json")
+            with redirect_stderr(io.StringIO()) as err:
+                with profile_run(report_path, top_n=2):
+                    self.assertEqual(_pool_map(_FakePool(), _double, [1, 2, 3]), [2, 4, 6])
+                    self.assertEqual(list(_pool_map(_FakePool(), _double, [4], lazy=True)), [8])
+
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+
+        self.assertEqual([page["page"] for page in report["pages"]], [2, 3, 4, 5])
+        self.assertEqual(report["page_stages"]["work"]["pages"], 4)
+        self.assertIn("Slowest 2 of 4 pages", err.getvalue())
+        self.assertFalse(profiling.is_profiling())
+
+    def test_pool_map_is_unchanged_when_not_profiling(self):
+        self.assertEqual(
+            _pool_map(_FakePool(), _process_page_text_block, [PageTask(0, " ", 1)]), [[]]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from pdf_fmt import processing
+from pdf_fmt.server import (
+    SOCKET_ENV, forward_to_server, get_socket_path, is_supported, serve, stop_server
+)
+from pdf_fmt.startup import get_script_version
+
+
+@unittest.skipUnless(is_supported(), "Unix domain sockets are not available")
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, "pdf-fmt.sock")
+        env = mock.patch.dict(os.environ, {SOCKET_ENV: self.socket_path})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def _start_server(self) -> threading.Thread:
+        log = io.StringIO()
+
+        def run():
+            with redirect_stdout(log):
+                serve()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        for _ in range(200):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.05)
+        return thread
+
+    def _forward(self, argv):
+        out, err = io.StringIO(), io.StringIO()
+        return forward_to_server(argv, out, err), out.getvalue()
+
+    def test_falls_back_when_no_server_is_running(self):
+        self.assertIsNone(self._forward(["--version"])[0])
+
+    def test_sockets_other_users_could_open_are_not_trusted(self):
+        # Anything listening on a socket others can use may be an impostor
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(listener.close)
+        listener.bind(self.socket_path)
+        listener.listen(1)
+        os.chmod(self.socket_path, 0o666)
+
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertIsNone(self._forward(["--version"])[0])
+            self.assertEqual(serve(), 1)
+        self.assertIn("not a server socket private to this user", out.getvalue())
+        self.assertIn("Not serving", out.getvalue())
+
+    def test_default_socket_is_in_a_private_directory(self):
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}), \
+                mock.patch("tempfile.gettempdir", return_value=self.tmp.name):
+            del os.environ[SOCKET_ENV]
+            path = get_socket_path()
+            self.socket_path = path
+            thread = self._start_server()
+            self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(stop_server(), 0)
+            thread.join(timeout=5)
+
+    def test_forwards_runs_and_relays_output_and_exit_codes(self):
+        thread = self._start_server()
+
+        code, output = self._forward(["--version"])
+        self.assertEqual(code, 0)
+        self.assertEqual(output, f"pdf-fmt {get_script_version()}\n")
+
+        missing = os.path.join(self.tmp.name, "missing.pdf")
+        code, output = self._forward([missing])
+        self.assertEqual(code, 1)
+        self.assertIn("Input file not found", output)
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(stop_server(), 0)
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+class TestSharedPool(unittest.TestCase):
+
+    def tearDown(self):
+        processing.set_shared_pool(None)
+
+    def test_runs_with_the_same_plan_borrow_the_shared_pool(self):
+        plan = processing.build_processing_plan({}, r"[^\n]", [], "en-UK", [])
+        pool = mock.Mock()
+        pool.map.return_value = [["line"]]
+        processing.set_shared_pool(pool, plan, 2)
+
+        borrowed = processing._new_pool(2, plan)
+        with borrowed:
+            self.assertEqual(borrowed.map(len, ["x"]), [["line"]])
+        borrowed.close()
+        pool.terminate.assert_not_called()
+        pool.close.assert_not_called()
+
+        other = plan._replace(max_chars=10)
+        with mock.patch("multiprocessing.Pool") as new_pool:
+            processing._new_pool(2, other)
+        new_pool.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from pdf_fmt.spell import (
+    SpellingEngine, SpellingTable, enforce_spelling, write_spelling_table,
+    load_spelling_table
+)
+
+
+class TestSpellingEngine(unittest.TestCase):
+
+    def test_enforce_lines_preserves_case_and_ignores(self):
+        engine = SpellingEngine("en-UK", ["color"])
+        lines = ["The COLOR of the Organization.", "  analyze   this  "]
+        self.assertEqual(
+            engine.enforce_lines(lines),
+            ["The COLOR of the Organisation.", "analyse this"]
+        )
+
+    def test_memo_counts_repeated_words(self):
+        engine = SpellingEngine("en-US", [])
+        engine.enforce_lines(["colour colour colour", "colour"])
+        stats = engine.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 3)
+
+    def test_enforce_spelling_matches_engine(self):
+        text = "Behaviour of the centre"
+        self.assertEqual(enforce_spelling(text, "en-US", []), "Behavior of the center")
+
+
+
+class TestSpellingTable(unittest.TestCase):
+
+    def test_table_round_trip_keeps_only_changed_words(self):
+        mapping = {"colour": "color", "centre": "center", "same": "same"}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "test.tbl")
+            self.assertEqual(write_spelling_table(path, mapping), 2)
+            table = SpellingTable(path)
+            self.assertEqual(len(table), 2)
+            self.assertEqual(table.get("colour"), "color")
+            self.assertEqual(table.get("centre"), "center")
+            self.assertEqual(table.get("same"), "same")
+            self.assertEqual(table.get("zebra"), "zebra")
+
+    def test_shipped_tables_match_breame(self):
+        try:
+            from breame.spelling import (
+                AMERICAN_ENGLISH_SPELLINGS, BRITISH_ENGLISH_SPELLINGS
+            )
+        except ImportError:
+            self.skipTest("breame not installed")
+
+        us, uk = load_spelling_table("en-US"), load_spelling_table("en-UK")
+        if us is None or uk is None:
+            self.skipTest("spelling tables not built, run `make tables`")
+
+        for word, american in BRITISH_ENGLISH_SPELLINGS.items():
+            self.assertEqual(us.get(word), american)
+        for word, british in AMERICAN_ENGLISH_SPELLINGS.items():
+            self.assertEqual(uk.get(word), british)
+
+
+if __name__ == '__main__':
+    print("Run from root directory, see README for instructions")
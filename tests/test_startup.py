@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import unittest
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only by the stage that needs them
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "PIL", "yaml", "multiprocessing", "importlib.metadata")
+
+# Generous, so that slow CI runners pass. Importing everything eagerly took
+# about four times as long as importing lazily
+IMPORT_BUDGET_US = 150_000
+
+
+def _import_times(code: str) -> Dict[str, int]:
+    """Runs code under -X importtime and returns the cumulative time per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartupImports(unittest.TestCase):
+
+    def assertNoHeavyModules(self, times: Dict[str, int]):
+        loaded = [name for name in times
+                  if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)]
+        self.assertEqual(loaded, [])
+
+    def test_importing_the_pipeline_skips_heavy_dependencies(self):
+        times = _import_times("import pdf_fmt.parser")
+        self.assertIn("pdf_fmt.parser", times)
+        self.assertNoHeavyModules(times)
+        self.assertLess(times["pdf_fmt.parser"], IMPORT_BUDGET_US)
+
+    def test_help_skips_heavy_dependencies(self):
+        times = _import_times(
+            "import sys; sys.argv = ['pdf-fmt', '--help']\n"
+            "from pdf_fmt.startup import setup_cli\n"
+            "try:\n    setup_cli()\nexcept SystemExit:\n    pass"
+        )
+        self.assertIn("pdf_fmt.startup", times)
+        self.assertNoHeavyModules(times)
+
+
+if __name__ == '__main__':
+    unittest.main()